@@ -0,0 +1,129 @@
+# AccountSync.py
+
+from MatchScoring import author_overlap, year_proximity
+from PaperIdentifiers import normalize_title
+
+# Fraction of the Zotero surnames found among the authors of a paper for its authors to agree
+AUTHOR_AGREEMENT = 0.5
+
+
+class AccountPapers(object):
+    """
+    The papers already in the library or under an alert of the Semantic Scholar account,
+    read once before the items are sent.
+    """
+
+    def __init__(
+        self,
+        library=None,
+        alerts=None,
+        library_complete=False,
+        alerts_complete=False,
+    ):
+        """
+        Initializes the AccountPapers.
+
+        :param library: A dictionary {paper ID: {"title", "authors", "year"}} of the library, or None if it could not be read.
+        :param alerts: A dictionary {paper ID: {"title", "authors", "year"}} of the alerts, or None if they could not be read.
+        :param library_complete: Whether every page of the library was read.
+        :param alerts_complete: Whether every page of the alerts was read.
+        """
+        self.library = library
+        self.alerts = alerts
+        self.library_complete = library is not None and library_complete
+        self.alerts_complete = alerts is not None and alerts_complete
+        self._library_titles = _title_index(library)
+        self._alert_titles = _title_index(alerts)
+
+    def in_library(self, title, paper_id="", year="", authors="") -> bool:
+        """
+        :return: True if the paper of an item is in the library, see _contains.
+        """
+        return _contains(
+            self.library, self._library_titles, title, paper_id, year, authors
+        )
+
+    def in_alerts(self, title, paper_id="", year="", authors="") -> bool:
+        """
+        :return: True if the paper of an item has an alert, see _contains.
+        """
+        return _contains(
+            self.alerts, self._alert_titles, title, paper_id, year, authors
+        )
+
+
+def match_account_papers(work, account_papers, paper_id_for) -> dict:
+    """
+    Find the work items whose requested actions are already done on the account.
+
+    :param work: Work items (item number, ZoteroItem, duplicates).
+    :param account_papers: An AccountPapers.
+    :param paper_id_for: Callable (ZoteroItem) -> the Semantic Scholar paper ID known for the item, or "".
+    :return: A dictionary {item key: (has alert, in library)} of the items found on the account.
+    """
+    found = dict()
+    for _, zotero_item, duplicates in work:
+        paper_id = paper_id_for(zotero_item)
+        for duplicate in duplicates:
+            paper_id = paper_id or paper_id_for(duplicate)
+        has_alert = account_papers.in_alerts(
+            zotero_item.title, paper_id, zotero_item.year, zotero_item.authors
+        )
+        in_library = account_papers.in_library(
+            zotero_item.title, paper_id, zotero_item.year, zotero_item.authors
+        )
+        if has_alert or in_library:
+            found[zotero_item.key] = (has_alert, in_library)
+    return found
+
+
+def removal_done(removal, account_papers) -> bool:
+    """
+    Whether the paper of a removed item is known to be gone from the account. A paper missing from a listing
+    that may be partial is not known to be gone.
+
+    :param removal: A RemovalItem.
+    :param account_papers: An AccountPapers.
+    :return: True if every step to undo is absent from a complete listing.
+    """
+    if removal.disable_alert and (
+        not account_papers.alerts_complete
+        or account_papers.in_alerts(removal.title, removal.paper_id)
+    ):
+        return False
+    if removal.remove_from_library and (
+        not account_papers.library_complete
+        or account_papers.in_library(removal.title, removal.paper_id)
+    ):
+        return False
+    return True
+
+
+def _title_index(papers) -> dict:
+    """
+    :return: A dictionary {normalized title: [paper, ...]}.
+    """
+    titles = dict()
+    for paper in (papers or {}).values():
+        normalized = normalize_title(paper.get("title"))
+        if normalized:
+            titles.setdefault(normalized, []).append(paper)
+    return titles
+
+
+def _contains(papers, titles, title, paper_id, year, authors) -> bool:
+    """
+    Whether a paper is listed: by its paper ID when it is known, otherwise by its normalized title,
+    the year or the authors also agreeing so that a short generic title does not match another paper.
+    """
+    if not papers:
+        return False
+    if paper_id:
+        return paper_id.lower() in papers
+    for paper in titles.get(normalize_title(title), []):
+        if year_proximity(year, paper.get("year")) == 1.0:
+            return True
+        overlap = author_overlap(authors, paper.get("authors"))
+        if overlap is not None and overlap >= AUTHOR_AGREEMENT:
+            return True
+    return False
@@ -0,0 +1,210 @@
+# AsyncLog.py
+
+import gzip
+import os
+import queue
+import shutil
+import sys
+import threading
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+
+# Marks the end of the queue when the log is closed
+_CLOSE = object()
+
+
+def guess_level(msg) -> int:
+    """
+    Level of a free-text message, from the prefixes used across the application.
+    """
+    start = msg.lstrip()[:20].lower()
+    if start.startswith(
+        ("error", "unexpected error", "driver initialization error")
+    ):
+        return ERROR
+    if start.startswith(("warning", "could not", "unable")):
+        return WARNING
+    return INFO
+
+
+class AsyncLogFile(object):
+    """
+    File-like log written by a background thread.
+    Messages are queued without any system call, then written and flushed in batches.
+    The file is rotated and compressed once it exceeds a size, and every new file starts with the header line.
+    """
+
+    def __init__(
+        self,
+        file_name,
+        header=None,
+        level=INFO,
+        max_bytes=5 * 1024 * 1024,
+        backup_count=3,
+        queue_size=10000,
+        batch_size=200,
+        flush_interval=1.0,
+    ):
+        """
+        Initializes the AsyncLogFile.
+
+        :param file_name: Path to the log file, messages are appended to it.
+        :param header: Optional first line of every new log file, such as "id: <email>".
+        :param level: Messages below this level are dropped.
+        :param max_bytes: Size from which the file is rotated, 0 to never rotate.
+        :param backup_count: Number of compressed rotated files kept (log.1.txt.gz, log.2.txt.gz...).
+        :param queue_size: Maximum number of queued messages, further messages are dropped and counted.
+        :param batch_size: Maximum number of messages written at once.
+        :param flush_interval: Maximum seconds a message stays in the queue.
+        """
+        self.file_name = file_name
+        self.header = header
+        self.level = level
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._dropped_lock = threading.Lock()
+        self.closed = False
+
+        self._file = open(file_name, "a", encoding="utf-8", errors="ignore")
+        # Tracked size of the file, so that it is never read with os.stat
+        self._size = self._file.tell()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def write(self, msg):
+        """
+        Queue a message, with a level guessed from its prefix. Compatible with the file objects used before.
+        """
+        self.log(msg, guess_level(msg))
+
+    def log(self, msg, level=INFO, echo=False):
+        """
+        Queue a message.
+
+        :param msg: The message, written as is.
+        :param level: DEBUG, INFO, WARNING or ERROR.
+        :param echo: Also print the message on the standard output.
+        """
+        if level < self.level or self.closed:
+            return
+        try:
+            self._queue.put_nowait((msg, echo))
+        except queue.Full:
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def debug(self, msg):
+        self.log(msg, DEBUG)
+
+    def info(self, msg, echo=False):
+        self.log(msg, INFO, echo)
+
+    def warning(self, msg, echo=False):
+        self.log(msg, WARNING, echo)
+
+    def error(self, msg, echo=False):
+        self.log(msg, ERROR, echo)
+
+    def flush(self):
+        """
+        Wait until every queued message is written.
+        """
+        if not self.closed:
+            self._queue.join()
+
+    def close(self):
+        """
+        Write the queued messages and close the file.
+        """
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.put(_CLOSE)
+        self._thread.join()
+
+    def _run(self):
+        running = True
+        while running:
+            try:
+                batch = [self._queue.get(timeout=self._flush_interval)]
+            except queue.Empty:
+                continue
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            if _CLOSE in batch:
+                running = False
+            records = [record for record in batch if record is not _CLOSE]
+            try:
+                self._write_batch(records)
+            except Exception as e:
+                print(f"Error while writing the log: {e}")
+            for _ in batch:
+                self._queue.task_done()
+        self._file.close()
+
+    def _write_batch(self, records):
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            records.append(
+                (f"Warning - {dropped} log messages were dropped.\n", False)
+            )
+        if not records:
+            return
+
+        if self._size == 0 and self.header is not None:
+            self._write(f"{self.header}\n")
+        self._write("".join(msg for msg, _ in records))
+        self._file.flush()
+
+        echoed = [msg for msg, echo in records if echo]
+        if echoed:
+            # Printed like print(msg) did
+            sys.stdout.write("".join(msg + "\n" for msg in echoed))
+            sys.stdout.flush()
+
+        if self.max_bytes and self._size >= self.max_bytes:
+            self._rotate()
+
+    def _write(self, text):
+        self._file.write(text)
+        self._size += len(text.encode("utf-8", errors="ignore"))
+
+    def _rotate(self):
+        """
+        Compress the current file into the first backup, shifting the older backups.
+        """
+        self._file.close()
+        root, extension = os.path.splitext(self.file_name)
+        backups = [
+            f"{root}.{index}{extension}.gz"
+            for index in range(1, self.backup_count + 1)
+        ]
+        if backups:
+            if os.path.exists(backups[-1]):
+                os.remove(backups[-1])
+            for index in range(len(backups) - 1, 0, -1):
+                if os.path.exists(backups[index - 1]):
+                    os.replace(backups[index - 1], backups[index])
+            with open(self.file_name, "rb") as source, gzip.open(
+                backups[0], "wb"
+            ) as target:
+                shutil.copyfileobj(source, target)
+        self._file = open(
+            self.file_name, "w", encoding="utf-8", errors="ignore"
+        )
+        self._size = 0
+        if self.header is not None:
+            self._write(f"{self.header}\n")
+            self._file.flush()
@@ -0,0 +1,172 @@
+# GraphApiResolver.py
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class GraphApiResolver(object):
+    """
+    Resolve titles and identifiers to Semantic Scholar paper IDs over plain HTTP, with the Graph API.
+    """
+
+    def __init__(
+        self,
+        log_file,
+        base_url="https://api.semanticscholar.org/graph/v1",
+        api_key=None,
+        timeout=15,
+        pool_size=4,
+        batch_size=500,
+        min_match_score=0.0,
+    ):
+        """
+        Initializes the GraphApiResolver.
+
+        :param log_file: File object for logging.
+        :param base_url: Base URL of the Graph API, can point to a local stub server.
+        :param api_key: Optional Semantic Scholar API key.
+        :param timeout: Seconds to wait for an HTTP response.
+        :param pool_size: Number of keep-alive connections kept open.
+        :param batch_size: Number of identifiers sent per /paper/batch request (at most 500).
+        :param min_match_score: Minimum matchScore accepted from the title match endpoint.
+        """
+        self.log_file = log_file
+        self._base_url = base_url.rstrip("/")
+        self._timeout = timeout
+        self._batch_size = max(1, min(500, batch_size))
+        self._min_match_score = min_match_score
+        self._lock = threading.Lock()
+        # Identifier -> (paperId, title), or None when the API does not know it
+        self._resolved = dict()
+
+        retry = Retry(
+            total=3,
+            backoff_factor=1,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=["GET", "POST"],
+        )
+        adapter = HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size, max_retries=retry
+        )
+        self._session = requests.Session()
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+        self._session.headers.update({"Accept": "application/json"})
+        if api_key:
+            self._session.headers.update({"x-api-key": api_key})
+
+    def close(self):
+        """
+        Close the pooled connections.
+        """
+        self._session.close()
+
+    def resolve(self, paper_title, paper_ids=None):
+        """
+        Find the Semantic Scholar paper matching a row, trying its identifiers first and its title last.
+
+        :param paper_title: The title of the paper.
+        :param paper_ids: Identifiers returned by PaperIdentifiers.external_ids.
+        :return: A (paperId, title) tuple, or None if the paper could not be resolved.
+        """
+        paper_ids = list(paper_ids or [])
+        unknown_ids = [
+            paper_id
+            for paper_id in paper_ids
+            if paper_id not in self._resolved
+        ]
+        if unknown_ids:
+            self.resolve_ids(unknown_ids)
+        resolved = self.known(paper_ids)
+        if resolved:
+            return resolved
+
+        if paper_title:
+            return self.match_title(paper_title)
+        return None
+
+    def known(self, paper_ids):
+        """
+        Look up identifiers already resolved, without any request.
+
+        :param paper_ids: Identifiers returned by PaperIdentifiers.external_ids.
+        :return: The (paperId, title) tuple of the first resolved identifier, or None.
+        """
+        for paper_id in paper_ids or []:
+            resolved = self._resolved.get(paper_id)
+            if resolved:
+                return resolved
+        return None
+
+    def resolve_ids(self, paper_ids) -> dict:
+        """
+        Resolve many identifiers with as few /paper/batch requests as possible.
+        Results are kept in memory so that later calls to resolve do not hit the network again.
+
+        :param paper_ids: Identifiers returned by PaperIdentifiers.external_ids.
+        :return: A dictionary identifier -> (paperId, title), or None when it is unknown.
+        """
+        paper_ids = list(dict.fromkeys(paper_ids))
+        for start in range(0, len(paper_ids), self._batch_size):
+            chunk = paper_ids[start : start + self._batch_size]
+            try:
+                response = self._session.post(
+                    f"{self._base_url}/paper/batch",
+                    params={"fields": "title"},
+                    json={"ids": chunk},
+                    timeout=self._timeout,
+                )
+                response.raise_for_status()
+                papers = response.json()
+            except (requests.RequestException, ValueError) as e:
+                self.log_file.write(f"Graph API batch error: {e}\n")
+                print(f"Graph API batch error: {e}")
+                continue
+
+            with self._lock:
+                for paper_id, paper in zip(chunk, papers):
+                    if paper and paper.get("paperId"):
+                        self._resolved[paper_id] = (
+                            paper["paperId"],
+                            paper.get("title", ""),
+                        )
+                    else:
+                        self._resolved[paper_id] = None
+
+        return {
+            paper_id: self._resolved.get(paper_id) for paper_id in paper_ids
+        }
+
+    def match_title(self, paper_title):
+        """
+        Find the paper whose title matches best with the title match endpoint.
+
+        :param paper_title: The title of the paper.
+        :return: A (paperId, title) tuple, or None if there is no match.
+        """
+        try:
+            response = self._session.get(
+                f"{self._base_url}/paper/search/match",
+                params={"query": paper_title, "fields": "title"},
+                timeout=self._timeout,
+            )
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            papers = response.json().get("data", [])
+        except (requests.RequestException, ValueError) as e:
+            self.log_file.write(
+                f"Graph API title match error for {paper_title}: {e}\n"
+            )
+            print(f"Graph API title match error for {paper_title}: {e}")
+            return None
+
+        if not papers:
+            return None
+        paper = papers[0]
+        if paper.get("matchScore", 0) < self._min_match_score:
+            return None
+        return paper["paperId"], paper.get("title", "")
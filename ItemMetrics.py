@@ -0,0 +1,196 @@
+# ItemMetrics.py
+
+import json
+import math
+import threading
+import time
+from contextlib import contextmanager
+
+# Phases timed for each item, in the order of the scraping
+PHASES = (
+    "resolve",
+    "search",
+    "results_wait",
+    "open",
+    "title_check",
+    "popup_cancel",
+    "alert",
+    "save",
+)
+
+
+class ItemTimer(object):
+    """
+    Wall time of each phase of one item, with its outcome, retries and driver restarts.
+    Phases may be nested: the sleeps are timed in the "sleep" phase and in the phase that contains them.
+    """
+
+    def __init__(self, key, title="", worker_id=None):
+        self.key = key
+        self.title = title
+        self.worker_id = worker_id
+        self.outcome = None
+        self.retries = 0
+        self.restarts = 0
+        self.phases = dict()
+        self._started_at = time.time()
+        self._start = time.perf_counter()
+        self._total = None
+
+    @contextmanager
+    def phase(self, name):
+        """
+        Add the wall time of the enclosed block to a phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        """
+        Add a duration to a phase.
+        """
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def stop(self, outcome):
+        """
+        Record the outcome of the item and stop its total time.
+        """
+        self.outcome = outcome
+        self._total = time.perf_counter() - self._start
+
+    @property
+    def seconds(self) -> float:
+        """
+        The total wall time of the item, up to now if it is not stopped.
+        """
+        if self._total is not None:
+            return self._total
+        return time.perf_counter() - self._start
+
+    def to_record(self) -> dict:
+        """
+        :return: The JSON-serializable record of the item.
+        """
+        total = self.seconds
+        sleep = self.phases.get("sleep", 0.0)
+        return {
+            "key": self.key,
+            "title": self.title,
+            "worker": self.worker_id,
+            "started_at": round(self._started_at, 3),
+            "outcome": self.outcome,
+            "retries": self.retries,
+            "restarts": self.restarts,
+            "total": round(total, 3),
+            "sleep": round(sleep, 3),
+            "work": round(max(0.0, total - sleep), 3),
+            "phases": {
+                name: round(seconds, 3)
+                for name, seconds in self.phases.items()
+            },
+        }
+
+
+def percentile(sorted_values, fraction) -> float:
+    """
+    Nearest-rank percentile of a sorted list.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(fraction * len(sorted_values)) - 1
+    return sorted_values[min(max(rank, 0), len(sorted_values) - 1)]
+
+
+class MetricsRecorder(object):
+    """
+    Append the record of every item to a JSONL file and summarize the run.
+    """
+
+    def __init__(self, file_name):
+        """
+        Initializes the MetricsRecorder.
+
+        :param file_name: Path to the JSONL file, records are appended to it.
+        """
+        self._lock = threading.Lock()
+        self._file = open(file_name, "a", encoding="utf-8")
+        self._durations = dict()
+        self._outcomes = dict()
+        self._retries = 0
+        self._restarts = 0
+
+    def record(self, timer):
+        """
+        Write the record of an item.
+
+        :param timer: The ItemTimer of the item.
+        """
+        record = timer.to_record()
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            for name in ("total", "sleep", "work"):
+                self._durations.setdefault(name, []).append(record[name])
+            for name, seconds in record["phases"].items():
+                if name != "sleep":
+                    self._durations.setdefault(name, []).append(seconds)
+            self._outcomes[record["outcome"]] = (
+                self._outcomes.get(record["outcome"], 0) + 1
+            )
+            self._retries += record["retries"]
+            self._restarts += record["restarts"]
+
+    def summary(self) -> dict:
+        """
+        :return: A dictionary with the count, p50, p95 and max of each phase,
+            and the number of items per outcome, of retries and of restarts.
+        """
+        with self._lock:
+            durations = {
+                name: sorted(values)
+                for name, values in self._durations.items()
+            }
+            summary = {
+                "outcomes": dict(self._outcomes),
+                "retries": self._retries,
+                "restarts": self._restarts,
+                "phases": dict(),
+            }
+        for name, values in durations.items():
+            summary["phases"][name] = {
+                "count": len(values),
+                "p50": percentile(values, 0.5),
+                "p95": percentile(values, 0.95),
+                "max": values[-1],
+            }
+        return summary
+
+    def format_summary(self) -> str:
+        """
+        :return: The summary as text, one line per phase.
+        """
+        summary = self.summary()
+        order = list(PHASES) + ["sleep", "work", "total"]
+        names = [name for name in order if name in summary["phases"]]
+        names += sorted(set(summary["phases"]) - set(order))
+        lines = [
+            f"Outcomes: {summary['outcomes']}, retries: {summary['retries']}, restarts: {summary['restarts']}"
+        ]
+        for name in names:
+            phase = summary["phases"][name]
+            lines.append(
+                f"{name:>13}: n={phase['count']} p50={phase['p50']:.2f}s "
+                f"p95={phase['p95']:.2f}s max={phase['max']:.2f}s"
+            )
+        return "\n".join(lines)
+
+    def close(self):
+        """
+        Close the JSONL file.
+        """
+        with self._lock:
+            self._file.close()
@@ -0,0 +1,255 @@
+# MatchScoring.py
+
+import re
+
+import Levenshtein
+
+from PaperIdentifiers import normalize_title
+
+_YEAR_PATTERN = re.compile(r"\d{4}")
+
+
+def bounded_levenshtein(first, second, max_distance) -> int:
+    """
+    Levenshtein distance that stops as soon as it exceeds max_distance.
+
+    :param first: The first string.
+    :param second: The second string.
+    :param max_distance: The largest distance worth computing exactly.
+    :return: The distance, or max_distance + 1 if it is larger than max_distance.
+    """
+    max_distance = max(0, int(max_distance))
+    # The distance is at least the difference of lengths
+    if abs(len(first) - len(second)) > max_distance:
+        return max_distance + 1
+    return Levenshtein.distance(first, second, score_cutoff=max_distance)
+
+
+def title_similarity(expected_title, candidate_title, floor=0.0) -> float:
+    """
+    Similarity of two titles once normalized, relative to their length.
+
+    :param expected_title: The title of the Zotero item.
+    :param candidate_title: The title of a Semantic Scholar paper.
+    :param floor: Similarities below this value are not computed exactly and reported as 0.0.
+    :return: 1.0 for identical titles, down to 0.0 for completely different ones.
+    """
+    expected = normalize_title(expected_title)
+    candidate = normalize_title(candidate_title)
+    longest = max(len(expected), len(candidate))
+    if longest == 0:
+        return 0.0
+    max_distance = int((1.0 - floor) * longest)
+    edit_distance = bounded_levenshtein(expected, candidate, max_distance)
+    if edit_distance > max_distance:
+        return 0.0
+    return 1.0 - edit_distance / longest
+
+
+def zotero_surnames(authors) -> set:
+    """
+    Surnames of a Zotero "Author" column ("Last, First; Last2, First2").
+    """
+    surnames = set()
+    for author in str(authors or "").split(";"):
+        surname = normalize_title(author.split(",")[0])
+        if surname:
+            surnames.add(surname.split(" ")[-1])
+    return surnames
+
+
+def semantic_scholar_surnames(authors) -> set:
+    """
+    Surnames of an author list displayed by Semantic Scholar ("First Last, First2 Last2").
+    """
+    surnames = set()
+    for author in re.split(r",|\band\b", str(authors or "")):
+        author = normalize_title(author)
+        if author and author not in ("et al", "more"):
+            surnames.add(author.split(" ")[-1])
+    return surnames
+
+
+def author_overlap(expected_authors, candidate_authors):
+    """
+    Fraction of the Zotero surnames found among the candidate authors.
+
+    :return: A value between 0.0 and 1.0, or None if either side has no author.
+    """
+    expected = zotero_surnames(expected_authors)
+    candidate = semantic_scholar_surnames(candidate_authors)
+    if not expected or not candidate:
+        return None
+    return len(expected & candidate) / len(expected)
+
+
+def year_proximity(expected_year, candidate_year):
+    """
+    Closeness of two publication years, a preprint is often published a year before the paper.
+
+    :return: 1.0 for the same year, 0.5 for one year apart, 0.0 otherwise, or None if either year is unknown.
+    """
+    expected = _YEAR_PATTERN.search(str(expected_year or ""))
+    candidate = _YEAR_PATTERN.search(str(candidate_year or ""))
+    if not expected or not candidate:
+        return None
+    gap = abs(int(expected.group(0)) - int(candidate.group(0)))
+    return {0: 1.0, 1: 0.5}.get(gap, 0.0)
+
+
+class MatchScorer(object):
+    """
+    Combine the title similarity, the author overlap, the year proximity and the venue similarity
+    of a candidate paper into one confidence score.
+    """
+
+    def __init__(
+        self,
+        accept_threshold=0.85,
+        reject_threshold=0.75,
+        title_weight=0.7,
+        author_weight=0.2,
+        year_weight=0.1,
+        venue_weight=0.05,
+        short_title_length=30,
+        short_title_max_distance=1,
+    ):
+        """
+        Initializes the MatchScorer.
+
+        :param accept_threshold: Score from which a search result is opened even if other results are close.
+        :param reject_threshold: Score under which a candidate is never accepted.
+        :param title_weight: Weight of the title similarity.
+        :param author_weight: Weight of the author overlap, ignored when the authors are unknown.
+        :param year_weight: Weight of the year proximity, ignored when a year is unknown.
+        :param venue_weight: Weight of the venue similarity, ignored when a venue is unknown.
+        :param short_title_length: Length under which a normalized title is short: a relative similarity
+            lets a few edits turn it into another word ("Attention" and "Retention").
+        :param short_title_max_distance: Maximum edit distance between a short title and a candidate title.
+        """
+        self.accept_threshold = accept_threshold
+        self.reject_threshold = reject_threshold
+        self.title_weight = title_weight
+        self.author_weight = author_weight
+        self.year_weight = year_weight
+        self.venue_weight = venue_weight
+        self.short_title_length = short_title_length
+        self.short_title_max_distance = short_title_max_distance
+
+    def score(self, expected, candidate) -> float:
+        """
+        Confidence that a candidate is the expected paper.
+
+        :param expected: A dictionary with the title, authors, year and venue of the Zotero item.
+        :param candidate: A dictionary with the title, and optionally the authors, year and venue of a paper.
+        :return: A score between 0.0 and 1.0.
+        """
+        title = title_similarity(
+            expected.get("title", ""),
+            candidate.get("title", ""),
+            floor=self._title_floor(),
+        )
+        if title < 1.0 and self._too_far_for_short_title(
+            expected.get("title", ""), candidate.get("title", "")
+        ):
+            title = 0.0
+        components = [(title, self.title_weight)]
+        components.append(
+            (
+                author_overlap(
+                    expected.get("authors"), candidate.get("authors")
+                ),
+                self.author_weight,
+            )
+        )
+        components.append(
+            (
+                year_proximity(expected.get("year"), candidate.get("year")),
+                self.year_weight,
+            )
+        )
+        if expected.get("venue") and candidate.get("venue"):
+            components.append(
+                (
+                    title_similarity(expected["venue"], candidate["venue"]),
+                    self.venue_weight,
+                )
+            )
+
+        # Unknown components do not count, neither for nor against
+        known = [
+            (value, weight)
+            for value, weight in components
+            if value is not None
+        ]
+        total_weight = sum(weight for _, weight in known)
+        return sum(value * weight for value, weight in known) / total_weight
+
+    def _too_far_for_short_title(self, expected_title, candidate_title):
+        """
+        :return: True if one of the titles is short and the edit distance between them exceeds short_title_max_distance.
+        """
+        expected = normalize_title(expected_title)
+        candidate = normalize_title(candidate_title)
+        if min(len(expected), len(candidate)) >= self.short_title_length:
+            return False
+        return (
+            bounded_levenshtein(
+                expected, candidate, self.short_title_max_distance
+            )
+            > self.short_title_max_distance
+        )
+
+    def _title_floor(self) -> float:
+        """
+        Title similarity under which a candidate cannot reach the reject threshold,
+        even with every other component perfect. Below it, the edit distance is cut off early.
+        """
+        total_weight = (
+            self.title_weight
+            + self.author_weight
+            + self.year_weight
+            + self.venue_weight
+        )
+        return max(
+            0.0,
+            1.0
+            - (1.0 - self.reject_threshold) * total_weight / self.title_weight,
+        )
+
+    def score_many(self, expected, candidates) -> list:
+        """
+        Score many candidates against the same Zotero item.
+
+        :return: A list of (candidate, score) tuples, best first.
+        """
+        scored = [
+            (candidate, self.score(expected, candidate))
+            for candidate in candidates
+        ]
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored
+
+    def accepts(self, score) -> bool:
+        """
+        Whether an opened paper page is kept for a score.
+        """
+        return score >= self.reject_threshold
+
+    def best(self, expected, candidates):
+        """
+        Pick the candidate to open among search results.
+        The best candidate is kept if it reaches the accept threshold, or if it is the only one above the reject threshold.
+
+        :return: A (candidate, score) tuple, or None if no candidate is convincing.
+        """
+        plausible = [
+            pair
+            for pair in self.score_many(expected, candidates)
+            if pair[1] >= self.reject_threshold
+        ]
+        if not plausible:
+            return None
+        if plausible[0][1] >= self.accept_threshold or len(plausible) == 1:
+            return plausible[0]
+        return None
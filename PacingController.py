@@ -0,0 +1,153 @@
+# PacingController.py
+
+import random
+import threading
+import time
+
+
+class PacingController(object):
+    """
+    Adaptive pacing of the actions of a scrapper.
+    A token bucket spaces out page loads, and the human-like delays are scaled with an AIMD policy:
+    the scale decreases additively while the site is healthy and is multiplied when it is not.
+    """
+
+    def __init__(
+        self,
+        min_interval=0.3,
+        adaptive=True,
+        initial_scale=1.0,
+        min_scale=0.25,
+        max_scale=4.0,
+        additive_step=0.05,
+        multiplicative_factor=2.0,
+        slow_response=8.0,
+        sleep=time.sleep,
+    ):
+        """
+        Initializes the PacingController.
+
+        :param min_interval: Minimum seconds between two page loads, at scale 1.
+        :param adaptive: Adapt the scale to the observed signals, otherwise keep the initial scale.
+        :param initial_scale: Initial factor applied to every delay.
+        :param min_scale: Lowest factor reached while the site is healthy.
+        :param max_scale: Highest factor reached while backing off.
+        :param additive_step: Scale decrease after each success.
+        :param multiplicative_factor: Scale multiplier after each error (squared after a browser restart).
+        :param slow_response: Seconds above which a page load counts as a congestion signal.
+        :param sleep: Function used to sleep, can be replaced to scale the delays down in benchmarks.
+        """
+        self.min_interval = min_interval
+        self.adaptive = adaptive
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.additive_step = additive_step
+        self.multiplicative_factor = multiplicative_factor
+        self.slow_response = slow_response
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._scale = initial_scale
+        self._next_allowed = 0.0
+        self._stats = {
+            "sleeps": 0,
+            "slept_seconds": 0.0,
+            "throttled_seconds": 0.0,
+            "successes": 0,
+            "errors": 0,
+            "restarts": 0,
+            "slow_responses": 0,
+            "responses": 0,
+            "response_seconds": 0.0,
+            "max_scale_reached": initial_scale,
+        }
+
+    @property
+    def scale(self) -> float:
+        """
+        The factor currently applied to every delay.
+        """
+        return self._scale
+
+    def sleep(self, min_delay, max_delay):
+        """
+        Sleep a random delay between min_delay and max_delay, multiplied by the current scale.
+        """
+        delay = random.uniform(min_delay, max_delay) * self._scale
+        self._sleep(delay)
+        with self._lock:
+            self._stats["sleeps"] += 1
+            self._stats["slept_seconds"] += delay
+
+    def acquire(self):
+        """
+        Wait for the token of the next page load.
+        """
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self._next_allowed - now)
+            self._next_allowed = (
+                max(now, self._next_allowed) + self.min_interval * self._scale
+            )
+            self._stats["throttled_seconds"] += wait
+        if wait > 0:
+            self._sleep(wait)
+
+    def record_success(self):
+        """
+        The site behaved normally: shrink the delays.
+        """
+        with self._lock:
+            self._stats["successes"] += 1
+            if self.adaptive:
+                self._scale = max(
+                    self.min_scale, self._scale - self.additive_step
+                )
+
+    def record_error(self):
+        """
+        The site returned an error page: back off.
+        """
+        with self._lock:
+            self._stats["errors"] += 1
+            self._back_off(self.multiplicative_factor)
+
+    def record_restart(self):
+        """
+        The browser had to be restarted: back off harder.
+        """
+        with self._lock:
+            self._stats["restarts"] += 1
+            self._back_off(self.multiplicative_factor**2)
+
+    def record_response(self, seconds):
+        """
+        Record the duration of a page load, a slow one counts as a congestion signal.
+        """
+        with self._lock:
+            self._stats["responses"] += 1
+            self._stats["response_seconds"] += seconds
+            if seconds > self.slow_response:
+                self._stats["slow_responses"] += 1
+                self._back_off(self.multiplicative_factor)
+
+    def stats(self) -> dict:
+        """
+        :return: The statistics of the run and the current scale.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats["scale"] = self._scale
+        stats["average_response_seconds"] = (
+            stats["response_seconds"] / stats["responses"]
+            if stats["responses"]
+            else 0.0
+        )
+        return stats
+
+    def _back_off(self, factor):
+        if not self.adaptive:
+            return
+        self._scale = min(self.max_scale, self._scale * factor)
+        self._stats["max_scale_reached"] = max(
+            self._stats["max_scale_reached"], self._scale
+        )
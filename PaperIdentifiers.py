@@ -0,0 +1,132 @@
+# PaperIdentifiers.py
+
+import re
+import unicodedata
+
+_DOI_PREFIXES = (
+    "https://doi.org/",
+    "http://doi.org/",
+    "https://dx.doi.org/",
+    "http://dx.doi.org/",
+    "doi:",
+)
+_DOI_PATTERN = re.compile(r"^10\.\d{4,9}/\S+$")
+_ARXIV_DOI_PATTERN = re.compile(r"^10\.48550/arxiv\.(.+)$", re.IGNORECASE)
+_ARXIV_URL_PATTERN = re.compile(
+    r"arxiv\.org/(?:abs|pdf)/([a-z\-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})",
+    re.IGNORECASE,
+)
+_ARXIV_EXTRA_PATTERN = re.compile(
+    r"arxiv:\s*([a-z\-]+(?:\.[a-z]{2})?/\d{7}|\d{4}\.\d{4,5})",
+    re.IGNORECASE,
+)
+_SEMANTIC_SCHOLAR_URL_PATTERN = re.compile(
+    r"semanticscholar\.org/paper/(?:[^/?#]+/)?([0-9a-f]{40})",
+    re.IGNORECASE,
+)
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]", re.UNICODE)
+_SPACES_PATTERN = re.compile(r"\s+")
+
+
+def normalize_title(title) -> str:
+    """
+    Normalize a title so that the same paper gets the same title whatever its export (case, unicode forms, punctuation).
+
+    :param title: The raw title.
+    :return: The title in NFKC form, lower-cased, without punctuation and with single spaces.
+    """
+    title = unicodedata.normalize("NFKC", str(title or "")).casefold()
+    title = _PUNCTUATION_PATTERN.sub(" ", title)
+    return _SPACES_PATTERN.sub(" ", title).strip()
+
+
+def normalize_doi(doi) -> str:
+    """
+    Normalize a DOI as exported by Zotero (may be a doi.org URL or prefixed by "doi:").
+
+    :param doi: The raw DOI.
+    :return: The lower-cased bare DOI, or an empty string if it is not a valid DOI.
+    """
+    doi = str(doi or "").strip()
+    for prefix in _DOI_PREFIXES:
+        if doi.lower().startswith(prefix):
+            doi = doi[len(prefix) :].strip()
+            break
+    doi = doi.lower()
+    return doi if _DOI_PATTERN.match(doi) else ""
+
+
+def extract_arxiv_id(text) -> str:
+    """
+    Find an arXiv identifier in an arXiv URL, an arXiv DOI or a Zotero "Extra" field ("arXiv: 2101.00001").
+
+    :param text: The text to look into.
+    :return: The arXiv identifier without version, or an empty string if there is none.
+    """
+    text = str(text or "").strip()
+    if not text:
+        return ""
+    match = _ARXIV_DOI_PATTERN.match(normalize_doi(text))
+    if not match:
+        match = _ARXIV_URL_PATTERN.search(text)
+    if not match:
+        match = _ARXIV_EXTRA_PATTERN.search(text)
+    if not match:
+        return ""
+    return re.sub(r"v\d+$", "", match.group(1))
+
+
+def extract_semantic_scholar_id(url) -> str:
+    """
+    Find a Semantic Scholar paper ID in a semanticscholar.org paper URL.
+
+    :param url: The URL to look into.
+    :return: The 40 characters paper ID, or an empty string if there is none.
+    """
+    match = _SEMANTIC_SCHOLAR_URL_PATTERN.search(str(url or ""))
+    return match.group(1).lower() if match else ""
+
+
+def doi_from_ids(paper_ids) -> str:
+    """
+    Find the DOI among identifiers returned by external_ids.
+
+    :param paper_ids: A list of identifiers.
+    :return: The DOI without its "DOI:" prefix, or an empty string if there is none.
+    """
+    return next(
+        (
+            paper_id[len("DOI:") :]
+            for paper_id in paper_ids or []
+            if paper_id.startswith("DOI:")
+        ),
+        "",
+    )
+
+
+def external_ids(doi="", url="", extra="") -> list:
+    """
+    List the identifiers of a Zotero row that Semantic Scholar can resolve, most reliable first.
+    Semantic Scholar paper IDs are returned bare, other identifiers with their prefix ("DOI:", "ARXIV:").
+
+    :param doi: The "DOI" column.
+    :param url: The "Url" column.
+    :param extra: The "Extra" column.
+    :return: A list of identifiers, possibly empty.
+    """
+    ids = []
+    paper_id = extract_semantic_scholar_id(url)
+    if paper_id:
+        ids.append(paper_id)
+
+    normalized_doi = normalize_doi(doi)
+    arxiv_id = (
+        extract_arxiv_id(url)
+        or extract_arxiv_id(extra)
+        or extract_arxiv_id(normalized_doi)
+    )
+    if normalized_doi and not _ARXIV_DOI_PATTERN.match(normalized_doi):
+        ids.append(f"DOI:{normalized_doi}")
+    if arxiv_id:
+        ids.append(f"ARXIV:{arxiv_id}")
+    return ids
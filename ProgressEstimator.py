@@ -0,0 +1,138 @@
+# ProgressEstimator.py
+
+import threading
+
+from WorkPlanner import DEFAULT_SECONDS_PER_ITEM
+
+OUTCOME_SKIPPED = "skipped"
+OUTCOME_CACHED = "cached"
+OUTCOME_SCRAPED = "scraped"
+OUTCOME_FAILED = "failed"
+
+
+class ProgressEstimator(object):
+    """
+    Estimate the remaining time of a run from a separate rate per outcome:
+    skipped items cost nothing, items resolved from the cache are faster than scraped ones,
+    and failed items have their own duration.
+    Each rate is an exponentially weighted moving average, projected on the mix of the remaining items.
+    """
+
+    def __init__(
+        self,
+        nb_items,
+        nb_workers=1,
+        alpha=0.2,
+        default_seconds=DEFAULT_SECONDS_PER_ITEM,
+    ):
+        """
+        Initializes the ProgressEstimator.
+
+        :param nb_items: Number of items to scrap, the skipped items excluded.
+        :param nb_workers: Number of items processed in parallel.
+        :param alpha: Weight of the latest duration in the moving averages.
+        :param default_seconds: Duration of a scraped item before any item has been timed.
+        """
+        self.nb_items = nb_items
+        self.nb_workers = max(1, nb_workers)
+        self.alpha = alpha
+        self.default_seconds = default_seconds
+        self._lock = threading.Lock()
+        self._averages = dict()
+        self._counts = {
+            OUTCOME_SKIPPED: 0,
+            OUTCOME_CACHED: 0,
+            OUTCOME_SCRAPED: 0,
+            OUTCOME_FAILED: 0,
+        }
+        self._expected_cached = 0
+
+    def expect_cached(self, nb_cached):
+        """
+        Set the number of items expected to be resolved from the cache.
+        """
+        with self._lock:
+            self._expected_cached = nb_cached
+
+    def add_items(self, count=1):
+        """
+        Add items to scrap, such as the retries of failed items.
+        """
+        with self._lock:
+            self.nb_items += count
+
+    def skip(self, count=1):
+        """
+        Record items that needed no work, such as the duplicates sent along with another item.
+        """
+        with self._lock:
+            self._counts[OUTCOME_SKIPPED] += count
+
+    def record(self, outcome, seconds):
+        """
+        Record the duration of a scraped item.
+
+        :param outcome: OUTCOME_CACHED, OUTCOME_SCRAPED or OUTCOME_FAILED.
+        :param seconds: The wall time of the item.
+        """
+        with self._lock:
+            self._counts[outcome] += 1
+            average = self._averages.get(outcome)
+            if average is None:
+                self._averages[outcome] = seconds
+            else:
+                self._averages[outcome] = (
+                    self.alpha * seconds + (1.0 - self.alpha) * average
+                )
+
+    def rate(self, outcome) -> float:
+        """
+        :return: The average seconds of an item of an outcome, the one of scraped items if not measured yet.
+        """
+        with self._lock:
+            return self._rate(outcome)
+
+    def _rate(self, outcome):
+        if outcome in self._averages:
+            return self._averages[outcome]
+        return self._averages.get(OUTCOME_SCRAPED, self.default_seconds)
+
+    def remaining_seconds(self) -> float:
+        """
+        :return: The estimated seconds before every item is processed.
+        """
+        with self._lock:
+            done = (
+                self._counts[OUTCOME_CACHED]
+                + self._counts[OUTCOME_SCRAPED]
+                + self._counts[OUTCOME_FAILED]
+            )
+            remaining = max(0, self.nb_items - done)
+            remaining_cached = min(
+                remaining,
+                max(0, self._expected_cached - self._counts[OUTCOME_CACHED]),
+            )
+            remaining_other = remaining - remaining_cached
+
+            # The items not in the cache are scraped or fail in the proportion observed so far
+            attempted = (
+                self._counts[OUTCOME_SCRAPED] + self._counts[OUTCOME_FAILED]
+            )
+            failure_ratio = (
+                self._counts[OUTCOME_FAILED] / attempted if attempted else 0.0
+            )
+            other_seconds = (1.0 - failure_ratio) * self._rate(
+                OUTCOME_SCRAPED
+            ) + failure_ratio * self._rate(OUTCOME_FAILED)
+
+            return (
+                remaining_cached * self._rate(OUTCOME_CACHED)
+                + remaining_other * other_seconds
+            ) / self.nb_workers
+
+    def counts(self) -> dict:
+        """
+        :return: The number of items recorded for each outcome.
+        """
+        with self._lock:
+            return dict(self._counts)
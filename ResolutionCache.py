@@ -0,0 +1,192 @@
+# ResolutionCache.py
+
+import sqlite3
+import threading
+import time
+
+from PaperIdentifiers import normalize_doi, normalize_title
+
+
+class ResolutionCache(object):
+    """
+    On-disk cache of the Semantic Scholar paper found for a title, so that later runs go directly to the paper page.
+    """
+
+    def __init__(
+        self,
+        file_name,
+        ttl=30 * 24 * 3600,
+        max_entries=20000,
+        eviction_interval=50,
+    ):
+        """
+        Initializes the ResolutionCache.
+
+        :param file_name: Path to the SQLite file of the cache.
+        :param ttl: Seconds after which an entry is resolved again.
+        :param max_entries: Maximum number of entries, the least recently used ones are evicted first.
+        :param eviction_interval: Number of insertions between two evictions.
+        """
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._eviction_interval = max(1, eviction_interval)
+        self._nb_puts = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(file_name, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resolutions (
+                    cache_key TEXT PRIMARY KEY,
+                    paper_id TEXT,
+                    paper_url TEXT,
+                    matched_title TEXT,
+                    score REAL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+                """
+            )
+            self._connection.execute(
+                "CREATE INDEX IF NOT EXISTS resolutions_last_used "
+                "ON resolutions (last_used_at)"
+            )
+        self.evict()
+
+    @staticmethod
+    def make_key(title, doi="", year="") -> str:
+        """
+        Build the cache key of a row from its normalized title, DOI and year.
+        """
+        return "|".join(
+            [
+                normalize_title(title),
+                normalize_doi(doi),
+                str(year or "").strip(),
+            ]
+        )
+
+    def get(self, title, doi="", year=""):
+        """
+        Look up the paper resolved for a row.
+
+        :return: A dictionary with paper_id, paper_url, matched_title and score, or None on a miss or an expired entry.
+        """
+        key = self.make_key(title, doi, year)
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT paper_id, paper_url, matched_title, score, created_at "
+                "FROM resolutions WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[4] > self._ttl:
+                with self._connection:
+                    self._connection.execute(
+                        "DELETE FROM resolutions WHERE cache_key = ?", (key,)
+                    )
+                return None
+            with self._connection:
+                self._connection.execute(
+                    "UPDATE resolutions SET last_used_at = ? WHERE cache_key = ?",
+                    (now, key),
+                )
+        return {
+            "paper_id": row[0],
+            "paper_url": row[1],
+            "matched_title": row[2],
+            "score": row[3],
+        }
+
+    def contains(self, title, doi="", year="") -> bool:
+        """
+        Whether a row has an entry that is not expired, without marking it as used.
+        """
+        key = self.make_key(title, doi, year)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT created_at FROM resolutions WHERE cache_key = ?",
+                (key,),
+            ).fetchone()
+        return row is not None and time.time() - row[0] <= self._ttl
+
+    def put(
+        self,
+        title,
+        doi="",
+        year="",
+        paper_id="",
+        paper_url="",
+        matched_title="",
+        score=None,
+    ):
+        """
+        Store the paper resolved for a row.
+
+        :param paper_id: The Semantic Scholar paper ID.
+        :param paper_url: The URL of the paper page.
+        :param matched_title: The title found on the paper page.
+        :param score: The Levenshtein distance between both titles.
+        """
+        if not paper_id and not paper_url:
+            return
+        key = self.make_key(title, doi, year)
+        now = time.time()
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO resolutions "
+                    "(cache_key, paper_id, paper_url, matched_title, score, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        key,
+                        paper_id,
+                        paper_url,
+                        matched_title,
+                        score,
+                        now,
+                        now,
+                    ),
+                )
+            self._nb_puts += 1
+            must_evict = self._nb_puts % self._eviction_interval == 0
+        if must_evict:
+            self.evict()
+
+    def invalidate(self, title, doi="", year=""):
+        """
+        Remove the entry of a row, for instance when the cached paper page does not match anymore.
+        """
+        key = self.make_key(title, doi, year)
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    "DELETE FROM resolutions WHERE cache_key = ?", (key,)
+                )
+
+    def evict(self):
+        """
+        Remove the expired entries and the least recently used ones above max_entries.
+        """
+        with self._lock:
+            with self._connection:
+                self._connection.execute(
+                    "DELETE FROM resolutions WHERE created_at < ?",
+                    (time.time() - self._ttl,),
+                )
+                self._connection.execute(
+                    "DELETE FROM resolutions WHERE cache_key IN ("
+                    "SELECT cache_key FROM resolutions "
+                    "ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                    (self._max_entries,),
+                )
+
+    def close(self):
+        """
+        Evict the outdated entries and close the cache file.
+        """
+        self.evict()
+        with self._lock:
+            self._connection.close()
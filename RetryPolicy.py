@@ -0,0 +1,167 @@
+# RetryPolicy.py
+
+import heapq
+import itertools
+import threading
+import time
+
+# Why a paper could not be found
+FAILURE_NO_RESULTS = "no_results"
+FAILURE_ERROR_PAGE = "error_page"
+FAILURE_TIMEOUT = "timeout"
+FAILURE_BOT_BLOCK = "bot_block"
+FAILURE_TITLE_MISMATCH = "title_mismatch"
+# The page of an identifier says that the paper does not exist
+FAILURE_NOT_FOUND = "not_found"
+# A button was clicked but the page never showed the new state
+FAILURE_UNCONFIRMED = "unconfirmed"
+
+# Failures caused by the state of the site or of the browser, worth retrying later in the run
+TRANSIENT_FAILURES = frozenset(
+    [
+        FAILURE_ERROR_PAGE,
+        FAILURE_TIMEOUT,
+        FAILURE_BOT_BLOCK,
+        FAILURE_UNCONFIRMED,
+    ]
+)
+
+# Failures showing that the site refuses the browser, the only ones counted by the CircuitBreaker.
+# A timeout can be a page that never shows a known element, which a restart does not fix.
+BREAKER_FAILURES = frozenset([FAILURE_ERROR_PAGE, FAILURE_BOT_BLOCK])
+
+
+class CircuitBreaker(object):
+    """
+    Decide when a browser restart is really needed: only after several consecutive error pages,
+    or at once when the site blocks the browser.
+    """
+
+    def __init__(self, failure_threshold=3):
+        """
+        Initializes the CircuitBreaker.
+
+        :param failure_threshold: Number of consecutive error pages that opens the circuit.
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._blocked = False
+
+    def record_success(self):
+        """
+        A paper page was found: the browser is healthy.
+        """
+        with self._lock:
+            self._consecutive_failures = 0
+            self._blocked = False
+
+    def record_failure(self, failure):
+        """
+        Record a failure. Only error pages and bot blocks are counted, see BREAKER_FAILURES.
+        """
+        if failure not in BREAKER_FAILURES:
+            return
+        with self._lock:
+            self._consecutive_failures += 1
+            if failure == FAILURE_BOT_BLOCK:
+                self._blocked = True
+
+    def should_restart(self) -> bool:
+        """
+        :return: True if the circuit is open and the browser should be restarted.
+        """
+        with self._lock:
+            return (
+                self._blocked
+                or self._consecutive_failures >= self.failure_threshold
+            )
+
+    def reset(self):
+        """
+        Close the circuit, after a restart.
+        """
+        self.record_success()
+
+
+class RetryQueue(object):
+    """
+    Items whose failure was transient, retried in a later pass of the run with an exponential backoff.
+    """
+
+    def __init__(
+        self, max_attempts=3, base_delay=30.0, factor=2.0, max_delay=600.0
+    ):
+        """
+        Initializes the RetryQueue.
+
+        :param max_attempts: Maximum number of attempts of an item, the first one included.
+        :param base_delay: Seconds before the first retry of an item.
+        :param factor: Multiplier of the delay after each retry.
+        :param max_delay: Maximum seconds before a retry.
+        """
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.factor = factor
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._heap = []
+        self._counter = itertools.count()
+        self._attempts = dict()
+
+    def defer(self, item, failure):
+        """
+        Schedule a retry of an item, unless its failure is not transient or it has no attempt left.
+
+        :param item: The work item.
+        :param failure: The failure class of its last attempt.
+        :return: The delay before the retry in seconds, or None if the item is not retried.
+        """
+        if failure not in TRANSIENT_FAILURES:
+            return None
+        with self._lock:
+            attempts = self._attempts.get(id(item), 1)
+            if attempts >= self.max_attempts:
+                return None
+            self._attempts[id(item)] = attempts + 1
+            delay = min(
+                self.max_delay, self.base_delay * self.factor ** (attempts - 1)
+            )
+            heapq.heappush(
+                self._heap,
+                (time.monotonic() + delay, next(self._counter), item),
+            )
+        return delay
+
+    def attempts(self, item) -> int:
+        """
+        :return: The number of attempts of an item so far, the running one included.
+        """
+        with self._lock:
+            return self._attempts.get(id(item), 1)
+
+    def pop(self, stop_event=None):
+        """
+        Wait for the earliest item to be due and remove it from the queue.
+
+        :param stop_event: Optional threading.Event interrupting the wait.
+        :return: The item, or None if the queue is empty or the wait was interrupted.
+        """
+        while True:
+            with self._lock:
+                if not self._heap:
+                    return None
+                due, _, item = self._heap[0]
+                wait = due - time.monotonic()
+                if wait <= 0:
+                    heapq.heappop(self._heap)
+                    return item
+            if stop_event is not None:
+                if stop_event.wait(wait):
+                    return None
+            else:
+                time.sleep(wait)
+
+    def __len__(self):
+        with self._lock:
+            return len(self._heap)
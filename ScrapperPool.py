@@ -0,0 +1,300 @@
+# ScrapperPool.py
+
+import collections
+import queue
+import threading
+import time
+
+from RetryPolicy import RetryQueue
+from SemanticScholarScrapper import SemanticScholarScrapper
+
+
+class ScrapperPool(object):
+    """
+    A pool of logged-in SemanticScholarScrapper workers, each one driving its own browser, fed from a shared work queue.
+    """
+
+    def __init__(
+        self,
+        log_file,
+        path,
+        email,
+        password,
+        nb_workers=1,
+        process_item=None,
+        on_item_done=None,
+        on_status=None,
+        login_stagger=10,
+        scrapper_options=None,
+        retry_queue=None,
+        on_item_deferred=None,
+        on_ready=None,
+        lookahead=0,
+        on_prefetch=None,
+    ):
+        """
+        Initializes the ScrapperPool.
+
+        :param log_file: File object for logging, shared by every worker.
+        :param path: Path to the driver and other resources.
+        :param email: User's email used by every worker to log in.
+        :param password: User's password used by every worker to log in.
+        :param nb_workers: Number of browsers running in parallel.
+        :param process_item: Callable (worker_id, scrapper, item) -> result, run for each item.
+        :param on_item_done: Callable (worker_id, item, result), called once an item has been processed.
+        :param on_status: Callable (worker_id, message), called when a worker changes state.
+        :param login_stagger: Seconds between two worker logins, to avoid a burst of sign-ins.
+        :param scrapper_options: Extra keyword arguments given to every SemanticScholarScrapper (resolver, cache...).
+        :param retry_queue: RetryQueue of the items that failed for a transient reason, a default one if None.
+        :param on_item_deferred: Callable (worker_id, item, failure, delay), called when an item is sent to the retry queue.
+        :param on_ready: Callable (worker_id, scrapper), run once by the first worker to log in, before any item is processed.
+        :param lookahead: Number of items each worker takes from the queue ahead of the current one.
+        :param on_prefetch: Callable (worker_id, scrapper, items), called with the items taken ahead before each item,
+            so that the scrapper can start loading their pages.
+        """
+        self._log_file = log_file
+        self._path = path
+        self._email = email
+        self._password = password
+        self._nb_workers = max(1, int(nb_workers))
+        self._process_item = process_item
+        self._on_item_done = on_item_done
+        self._on_status = on_status
+        self._login_stagger = login_stagger
+        self._scrapper_options = scrapper_options or dict()
+        self._retry_queue = (
+            retry_queue if retry_queue is not None else RetryQueue()
+        )
+        self._on_item_deferred = on_item_deferred
+        self._on_ready = on_ready
+        self._ready_claimed = False
+        self._ready_event = threading.Event()
+        self._lookahead = max(0, lookahead)
+        self._on_prefetch = on_prefetch
+        # Items taken ahead by each worker
+        self._reserved = dict()
+
+        self._work_queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._nb_connected = 0
+        self.processed_by_worker = dict()
+
+    def run(self, items) -> bool:
+        """
+        Process every item with the pool and block until the work queue is drained.
+
+        :param items: An iterable of work items handed to process_item.
+        :return: True if at least one worker could log in (or there was nothing to do), False otherwise.
+        """
+        for item in items:
+            self._work_queue.put(item)
+
+        if self._work_queue.empty():
+            return True
+
+        nb_workers = min(self._nb_workers, self._work_queue.qsize())
+        threads = []
+        for worker_id in range(1, nb_workers + 1):
+            self.processed_by_worker[worker_id] = 0
+            thread = threading.Thread(
+                target=self._worker, args=(worker_id,), daemon=True
+            )
+            threads.append(thread)
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        if not self._stop_event.is_set() and not self._work_queue.empty():
+            self._log_file.write(
+                f"Warning - {self._work_queue.qsize()} items were left unprocessed by the workers.\n"
+            )
+        return self._nb_connected > 0
+
+    def stop(self):
+        """
+        Ask every worker to stop after its current item.
+        """
+        self._stop_event.set()
+
+    def remaining(self) -> int:
+        """
+        :return: The number of items that have not been picked by any worker, the deferred ones included.
+        """
+        with self._lock:
+            nb_reserved = sum(len(items) for items in self._reserved.values())
+        return self._work_queue.qsize() + len(self._retry_queue) + nb_reserved
+
+    def _next_item(self, worker_id=None):
+        """
+        :param worker_id: The worker asking, whose items taken ahead come first.
+        :return: The next item of the work queue, or once it is empty the next deferred item when it is due,
+            or None if there is nothing left.
+        """
+        reserved = self._reserved.get(worker_id)
+        if reserved is not None:
+            # Keep lookahead items after the returned one
+            while len(reserved) <= self._lookahead:
+                try:
+                    item = self._work_queue.get_nowait()
+                except queue.Empty:
+                    break
+                with self._lock:
+                    reserved.append(item)
+            if reserved:
+                with self._lock:
+                    return reserved.popleft()
+        try:
+            return self._work_queue.get_nowait()
+        except queue.Empty:
+            return self._retry_queue.pop(self._stop_event)
+
+    def _prepare(self, worker_id, scrapper):
+        """
+        Run on_ready with the first logged-in worker, the other workers wait for it to finish.
+        """
+        with self._lock:
+            claimed = self._ready_claimed
+            self._ready_claimed = True
+        if claimed:
+            self._ready_event.wait()
+            return
+        try:
+            if self._on_ready:
+                self._on_ready(worker_id, scrapper)
+        except Exception as e:
+            self._log_file.write(
+                f"Worker {worker_id} - Unexpected error while preparing: {e}\n"
+            )
+            print(
+                f"Worker {worker_id} - Unexpected error while preparing: {e}"
+            )
+        finally:
+            self._ready_event.set()
+
+    def _report_status(self, worker_id, message):
+        if self._on_status:
+            self._on_status(worker_id, message)
+
+    def _worker(self, worker_id):
+        """
+        Log in with a dedicated browser, then process items from the shared queue until it is empty.
+
+        :param worker_id: Identifier of the worker, starting at 1.
+        """
+        # Spread the sign-ins so that the site does not see N logins at once
+        if self._stop_event.wait((worker_id - 1) * self._login_stagger):
+            return
+
+        scrapper = SemanticScholarScrapper(
+            self._log_file,
+            self._path,
+            email=self._email,
+            password=self._password,
+            **self._scrapper_options,
+        )
+        try:
+            self._report_status(worker_id, "Logging in...")
+            if not scrapper.connect_to_account(self._email, self._password):
+                self._report_status(worker_id, "Unable to log in.")
+                return
+
+            with self._lock:
+                self._nb_connected += 1
+            self._report_status(worker_id, "Connected.")
+            self._prepare(worker_id, scrapper)
+            if self._lookahead:
+                with self._lock:
+                    self._reserved[worker_id] = collections.deque()
+
+            while not self._stop_event.is_set():
+                item = self._next_item(worker_id)
+                if item is None:
+                    break
+                if self._on_prefetch and worker_id in self._reserved:
+                    self._call(
+                        worker_id,
+                        "prefetching",
+                        self._on_prefetch,
+                        worker_id,
+                        scrapper,
+                        list(self._reserved[worker_id]),
+                    )
+
+                start_time = time.time()
+                try:
+                    result = self._process_item(worker_id, scrapper, item)
+                except Exception as e:
+                    self._log_file.write(
+                        f"Worker {worker_id} - Unexpected error: {e}\n"
+                    )
+                    print(f"Worker {worker_id} - Unexpected error: {e}")
+                    result = False
+
+                # A transient failure is retried in a later pass instead of restarting the browser right away
+                failure = scrapper.last_failure
+                delay = self._retry_queue.defer(item, failure)
+                if delay is not None:
+                    self._log_file.write(
+                        f"Worker {worker_id} - Failed ({failure}), retrying in {delay:.0f}s.\n"
+                    )
+                    if self._on_item_deferred:
+                        self._call(
+                            worker_id,
+                            "deferring an item",
+                            self._on_item_deferred,
+                            worker_id,
+                            item,
+                            failure,
+                            delay,
+                        )
+                    continue
+
+                with self._lock:
+                    self.processed_by_worker[worker_id] += 1
+                if self._on_item_done:
+                    self._call(
+                        worker_id,
+                        "ending an item",
+                        self._on_item_done,
+                        worker_id,
+                        item,
+                        result,
+                    )
+                self._log_file.write(
+                    f"Worker {worker_id} - Item processed in {time.time() - start_time:.1f}s.\n"
+                )
+
+            self._report_status(worker_id, "Finished.")
+        finally:
+            self._release_reserved(worker_id)
+            scrapper._close_browser()
+
+    def _call(self, worker_id, action, callback, *args):
+        """
+        Run a callback of the caller, an error of it is logged instead of ending the worker.
+
+        :param action: What the callback does, for logging.
+        """
+        try:
+            callback(*args)
+        except Exception as e:
+            self._log_file.write(
+                f"Worker {worker_id} - Unexpected error while {action}: {e}\n"
+            )
+            print(f"Worker {worker_id} - Unexpected error while {action}: {e}")
+
+    def _release_reserved(self, worker_id):
+        """
+        Hand the items a worker took ahead back to the shared queue, so that another worker processes them.
+        """
+        with self._lock:
+            reserved = self._reserved.pop(worker_id, None)
+        if not reserved:
+            return
+        for item in reserved:
+            self._work_queue.put(item)
+        self._log_file.write(
+            f"Worker {worker_id} - {len(reserved)} items taken ahead handed back to the queue.\n"
+        )
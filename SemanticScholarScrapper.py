@@ -1,14 +1,260 @@
 # SemanticScholarScrapper.py
 
+import hashlib
+import json
 import os
-import random
 import time
+from contextlib import nullcontext
+from urllib.parse import quote, quote_plus
 
-import distance
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 from selenium.webdriver.common.by import By
 from seleniumbase import Driver
 
+from MatchScoring import MatchScorer, bounded_levenshtein
+from PacingController import PacingController
+from PaperIdentifiers import (
+    doi_from_ids,
+    extract_semantic_scholar_id,
+    normalize_title,
+)
+from RetryPolicy import (
+    FAILURE_BOT_BLOCK,
+    FAILURE_ERROR_PAGE,
+    FAILURE_NO_RESULTS,
+    FAILURE_NOT_FOUND,
+    FAILURE_TIMEOUT,
+    FAILURE_TITLE_MISMATCH,
+    FAILURE_UNCONFIRMED,
+    CircuitBreaker,
+)
+
+# Selectors raced while waiting for a search or a paper page
+PAPER_TITLE_SELECTOR = 'h1[data-test-id="paper-detail-title"]'
+SEARCH_RESULTS_SELECTOR = ".dropdown-filters__result-count"
+SEARCH_ERROR_SELECTOR = "#main-content > p.error-message__code"
+SEARCH_NO_RESULTS_SELECTOR = ".result-page__no-results, .search-no-results"
+# A plain text or JSON answer, displayed by the identifier redirect for an identifier it does not know
+PLAIN_TEXT_SELECTOR = "body > pre"
+
+# Selectors raced to check whether a restored session is still signed in
+SIGNED_IN_SELECTOR = '[data-test-id="account-menu"], .account-menu'
+SIGNED_OUT_SELECTOR = (
+    '[data-test-id="header-sign-in-button"], a[href*="/sign-in"]'
+)
+
+# User agent of the browser, sent by every tab
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/115.0.0.0 Safari/537.36"
+)
+
+# Paper links of the library and alerts pages of the account, and their empty state
+ACCOUNT_PAPER_SELECTOR = '#main-content a[href*="/paper/"]'
+ACCOUNT_EMPTY_SELECTOR = ".account-empty, .library-empty, .alerts-empty"
+
+# Resources blocked while scraping: none of them is needed to find the titles and buttons.
+# The document and the first-party scripts of the site are kept.
+BLOCKED_URL_PATTERNS = [
+    "*.png",
+    "*.jpg",
+    "*.jpeg",
+    "*.gif",
+    "*.webp",
+    "*.svg",
+    "*.ico",
+    "*.woff",
+    "*.woff2",
+    "*.ttf",
+    "*.otf",
+    "*.mp4",
+    "*.webm",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*doubleclick.net*",
+    "*facebook.net*",
+    "*hotjar.com*",
+    "*heapanalytics.com*",
+    "*segment.com*",
+    "*segment.io*",
+    "*fullstory.com*",
+    "*nr-data.net*",
+    "*newrelic.com*",
+]
+
+# Words of the pages displayed when the site blocks a browser
+_BOT_BLOCK_SCRIPT = """
+const text = (document.title + ' ' + (document.body ? document.body.innerText.slice(0, 2000) : '')).toLowerCase();
+return ['captcha', 'unusual traffic', 'access denied', 'are you a robot', 'forbidden']
+    .some((word) => text.includes(word));
+"""
+
+# Whether the page says the paper does not exist: a 404 error page, or a "not found" answer of the redirect
+_NOT_FOUND_SCRIPT = """
+const code = document.querySelector(arguments[0]);
+if (code && code.textContent.includes('404')) {
+    return true;
+}
+const text = (document.title + ' ' + (document.body ? document.body.innerText.slice(0, 2000) : '')).toLowerCase();
+return ['not found', 'could not be found', 'does not exist', "doesn't exist"].some((word) => text.includes(word));
+"""
+
+# Return the name of the first [name, selector] pair whose selector matches an element
+_FIRST_PRESENT_SCRIPT = """
+for (const [name, selector] of arguments[0]) {
+    if (document.querySelector(selector)) {
+        return name;
+    }
+}
+return null;
+"""
+
+# Extract the title, authors, year and link of every search result in one call
+_SEARCH_RESULTS_SCRIPT = """
+const results = [];
+document.querySelectorAll('.result-page .cl-paper-title').forEach((title, rank) => {
+    const link = title.closest('a') || title.querySelector('a');
+    const row = title.closest('.cl-paper-row') || title.parentElement;
+    const authors = row ? row.querySelector('.cl-paper-authors') : null;
+    const dates = row ? row.querySelector('.cl-paper-pubdates') : null;
+    const year = dates ? (dates.textContent.match(/\\d{4}/) || [''])[0] : '';
+    if (link && link.href) {
+        results.push({
+            rank: rank + 1,
+            title: title.textContent.trim(),
+            authors: authors ? authors.textContent.trim() : '',
+            year: year,
+            href: link.href,
+        });
+    }
+});
+return results;
+"""
+
+# Extract the title, authors and year of a paper page in one call
+_PAPER_PAGE_SCRIPT = """
+const text = (selector) => {
+    const element = document.querySelector(selector);
+    return element ? element.textContent.trim() : '';
+};
+return {
+    title: text(arguments[0]),
+    authors: text('[data-test-id="author-list"]'),
+    year: text('[data-test-id="paper-year"]'),
+};
+"""
+
+# Extract the paper ID, title, authors and year of every paper link of an account page in one call
+_ACCOUNT_PAPERS_SCRIPT = """
+const papers = {};
+document.querySelectorAll(arguments[0]).forEach((link) => {
+    const match = link.getAttribute('href').match(/\\/paper\\/(?:[^\\/?#]+\\/)?([0-9a-f]{40})/i);
+    if (match && !(match[1].toLowerCase() in papers)) {
+        const row = link.closest('.cl-paper-row') || link.parentElement;
+        const authors = row ? row.querySelector('.cl-paper-authors') : null;
+        const dates = row ? row.querySelector('.cl-paper-pubdates') : null;
+        papers[match[1].toLowerCase()] = {
+            title: link.textContent.trim(),
+            authors: authors ? authors.textContent.trim() : '',
+            year: dates ? (dates.textContent.match(/\\d{4}/) || [''])[0] : '',
+        };
+    }
+});
+return papers;
+"""
+
+# Read the number of papers announced by an account page ("42 papers"), or null if the page shows none
+_ACCOUNT_TOTAL_SCRIPT = """
+const main = document.querySelector('#main-content');
+const match = (main ? main.innerText : '').match(/(\\d[\\d,]*)\\s+(?:papers?|results?|alerts?)\\b/i);
+return match ? parseInt(match[1].replace(/,/g, ''), 10) : null;
+"""
+
+# The alert creation popup and its cancel button
+ALERT_POPUP_SELECTOR = (
+    "html body div#app div.cl-overlay.cl-overlay__content-position--center "
+    "div.cl-overlay__content div.flex-row div.cl-modal__content.cl-modal__centered-offset.alert-modal "
+    "div.alert-modal__content"
+)
+ALERT_POPUP_CANCEL_SELECTOR = (
+    ALERT_POPUP_SELECTOR
+    + " div.alert-modal__alert-information form.create-alert-content "
+    "section.form-buttons button.cl-button.cl-button--no-arrow-divider.cl-button--not-icon-only.cl-button--no-icon.cl-button--has-label.cl-button--font-size-.cl-button--icon-pos-left.cl-button--shape-rectangle.cl-button--size-default.cl-button--type-tertiary.cl-button--density-default "
+    "span.cl-button__label"
+)
+
+# Any modal overlay of the site, the alert creation popup being one of them
+MODAL_OVERLAY_SELECTOR = "div#app div.cl-overlay"
+
+# Cancel the alert creation popup if it is open or opens within a grace period, watched by a MutationObserver,
+# then wait for it to be removed. The wait ends early once the page is loaded without any modal.
+# Reports "canceled", "still_open" or "absent".
+_CANCEL_POPUP_SCRIPT = """
+const [popupSelector, cancelSelector, overlaySelector, graceMs, done] = arguments;
+const waitFor = (check, timeoutMs, callback) => {
+    if (check()) {
+        return callback(true);
+    }
+    const recheck = () => {
+        if (check()) {
+            observer.disconnect();
+            document.removeEventListener('readystatechange', recheck);
+            clearTimeout(timer);
+            callback(true);
+        }
+    };
+    const observer = new MutationObserver(recheck);
+    const timer = setTimeout(() => {
+        observer.disconnect();
+        document.removeEventListener('readystatechange', recheck);
+        callback(false);
+    }, timeoutMs);
+    observer.observe(document.documentElement, {childList: true, subtree: true, attributes: true});
+    document.addEventListener('readystatechange', recheck);
+};
+const noModal = () => document.readyState === 'complete' && !document.querySelector(overlaySelector);
+waitFor(() => document.querySelector(cancelSelector) || noModal(), graceMs, () => {
+    if (!document.querySelector(cancelSelector)) {
+        return done('absent');
+    }
+    document.querySelector(cancelSelector).click();
+    waitFor(() => !document.querySelector(popupSelector), graceMs, (closed) => {
+        done(closed ? 'canceled' : 'still_open');
+    });
+});
+"""
+
+# Click the first button labeled with one of arguments[0], then wait for a label of arguments[1].
+# Reports "already", "confirmed", "unconfirmed" or "missing".
+_CLICK_AND_CONFIRM_SCRIPT = """
+const [clickLabels, doneLabels, timeoutMs, done] = arguments;
+const span = (label) => document.evaluate(
+    `//span[text()="${label}"]`, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null
+).singleNodeValue;
+const isDone = () => doneLabels.some((label) => span(label));
+if (isDone()) {
+    return done('already');
+}
+const button = clickLabels.map(span).find((element) => element);
+if (!button) {
+    return done('missing');
+}
+const observer = new MutationObserver(() => {
+    if (isDone()) {
+        observer.disconnect();
+        clearTimeout(timer);
+        done('confirmed');
+    }
+});
+const timer = setTimeout(() => {
+    observer.disconnect();
+    done(isDone() ? 'confirmed' : 'unconfirmed');
+}, timeoutMs);
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+button.click();
+"""
+
 
 class SemanticScholarScrapper(object):
     """
@@ -20,12 +266,27 @@ class SemanticScholarScrapper(object):
         log_file,
         path,
         timeout=15,
+        poll_interval=0.25,
         time_between_api_call=0.3,
         headless=True,
         site_url="https://www.semanticscholar.org/",
         site_sign_in_url="https://www.semanticscholar.org/sign-in",
+        paper_redirect_url="https://api.semanticscholar.org/",
         email=None,
         password=None,
+        resolver=None,
+        cache=None,
+        pacing=None,
+        persist_session=True,
+        scorer=None,
+        block_resources=True,
+        page_load_strategy="eager",
+        breaker=None,
+        popup_grace=2.0,
+        confirm_timeout=5.0,
+        library_url=None,
+        alerts_url=None,
+        lookahead=0,
     ):
         """
         Initializes the SemanticScholarScrapper.
@@ -33,25 +294,65 @@ class SemanticScholarScrapper(object):
         :param log_file: File object for logging.
         :param path: Path to the driver and other resources.
         :param timeout: Seconds to wait for elements.
-        :param time_between_api_call: Delay between API calls.
+        :param poll_interval: Seconds between two checks while waiting for elements.
+        :param time_between_api_call: Minimum delay between two page loads.
         :param headless: Run browser in headless mode.
         :param site_url: Base URL for Semantic Scholar.
         :param site_sign_in_url: Sign-in URL for Semantic Scholar.
+        :param paper_redirect_url: URL that redirects "DOI:..." or "ARXIV:..." identifiers to their paper page.
         :param email: User's email for re-login.
         :param password: User's password for re-login.
+        :param resolver: Optional GraphApiResolver used to find papers without rendering the search page.
+        :param cache: Optional ResolutionCache remembering the paper page found for each title.
+        :param persist_session: Save the session cookies under path after login and reuse them on the next start.
+        :param scorer: Optional MatchScorer deciding which paper matches a Zotero item.
+        :param block_resources: Block the images, fonts, media and third-party trackers listed in BLOCKED_URL_PATTERNS.
+        :param page_load_strategy: "eager" to return from page loads once the DOM is ready, or "normal" to wait for every resource.
+        :param breaker: Optional CircuitBreaker deciding when the browser is restarted.
+        :param popup_grace: Seconds the alert creation popup is waited for on a paper page.
+        :param confirm_timeout: Seconds to wait for the label of a button to change after clicking it.
+        :param library_url: Page listing the papers of the library, under site_url by default.
+        :param alerts_url: Page listing the papers with an alert, under site_url by default.
+        :param lookahead: Number of the next items whose first page is loaded in background tabs, see prefetch.
+        :param pacing: Optional PacingController, an adaptive one spacing page loads by time_between_api_call by default.
         """
         self._site_url = site_url
         self._site_sign_in_url = site_sign_in_url
+        self._paper_redirect_url = paper_redirect_url
+        self._library_url = library_url or f"{site_url}me/library/all"
+        self._alerts_url = alerts_url or f"{site_url}me/account/alerts"
         self._driver = None
         self._path = path
 
         self._timeout = timeout
+        self._poll_interval = poll_interval
+        self._popup_grace = popup_grace
+        self._lookahead = max(0, lookahead)
+        # URL -> handle of the background tab loading it
+        self._prefetched = dict()
+        self._confirm_timeout = confirm_timeout
         self._time_between_api_call = time_between_api_call
+        self.pacing = pacing or PacingController(
+            min_interval=time_between_api_call
+        )
         self._headless = headless
+        self._block_resources = block_resources
+        self._page_load_strategy = page_load_strategy
         self.is_connected = False
         self.log_file = log_file
         self._email = email  # Store email for re-login
         self._password = password  # Store password for re-login
+        self._resolver = resolver
+        self._cache = cache
+        self._persist_session = persist_session
+        self._scorer = scorer or MatchScorer()
+        self._expected = None
+        self.last_match = None
+        # Failure class (RetryPolicy.FAILURE_*) of the last item that could not be found
+        self.last_failure = None
+        self._breaker = breaker or CircuitBreaker()
+        # Optional ItemTimer of the item being scrapped, set by the caller
+        self.timer = None
 
     def _start_browser(self):
         """
@@ -60,17 +361,18 @@ class SemanticScholarScrapper(object):
         if not self._driver:
             try:
                 # Initialize SeleniumBase Driver with Undetected-Chromedriver
-                self._driver = Driver(uc=True, headless=self._headless)
+                # The user agent is also given at launch, for the background tabs of prefetch
+                self._driver = Driver(
+                    uc=True,
+                    headless=self._headless,
+                    page_load_strategy=self._page_load_strategy,
+                    agent=USER_AGENT,
+                )
 
                 # Set a custom user-agent for stealth
-                custom_user_agent = (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/115.0.0.0 Safari/537.36"
-                )
                 self._driver.execute_cdp_cmd(
                     "Network.setUserAgentOverride",
-                    {"userAgent": custom_user_agent},
+                    {"userAgent": USER_AGENT},
                 )
                 self._driver.execute_script(
                     "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
@@ -95,8 +397,15 @@ class SemanticScholarScrapper(object):
                     """
                 )
 
+                if self._block_resources:
+                    self._block_heavy_resources()
+
                 # Set page load timeout
                 self._driver.set_page_load_timeout(self._timeout)
+                # The popup and button scripts wait in the browser, at most twice the grace period
+                self._driver.set_script_timeout(
+                    2 * self._popup_grace + self._confirm_timeout + 5
+                )
 
                 # Log the browser setup
                 self.log_file.write("Stealth browser initialized.\n")
@@ -107,10 +416,30 @@ class SemanticScholarScrapper(object):
                 print(f"Driver initialization error: {e}\n")
                 raise
 
+    def _block_heavy_resources(self, verbose=True):
+        """
+        Block the resources of BLOCKED_URL_PATTERNS in the current tab.
+        A failure only costs the speed-up, so the browser is kept.
+
+        :param verbose: Log the blocking.
+        """
+        try:
+            self._driver.execute_cdp_cmd("Network.enable", {})
+            self._driver.execute_cdp_cmd(
+                "Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS}
+            )
+            if verbose:
+                self.log_file.write(
+                    f"Blocking {len(BLOCKED_URL_PATTERNS)} resource patterns.\n"
+                )
+        except Exception as e:
+            self.log_file.write(f"Could not block resources: {e}\n")
+
     def _close_browser(self):
         """
         Close the stealth browser.
         """
+        self._prefetched = dict()
         if self._driver:
             self._driver.quit()
             self._driver = None
@@ -119,13 +448,159 @@ class SemanticScholarScrapper(object):
 
     def _random_sleep(self, min_delay=2, max_delay=5):
         """
-        Introduce a random delay to mimic human behavior.
+        Introduce a random delay to mimic human behavior, scaled by the pacing controller.
 
         :param min_delay: Minimum delay in seconds.
         :param max_delay: Maximum delay in seconds.
         """
-        delay = random.uniform(min_delay, max_delay)
-        time.sleep(delay)
+        with self._phase("sleep"):
+            self.pacing.sleep(min_delay, max_delay)
+
+    def _phase(self, name):
+        """
+        :return: A context manager timing a phase of the current item, if it is timed.
+        """
+        if self.timer is None:
+            return nullcontext()
+        return self.timer.phase(name)
+
+    def _load_page(self, url) -> bool:
+        """
+        Navigate to a URL once the pacing controller allows it, and report how long the page took to load.
+        A URL already loading in a background tab is taken from it instead.
+
+        :param url: The URL to open.
+        :return: True if the page was taken from a background tab.
+        """
+        handle = self._prefetched.pop(url, None)
+        if handle is not None and self._switch_to_tab(handle):
+            return True
+        with self._phase("sleep"):
+            self.pacing.acquire()
+        start_time = time.monotonic()
+        self._driver.get(url)
+        self.pacing.record_response(time.monotonic() - start_time)
+        return False
+
+    def prefetch(self, items):
+        """
+        Start loading the first page of the next items in background tabs, so that their page loads
+        overlap the processing of the current item. Only the first lookahead items are loaded,
+        and the tabs of items that are no longer expected are closed.
+
+        :param items: (title, paper_ids, year) tuples of the next items, in their processing order.
+        """
+        if not self._lookahead or not self._driver:
+            return
+        try:
+            urls = [
+                self._first_url(title, paper_ids, year)
+                for title, paper_ids, year in items[: self._lookahead]
+            ]
+            for url in list(self._prefetched):
+                if url not in urls:
+                    self._close_tab(self._prefetched.pop(url))
+            for url in urls:
+                if url in self._prefetched:
+                    continue
+                self.pacing.acquire()
+                current = self._driver.current_window_handle
+                handles = set(self._driver.window_handles)
+                self._driver.execute_script(
+                    "window.open('about:blank', '_blank');"
+                )
+                new_handles = [
+                    handle
+                    for handle in self._driver.window_handles
+                    if handle not in handles
+                ]
+                if not new_handles:
+                    self.log_file.write(
+                        "Warning - Could not open a background tab, prefetching is disabled.\n"
+                    )
+                    self._lookahead = 0
+                    return
+                # A tab is a new target: its user agent and blocking are set before it loads anything
+                self._driver.switch_to.window(new_handles[0])
+                try:
+                    self._configure_tab()
+                    # Only start the navigation, without waiting for the page
+                    self._driver.execute_script(
+                        "window.location.href = arguments[0];", url
+                    )
+                finally:
+                    self._driver.switch_to.window(current)
+                self._prefetched[url] = new_handles[0]
+        except Exception as e:
+            self.log_file.write(f"Error while prefetching: {e}\n")
+
+    def _first_url(self, paper_title, paper_ids=None, year="") -> str:
+        """
+        :return: The first page scrap_paper_by_title is expected to load for an item,
+            without any request: its cached paper page, its resolved paper, its first identifier, or its search page.
+        """
+        paper_ids = list(paper_ids or [])
+        if self._cache:
+            cached = self._cache.get(
+                str(paper_title), doi_from_ids(paper_ids), year
+            )
+            if cached:
+                return self._paper_url(
+                    cached["paper_id"] or cached["paper_url"]
+                )
+        if self._resolver:
+            resolved = self._resolver.known(paper_ids)
+            if resolved:
+                return self._paper_url(resolved[0])
+        if paper_ids:
+            return self._paper_url(paper_ids[0])
+        return self._search_url(str(paper_title))
+
+    def _switch_to_tab(self, handle) -> bool:
+        """
+        Close the current tab and continue in a background tab.
+
+        :return: False if the background tab no longer exists, the current tab is then kept.
+        """
+        try:
+            if handle not in self._driver.window_handles:
+                return False
+            self._driver.close()
+            self._driver.switch_to.window(handle)
+            return True
+        except Exception as e:
+            self.log_file.write(f"Error while switching tab: {e}\n")
+            handles = self._driver.window_handles
+            if handles:
+                self._driver.switch_to.window(handles[0])
+            return False
+
+    def _configure_tab(self):
+        """
+        Apply the user agent and the resource blocking to the current tab, a CDP setting only applies to its tab.
+        """
+        self._driver.execute_cdp_cmd(
+            "Network.setUserAgentOverride", {"userAgent": USER_AGENT}
+        )
+        if self._block_resources:
+            self._block_heavy_resources(verbose=False)
+
+    def _close_tab(self, handle):
+        """
+        Close a background tab and come back to the current one.
+        """
+        current = self._driver.current_window_handle
+        if handle not in self._driver.window_handles:
+            return
+        self._driver.switch_to.window(handle)
+        self._driver.close()
+        self._driver.switch_to.window(current)
+
+    def pacing_stats(self) -> dict:
+        """
+        :return: The pacing statistics of the run (sleeps, errors, restarts, response times, current scale).
+        """
+        return self.pacing.stats()
 
     def connect_to_account(self, email, passwd) -> bool:
         """
@@ -136,9 +611,11 @@ class SemanticScholarScrapper(object):
         :return: True if connected successfully, False otherwise.
         """
         self._start_browser()
+        if self._persist_session and self._restore_session(email):
+            return True
         try:
             # Navigate to sign-in page
-            self._driver.get(self._site_sign_in_url)
+            self._load_page(self._site_sign_in_url)
             self._random_sleep(3, 6)
 
             # Find email input
@@ -167,6 +644,8 @@ class SemanticScholarScrapper(object):
                 self.is_connected = True
                 self.log_file.write("Logged in successfully.\n")
                 print("Logged in successfully.")
+                if self._persist_session:
+                    self._save_session(email)
                 return True
             else:
                 self.log_file.write(
@@ -184,6 +663,181 @@ class SemanticScholarScrapper(object):
             print(f"Unexpected error during login: {e}\n")
             return False
 
+    def _session_file_name(self, email) -> str:
+        """
+        :param email: User's email.
+        :return: The path of the file storing the session cookies of this account.
+        """
+        email_hash = hashlib.md5(str(email).encode("utf-8")).hexdigest()
+        return os.path.join(self._path, f"session_{email_hash[:12]}.json")
+
+    def _save_session(self, email):
+        """
+        Save the cookies of the authenticated session, readable by the current user only.
+
+        :param email: User's email.
+        """
+        file_name = self._session_file_name(email)
+        try:
+            cookies = self._driver.get_cookies()
+            temp_file_name = file_name + ".tmp"
+            with open(
+                os.open(
+                    temp_file_name,
+                    os.O_WRONLY | os.O_CREAT | os.O_TRUNC,
+                    0o600,
+                ),
+                "w",
+                encoding="utf-8",
+            ) as f:
+                json.dump(cookies, f)
+            os.replace(temp_file_name, file_name)
+            self.log_file.write("Session saved.\n")
+        except Exception as e:
+            self.log_file.write(f"Unable to save the session: {e}\n")
+            print(f"Unable to save the session: {e}")
+
+    def _restore_session(self, email) -> bool:
+        """
+        Reuse the cookies saved by a previous login, and check that the session is still signed in.
+
+        :param email: User's email.
+        :return: True if the restored session is signed in, False if a full login is needed.
+        """
+        file_name = self._session_file_name(email)
+        if not os.path.isfile(file_name):
+            return False
+        try:
+            with open(file_name, "r", encoding="utf-8") as f:
+                cookies = json.load(f)
+
+            # Cookies can only be added on a page of their domain
+            self._load_page(self._site_url)
+            for cookie in cookies:
+                if cookie.get("sameSite") not in ("Strict", "Lax", "None"):
+                    cookie.pop("sameSite", None)
+                try:
+                    self._driver.add_cookie(cookie)
+                except Exception:
+                    continue
+            self._load_page(self._site_url)
+
+            fired = self._wait_for_any(
+                [
+                    ("signed_in", SIGNED_IN_SELECTOR),
+                    ("signed_out", SIGNED_OUT_SELECTOR),
+                ],
+                "Checking the saved session.",
+            )
+        except Exception as e:
+            self.log_file.write(f"Unable to restore the session: {e}\n")
+            print(f"Unable to restore the session: {e}")
+            fired = None
+
+        if fired == "signed_in":
+            self.is_connected = True
+            self.log_file.write("Logged in with the saved session.\n")
+            print("Logged in with the saved session.")
+            return True
+
+        self.log_file.write("The saved session has expired.\n")
+        print("The saved session has expired.")
+        try:
+            os.remove(file_name)
+        except OSError:
+            pass
+        return False
+
+    def scrap_library(self):
+        """
+        List the papers saved in the library of the account.
+
+        :return: A tuple ({paper ID: paper}, complete), see _scrap_account_papers.
+        """
+        return self._scrap_account_papers(self._library_url, "library")
+
+    def scrap_alerts(self):
+        """
+        List the papers on which the account has an alert.
+
+        :return: A tuple ({paper ID: paper}, complete), see _scrap_account_papers.
+        """
+        return self._scrap_account_papers(self._alerts_url, "alerts")
+
+    def _scrap_account_papers(self, url, name, max_pages=100):
+        """
+        Read the paper links of an account page, following its pages (?page=2...) until a page brings no new paper.
+        The listing is complete when every announced paper was read, or when the last page was reached:
+        an empty page, or a page shorter than the first one. A page repeating the papers already read
+        can be a site ignoring the page parameter, the listing is then not known to be complete.
+
+        :param url: The first page.
+        :param name: Name of the page for logging.
+        :param max_pages: Maximum number of pages read.
+        :return: A tuple ({paper ID: {"title", "authors", "year"}}, complete),
+            the papers being None if the first page could not be read.
+        """
+        papers = dict()
+        read_pages = 0
+        complete = False
+        total = None
+        page_size = 0
+        for page in range(1, max_pages + 1):
+            page_url = (
+                url
+                if page == 1
+                else f"{url}{'&' if '?' in url else '?'}page={page}"
+            )
+            try:
+                self._load_page(page_url)
+            except Exception as e:
+                self.log_file.write(f"Error while reading the {name}: {e}\n")
+                break
+            fired = self._wait_for_any(
+                [
+                    ("papers", ACCOUNT_PAPER_SELECTOR),
+                    ("empty", ACCOUNT_EMPTY_SELECTOR),
+                    ("error", SEARCH_ERROR_SELECTOR),
+                ],
+                f"Unable to read page {page} of the {name}.",
+            )
+            if fired is None or fired == "error":
+                break
+            read_pages += 1
+            if fired == "empty":
+                complete = True
+                break
+            if total is None:
+                total = self._driver.execute_script(_ACCOUNT_TOTAL_SCRIPT)
+            found = self._driver.execute_script(
+                _ACCOUNT_PAPERS_SCRIPT, ACCOUNT_PAPER_SELECTOR
+            )
+            new_papers = {
+                paper_id: paper
+                for paper_id, paper in (found or {}).items()
+                if paper_id not in papers
+            }
+            if not new_papers:
+                break
+            papers.update(new_papers)
+            if page == 1:
+                page_size = len(new_papers)
+            elif len(found) < page_size:
+                complete = True
+                break
+
+        if total is not None:
+            complete = len(papers) >= total
+        if read_pages == 0:
+            self.log_file.write(f"Could not read the {name} of the account.\n")
+            print(f"Could not read the {name} of the account.")
+            return None, False
+        self.log_file.write(
+            f"Read {len(papers)} papers from the {name} in {read_pages} pages"
+            f"{'' if complete else ', the listing may be partial'}.\n"
+        )
+        return papers, complete
+
     def scrap_paper_list_by_title(self, paper_title_list: list) -> dict:
         """
         Given a list of paper titles, retrieve their data from Semantic Scholar.
@@ -210,20 +864,127 @@ class SemanticScholarScrapper(object):
         return papers_dict
 
     def scrap_paper_by_title(
-        self, paper_title: str, call_browser=True
+        self,
+        paper_title: str,
+        call_browser=True,
+        paper_ids=None,
+        year="",
+        authors="",
+        venue="",
     ) -> bool:
         """
         Given a paper title, retrieve its data from Semantic Scholar.
+        A paper page found by a previous run is reused from the cache. Otherwise the paper is resolved over HTTP
+        when a resolver is set, then, when identifiers are given, the paper page is opened directly and the title
+        search is only a fallback.
 
         :param paper_title: A paper title.
         :param call_browser: Start the browser if not already started.
+        :param paper_ids: Identifiers returned by PaperIdentifiers.external_ids.
+        :param year: Publication year, part of the cache key.
+        :param authors: Zotero author list ("Last, First; Last2, First2"), used to score the candidates.
+        :param venue: Publication title, used to score the candidates.
         :return: True if successful, False otherwise.
         """
         if call_browser:
             self._start_browser()
 
+        self.last_failure = None
+        if self._breaker.should_restart():
+            self.log_file.write(
+                "Restarting the browser after repeated failures.\n"
+            )
+            if self._restart_and_relogin():
+                self._breaker.reset()
+
+        self._expected = {
+            "title": str(paper_title),
+            "authors": authors,
+            "year": year,
+            "venue": venue,
+        }
+
+        if not self._cache:
+            return self._find_paper(paper_title, paper_ids)
+
+        doi = doi_from_ids(paper_ids)
+        cached = self._cache.get(str(paper_title), doi, year)
+        if cached:
+            if self._open_paper_by_id(
+                cached["paper_id"] or cached["paper_url"]
+            ) and self._check_paper_page(str(paper_title)):
+                self.log_file.write(
+                    f"Resolved {paper_title} from the cache.\n"
+                )
+                self.last_match["source"] = "cache"
+                return True
+            self._cache.invalidate(str(paper_title), doi, year)
+
+        if not self._find_paper(paper_title, paper_ids):
+            return False
+
+        paper_url = self.last_match["paper_url"]
+        self._cache.put(
+            str(paper_title),
+            doi,
+            year,
+            paper_id=extract_semantic_scholar_id(paper_url),
+            paper_url=paper_url,
+            matched_title=self.last_match["title"],
+            score=self.last_match["score"],
+        )
+        return True
+
+    def _paper_url(self, paper_id) -> str:
+        """
+        :param paper_id: A Semantic Scholar paper ID, a prefixed identifier such as "DOI:..." or "ARXIV:...",
+            or the URL of a paper page.
+        :return: The URL opening the paper page of the identifier.
+        """
+        if paper_id.startswith("http"):
+            return paper_id
+        if ":" in paper_id:
+            return self._paper_redirect_url + quote(paper_id, safe=":/")
+        return f"{self._site_url}paper/{paper_id}"
+
+    def _search_url(self, paper_title) -> str:
+        """
+        :return: The URL of the search page of a title.
+        """
+        return f"{self._site_url}search?q={quote_plus(paper_title)}&sort=relevance"
+
+    def _find_paper(self, paper_title, paper_ids=None) -> bool:
+        """
+        Open the paper page of a title, with the resolver, the identifiers, then the search page.
+
+        :param paper_title: A paper title.
+        :param paper_ids: Identifiers returned by PaperIdentifiers.external_ids.
+        :return: True if the opened paper page matches the title, False otherwise.
+        """
+        if self._resolver:
+            with self._phase("resolve"):
+                resolved = self._resolver.resolve(str(paper_title), paper_ids)
+            if resolved:
+                if self._open_paper_by_id(
+                    resolved[0]
+                ) and self._check_paper_page(str(paper_title)):
+                    return True
+            self.log_file.write(
+                f"Could not resolve {paper_title} with the Graph API, falling back to the browser.\n"
+            )
+
+        for paper_id in paper_ids or []:
+            if self._open_paper_by_id(paper_id) and self._check_paper_page(
+                str(paper_title)
+            ):
+                return True
+            self.log_file.write(
+                f"Could not open {paper_id} directly, falling back to search.\n"
+            )
+
         # Use the updated method without unsupported `uc_open_with_reconnect`
-        self._search_paper_by_name(str(paper_title))
+        with self._phase("search"):
+            self._search_paper_by_name(str(paper_title))
         has_opened = self._open_first_link_in_search_page()
 
         if not has_opened:
@@ -231,10 +992,96 @@ class SemanticScholarScrapper(object):
 
         return self._check_paper_page(str(paper_title))
 
+    def _open_paper_by_id(self, paper_id) -> bool:
+        """
+        Navigate directly to the paper page of an identifier.
+
+        :param paper_id: A Semantic Scholar paper ID, a prefixed identifier such as "DOI:..." or "ARXIV:...",
+            or the URL of a paper page.
+        :return: True if the navigation succeeded, False otherwise.
+        """
+        paper_url = self._paper_url(paper_id)
+        try:
+            with self._phase("open"):
+                if not self._load_page(paper_url):
+                    self._random_sleep()
+            self.log_file.write(f"Opened paper page for: {paper_id}\n")
+            print(f"Opened paper page for: {paper_id}")
+            return True
+        except Exception as e:
+            self.log_file.write(
+                f"Error while opening paper page for {paper_id}: {e}\n"
+            )
+            print(f"Error while opening paper page for {paper_id}: {e}")
+            return False
+
+    def open_paper(self, paper_id) -> bool:
+        """
+        Open the paper page of a known paper, without any search, and wait for it to be displayed.
+
+        :param paper_id: A Semantic Scholar paper ID.
+        :return: True if the paper page is displayed, False otherwise.
+        """
+        if not self._open_paper_by_id(paper_id):
+            return False
+        with self._phase("results_wait"):
+            fired = self._wait_for_any(
+                [
+                    ("paper", PAPER_TITLE_SELECTOR),
+                    ("error", SEARCH_ERROR_SELECTOR),
+                ],
+                f"Unable to open the paper {paper_id}.",
+            )
+        return fired == "paper"
+
+    def _classify_failure(self, fired) -> str:
+        """
+        :param fired: The condition met while waiting for a page, None after a timeout.
+        :return: The failure class of the page: bot block, paper not found, error page or timeout.
+        """
+        try:
+            if self._driver.execute_script(_BOT_BLOCK_SCRIPT):
+                return FAILURE_BOT_BLOCK
+            if self._driver.execute_script(
+                _NOT_FOUND_SCRIPT, SEARCH_ERROR_SELECTOR
+            ):
+                return FAILURE_NOT_FOUND
+        except Exception:
+            pass
+        if fired == "plain_text":
+            # An answer of the redirect that is not a paper page
+            return FAILURE_NOT_FOUND
+        return FAILURE_ERROR_PAGE if fired == "error" else FAILURE_TIMEOUT
+
+    def _recover(self, failure, retry_on_fail=True) -> bool:
+        """
+        Record a failure of the search page. The browser is only restarted, and the search retried,
+        once the circuit breaker considers the browser unhealthy; otherwise the item is left to the retry queue.
+
+        :param failure: The failure class.
+        :param retry_on_fail: Allow a restart and a new search.
+        :return: True if the retried search opened a paper, False otherwise.
+        """
+        self.last_failure = failure
+        self._breaker.record_failure(failure)
+        if not retry_on_fail or not self._breaker.should_restart():
+            return False
+        self.log_file.write(
+            f"Restarting the browser after repeated failures ({failure}).\n"
+        )
+        if not self._restart_and_relogin():
+            return False
+        self._breaker.reset()
+        # Retry the last search
+        self.log_file.write("Retrying last search after re-login...\n")
+        print("Retrying last search after re-login...")
+        return self._search_and_open_retry()
+
     def _search_and_open_retry(self) -> bool:
         """
         Retry the search and attempt to open the first link after restarting and re-logging in.
         """
+        self.last_failure = None
         try:
             # Retry the last search with the same title
             if hasattr(self, "_last_search_title"):
@@ -242,7 +1089,10 @@ class SemanticScholarScrapper(object):
                     f"Retrying search for: {self._last_search_title}\n"
                 )
                 print(f"Retrying search for: {self._last_search_title}")
-                self._search_paper_by_name(self._last_search_title)
+                if self.timer is not None:
+                    self.timer.retries += 1
+                with self._phase("search"):
+                    self._search_paper_by_name(self._last_search_title)
                 return self._open_first_link_in_search_page(
                     retry_on_fail=False
                 )
@@ -267,9 +1117,9 @@ class SemanticScholarScrapper(object):
             self._last_search_title = (
                 paper_title  # Save the title for retry purposes
             )
-            search_url = f"https://www.semanticscholar.org/search?q={paper_title}&sort=relevance"
-            self._driver.get(search_url)
-            self._random_sleep(3, 6)
+            # A page taken from a background tab is already loaded
+            if not self._load_page(self._search_url(paper_title)):
+                self._random_sleep(3, 6)
             self.log_file.write(f"Search initiated for: {paper_title}\n")
             print(f"Search initiated for: {paper_title}")
         except Exception as e:
@@ -280,14 +1130,37 @@ class SemanticScholarScrapper(object):
 
     def _open_first_link_in_search_page(self, retry_on_fail=True) -> bool:
         """
-        On the search page, navigate to the first paper link.
-        If a semantic error is encountered, restart the browser and re-log in, then retry the search.
+        On the search page, navigate to the result whose title matches best the searched title,
+        or to the first paper link if the results could not be extracted.
+        A failure is classified in self.last_failure. The browser is only restarted, and the search retried,
+        when the circuit breaker opens; otherwise the item is retried later by the ScrapperPool.
         """
-        has_find = self._wait_element_by_class_name(
-            "dropdown-filters__result-count", "Waiting for search results."
-        )
+        with self._phase("results_wait"):
+            fired = self._wait_for_any(
+                [
+                    ("paper", PAPER_TITLE_SELECTOR),
+                    ("results", SEARCH_RESULTS_SELECTOR),
+                    ("error", SEARCH_ERROR_SELECTOR),
+                    ("no_results", SEARCH_NO_RESULTS_SELECTOR),
+                ],
+                "Waiting for search results.",
+            )
+
+        if fired == "paper":
+            # The search went straight to the paper page
+            return True
 
-        if not has_find:
+        if fired == "no_results":
+            self.last_failure = FAILURE_NO_RESULTS
+            self.log_file.write(
+                f"No results found for: {self._last_search_title}\n"
+            )
+            print(f"No results found for: {self._last_search_title}")
+            return False
+
+        if fired != "results":
+            self.pacing.record_error()
+            failure = self._classify_failure(fired)
             # Check for error message
             try:
                 error_message = self._driver.find_element(
@@ -307,17 +1180,36 @@ class SemanticScholarScrapper(object):
                     "Could not find papers. No specific error message was returned. Retrying..."
                 )
 
-            # Restart the browser and re-login
-            if retry_on_fail:
-                if self._restart_and_relogin():
-                    # Retry the last search
-                    self.log_file.write(
-                        "Retrying last search after re-login...\n"
-                    )
-                    print("Retrying last search after re-login...")
-                    return self._search_and_open_retry()
+            return self._recover(failure, retry_on_fail)
 
-            return False
+        candidates = self._collect_search_results()
+        if candidates:
+            best = self._scorer.best(
+                self._expected_for(self._last_search_title), candidates
+            )
+            if best is None:
+                self.log_file.write(
+                    f"None of the {len(candidates)} search results matches: {self._last_search_title}\n"
+                )
+                print(
+                    f"None of the {len(candidates)} search results matches: {self._last_search_title}"
+                )
+                self.last_failure = FAILURE_TITLE_MISMATCH
+                return False
+
+            candidate, score = best
+            self.log_file.write(
+                f"Opening search result {candidate['rank']}: {candidate['title']} (score: {score:.2f}).\n"
+            )
+            self._random_sleep()
+            try:
+                with self._phase("open"):
+                    self._load_page(candidate["href"])
+                return True
+            except Exception as e:
+                self.log_file.write(
+                    f"Error while opening the search result: {e}. Trying the first link...\n"
+                )
 
         try:
             papers_div = self._driver.find_element(
@@ -334,10 +1226,11 @@ class SemanticScholarScrapper(object):
             self._random_sleep()
 
             # Use JavaScript to click to avoid interception
-            self._driver.execute_script(
-                "arguments[0].click();", first_paper_link
-            )
-            self._random_sleep()
+            with self._phase("open"):
+                self._driver.execute_script(
+                    "arguments[0].click();", first_paper_link
+                )
+                self._random_sleep()
             return True
         except NoSuchElementException as e:
             self.log_file.write(
@@ -347,17 +1240,7 @@ class SemanticScholarScrapper(object):
                 f"Error: Could not find the first paper link: {e}. Retrying..."
             )
 
-            # Restart the browser and re-login
-            if retry_on_fail:
-                if self._restart_and_relogin():
-                    # Retry the last search
-                    self.log_file.write(
-                        "Retrying last search after re-login...\n"
-                    )
-                    print("Retrying last search after re-login...")
-                    return self._search_and_open_retry()
-
-            return False
+            return self._recover(FAILURE_ERROR_PAGE, retry_on_fail)
         except Exception as e:
             self.log_file.write(
                 f"Unexpected error when clicking the first paper link: {e}. Retrying...\n"
@@ -366,77 +1249,141 @@ class SemanticScholarScrapper(object):
                 f"Unexpected error when clicking the first paper link: {e}. Retrying..."
             )
 
-            # Restart the browser and re-login
-            if retry_on_fail:
-                if self._restart_and_relogin():
-                    # Retry the last search
-                    self.log_file.write(
-                        "Retrying last search after re-login...\n"
-                    )
-                    print("Retrying last search after re-login...")
-                    return self._search_and_open_retry()
+            return self._recover(FAILURE_ERROR_PAGE, retry_on_fail)
 
-            return False
+    def _collect_search_results(self) -> list:
+        """
+        Extract every result of the search page with a single script.
+
+        :return: A list of dictionaries with rank, title, authors, year and href, empty if the extraction failed.
+        """
+        try:
+            return self._driver.execute_script(_SEARCH_RESULTS_SCRIPT) or []
+        except Exception as e:
+            self.log_file.write(f"Unable to extract the search results: {e}\n")
+            return []
+
+    def _expected_for(self, paper_title) -> dict:
+        """
+        :return: The fields of the Zotero item being scrapped, or only its title if it is unknown.
+        """
+        if self._expected and self._expected["title"] == str(paper_title):
+            return self._expected
+        return {"title": str(paper_title)}
 
     def _check_paper_page(self, paper_title) -> bool:
         """
-        Verify if the opened paper page corresponds to the searched title.
+        Verify if the opened paper page corresponds to the searched item, timed as the "title_check" phase.
+        """
+        with self._phase("title_check"):
+            return self._verify_paper_page(paper_title)
+
+    def _verify_paper_page(self, paper_title) -> bool:
+        """
+        Verify if the opened paper page corresponds to the searched item, by scoring its title, authors and year.
 
         :param paper_title: The title of the paper to verify.
-        :return: True if the titles match within a Levenshtein distance of 10, else False.
+        :return: True if the score reaches the reject threshold of the scorer, else False.
+            On success, the found title, the Levenshtein distance of the normalized titles,
+            the score and the page URL are kept in self.last_match.
         """
-        if not self._wait_element_by_tag_name(
-            "h1", "Waiting for paper title."
-        ):
+        fired = self._wait_for_any(
+            [
+                ("title", PAPER_TITLE_SELECTOR),
+                ("error", SEARCH_ERROR_SELECTOR),
+                ("plain_text", PLAIN_TEXT_SELECTOR),
+            ],
+            "Waiting for paper title.",
+        )
+        if fired != "title":
+            self.last_failure = self._classify_failure(fired)
+            if self.last_failure == FAILURE_NOT_FOUND:
+                # An identifier unknown to Semantic Scholar, the title search is the fallback
+                self.log_file.write(
+                    "The paper of this identifier is not known.\n"
+                )
+                return False
+            if fired == "error":
+                self.pacing.record_error()
+            self._breaker.record_failure(self.last_failure)
             return False
 
         try:
-            h1 = self._driver.find_element(
-                By.CSS_SELECTOR, 'h1[data-test-id="paper-detail-title"]'
+            paper = self._driver.execute_script(
+                _PAPER_PAGE_SCRIPT, PAPER_TITLE_SELECTOR
             )
-            title = h1.text
-            distance_score = distance.levenshtein(str(paper_title), title)
-            if not (0 <= distance_score <= 10):
+            title = paper["title"]
+            score = self._scorer.score(self._expected_for(paper_title), paper)
+            if not self._scorer.accepts(score):
                 self.log_file.write(
-                    f"{paper_title} does not match the found title {title} (Levenshtein distance: {distance_score}).\n"
+                    f"{paper_title} does not match the found title {title} (score: {score:.2f}).\n"
                 )
+                self.last_failure = FAILURE_TITLE_MISMATCH
                 return False
             self.log_file.write(
-                f"Title matched: {title} (Levenshtein distance: {distance_score}).\n"
+                f"Title matched: {title} (score: {score:.2f}).\n"
             )
+            self.pacing.record_success()
+            self._breaker.record_success()
+            self.last_failure = None
+            expected_title = normalize_title(paper_title)
+            found_title = normalize_title(title)
+            self.last_match = {
+                "title": title,
+                "score": bounded_levenshtein(
+                    expected_title,
+                    found_title,
+                    max(len(expected_title), len(found_title)),
+                ),
+                "confidence": score,
+                "paper_url": self._driver.current_url,
+            }
             return True
-        except NoSuchElementException as e:
-            self.log_file.write(f"Error finding paper title: {e}\n")
-            return False
         except Exception as e:
             self.log_file.write(
                 f"Unexpected error while verifying paper title: {e}\n"
             )
             return False
 
-    def _wait_element_by_tag_name(self, tag_name, msg="") -> bool:
+    def _wait_for_any(self, conditions, msg=""):
         """
-        Wait until an element with the specified tag name is present.
+        Wait until one of several elements is present, checking all of them with a single script per poll,
+        so that an error page fails as soon as it is displayed instead of after the whole timeout.
 
-        :param tag_name: The tag name to wait for.
+        :param conditions: A list of (name, CSS selector) pairs, checked in order.
         :param msg: Optional message for logging.
-        :return: True if element is found, False otherwise.
+        :return: The name of the first condition met, or None if none is met within the timeout.
         """
+        selectors = ", ".join(selector for _, selector in conditions)
+        deadline = time.monotonic() + self._timeout
         try:
-            for _ in range(self._timeout):
-                elements = self._driver.find_elements(By.TAG_NAME, tag_name)
-                if elements:
-                    return True
-                time.sleep(1)
-            self.log_file.write(
-                f"Error - {msg} Could not find tag {tag_name}\n"
-            )
-            return False
+            while True:
+                fired = self._driver.execute_script(
+                    _FIRST_PRESENT_SCRIPT,
+                    [[name, selector] for name, selector in conditions],
+                )
+                if fired:
+                    return fired
+                if time.monotonic() >= deadline:
+                    break
+                time.sleep(self._poll_interval)
+            self.log_file.write(f"Error - {msg} Could not find {selectors}\n")
+            return None
         except Exception as e:
             self.log_file.write(
-                f"Error - {msg} {e} - could not find tag {tag_name}\n"
+                f"Error - {msg} {e} - could not find {selectors}\n"
             )
-            return False
+            return None
+
+    def _wait_element_by_tag_name(self, tag_name, msg="") -> bool:
+        """
+        Wait until an element with the specified tag name is present.
+
+        :param tag_name: The tag name to wait for.
+        :param msg: Optional message for logging.
+        :return: True if element is found, False otherwise.
+        """
+        return self._wait_for_any([(tag_name, tag_name)], msg) is not None
 
     def _wait_element_by_name(self, name, msg="") -> bool:
         """
@@ -446,19 +1393,9 @@ class SemanticScholarScrapper(object):
         :param msg: Optional message for logging.
         :return: True if element is found, False otherwise.
         """
-        try:
-            for _ in range(self._timeout):
-                elements = self._driver.find_elements(By.NAME, name)
-                if elements:
-                    return True
-                time.sleep(1)
-            self.log_file.write(f"Error - {msg} Could not find name {name}\n")
-            return False
-        except Exception as e:
-            self.log_file.write(
-                f"Error - {msg} {e} - could not find name {name}\n"
-            )
-            return False
+        return (
+            self._wait_for_any([(name, f'[name="{name}"]')], msg) is not None
+        )
 
     def _wait_element_by_class_name(self, class_name, msg="") -> bool:
         """
@@ -468,152 +1405,211 @@ class SemanticScholarScrapper(object):
         :param msg: Optional message for logging.
         :return: True if element is found, False otherwise.
         """
-        try:
-            for _ in range(self._timeout):
-                elements = self._driver.find_elements(
-                    By.CLASS_NAME, class_name
-                )
-                if elements:
-                    return True
-                time.sleep(1)
-            self.log_file.write(
-                f"Error - {msg} Could not find class {class_name}\n"
-            )
-            return False
-        except Exception as e:
-            self.log_file.write(
-                f"Error - {msg} {e} - could not find class {class_name}\n"
-            )
-            return False
+        return (
+            self._wait_for_any([(class_name, f".{class_name}")], msg)
+            is not None
+        )
 
     def cancel_create_paper_alert(self):
         """
         If the popup for creating a paper alert is open, click the cancel button to dismiss it.
+        The popup is watched for by the browser during popup_grace seconds, or until the page is loaded
+        without any modal, and its removal is confirmed.
         """
         try:
-            # Check if the popup is present
-            popup_selector = (
-                "html body div#app div.cl-overlay.cl-overlay__content-position--center "
-                "div.cl-overlay__content div.flex-row div.cl-modal__content.cl-modal__centered-offset.alert-modal "
-                "div.alert-modal__content"
-            )
-            cancel_button_selector = (
-                "html body div#app div.cl-overlay.cl-overlay__content-position--center "
-                "div.cl-overlay__content div.flex-row div.cl-modal__content.cl-modal__centered-offset.alert-modal "
-                "div.alert-modal__content div.alert-modal__alert-information form.create-alert-content "
-                "section.form-buttons button.cl-button.cl-button--no-arrow-divider.cl-button--not-icon-only.cl-button--no-icon.cl-button--has-label.cl-button--font-size-.cl-button--icon-pos-left.cl-button--shape-rectangle.cl-button--size-default.cl-button--type-tertiary.cl-button--density-default "
-                "span.cl-button__label"
-            )
-
-            # Wait for the popup to appear
-            for _ in range(self._timeout):
-                try:
-                    popup = self._driver.find_element(
-                        By.CSS_SELECTOR, popup_selector
-                    )
-                    cancel_button = self._driver.find_element(
-                        By.CSS_SELECTOR, cancel_button_selector
-                    )
-                    self._driver.execute_script(
-                        "arguments[0].click();", cancel_button
-                    )
-                    self.log_file.write(
-                        "Alert creation popup canceled successfully.\n"
-                    )
-                    print("Alert creation popup canceled successfully.")
-                    self._random_sleep()
-                    return
-                except NoSuchElementException:
-                    time.sleep(1)
-            print("No alert creation popup detected.")
-            self.log_file.write("No alert creation popup detected.\n")
-
+            state = self._driver.execute_async_script(
+                _CANCEL_POPUP_SCRIPT,
+                ALERT_POPUP_SELECTOR,
+                ALERT_POPUP_CANCEL_SELECTOR,
+                MODAL_OVERLAY_SELECTOR,
+                int(self._popup_grace * 1000),
+            )
         except Exception as e:
             self.log_file.write(
                 f"Error while canceling alert creation popup: {e}\n"
             )
             print(f"Error while canceling alert creation popup: {e}")
+            return
+
+        if state == "canceled":
+            self.log_file.write(
+                "Alert creation popup canceled successfully.\n"
+            )
+            print("Alert creation popup canceled successfully.")
+        elif state == "still_open":
+            self.log_file.write(
+                "Warning - The alert creation popup is still open after canceling it.\n"
+            )
+            print(
+                "Warning - The alert creation popup is still open after canceling it."
+            )
+        else:
+            print("No alert creation popup detected.")
+            self.log_file.write("No alert creation popup detected.\n")
+
+    def _click_and_confirm(self, click_labels, done_labels):
+        """
+        Click the first button whose label is in click_labels, then wait for a label of done_labels to be displayed,
+        everything in a single script.
+
+        :param click_labels: Labels of the button to click, tried in order.
+        :param done_labels: Labels displayed once the action is done.
+        :return: "already" if a done label was displayed before any click, "confirmed" if one was displayed after the click,
+            "unconfirmed" if none was within confirm_timeout, or "missing" if no button was found.
+        """
+        return self._driver.execute_async_script(
+            _CLICK_AND_CONFIRM_SCRIPT,
+            list(click_labels),
+            list(done_labels),
+            int(self._confirm_timeout * 1000),
+        )
 
     def alert(self) -> bool:
         """
         Add an alert on the current article page.
 
-        :return: True if alert added or already present, False otherwise.
+        :return: True if alert added or already present, False otherwise. last_failure is FAILURE_UNCONFIRMED
+            when the button was clicked but the alert was never displayed.
         """
         try:
-            # Check if 'Disable Alert' exists
-            self._driver.find_element(
-                By.XPATH, "//span[text()='Disable Alert']"
+            state = self._click_and_confirm(
+                ["Activate Alert", "Create Alert"], ["Disable Alert"]
             )
+        except Exception as e:
+            self.log_file.write(f"Unable to add alert: {e}\n")
+            print(f"Unable to add alert: {e}")
+            return False
+
+        if state == "already":
             # Alert is already enabled
             self.log_file.write("Alert is already enabled.\n")
             print("Alert is already enabled.")
             return True
-        except NoSuchElementException:
-            # Need to enable alert
-            alert_texts = ["Activate Alert", "Create Alert"]
-            for alert_text in alert_texts:
-                try:
-                    alert_element = self._driver.find_element(
-                        By.XPATH, f"//span[text()='{alert_text}']"
-                    )
-                    self._driver.execute_script(
-                        "arguments[0].click();", alert_element
-                    )
-                    self._random_sleep()
-                    self.log_file.write(
-                        f"Alert '{alert_text}' added successfully.\n"
-                    )
-                    print(f"Alert '{alert_text}' added successfully.")
-                    return True
-                except NoSuchElementException:
-                    continue
-
-            # If neither alert option is found
+        if state == "confirmed":
+            self.log_file.write("Alert added successfully.\n")
+            print("Alert added successfully.")
+            return True
+        if state == "unconfirmed":
+            # The state of the page never changed, the item is retried rather than recorded as done
+            self.last_failure = FAILURE_UNCONFIRMED
             self.log_file.write(
-                f"Unable to add alert. Neither 'Activate Alert' nor 'Create Alert' found.\n"
+                "Warning - Alert clicked, but 'Disable Alert' was not displayed.\n"
             )
             print(
-                "Unable to add alert. Neither 'Activate Alert' nor 'Create Alert' found."
+                "Warning - Alert clicked, but 'Disable Alert' was not displayed."
             )
             return False
 
+        # If neither alert option is found
+        self.log_file.write(
+            f"Unable to add alert. Neither 'Activate Alert' nor 'Create Alert' found.\n"
+        )
+        print(
+            "Unable to add alert. Neither 'Activate Alert' nor 'Create Alert' found."
+        )
+        return False
+
     def save_to_library(self) -> bool:
         """
         Save the current article to the library.
 
-        :return: True if saved successfully or already in library, False otherwise.
+        :return: True if saved successfully or already in library, False otherwise. last_failure is FAILURE_UNCONFIRMED
+            when the button was clicked but the paper was never displayed in the library.
         """
         try:
-            # Check if already in library
-            self._driver.find_element(By.XPATH, "//span[text()='In Library']")
+            state = self._click_and_confirm(
+                ["Save to Library"], ["In Library"]
+            )
+        except Exception as e:
+            self.log_file.write(f"Save to Library error: {e}\n")
+            print(f"Save to Library error: {e}")
+            return False
+
+        if state == "already":
             # Already in library
             self.log_file.write("Paper is already in library.\n")
             print("Paper is already in library.")
             return True
-        except NoSuchElementException:
-            # Need to save to library
-            try:
-                save_button = self._driver.find_element(
-                    By.XPATH, "//span[text()='Save to Library']"
-                )
-                # Use JavaScript to click to avoid interception
-                self._driver.execute_script(
-                    "arguments[0].click();", save_button
-                )
-                self._random_sleep()
-                self.log_file.write("Paper saved to library successfully.\n")
-                print("Paper saved to library successfully.")
-                return True
-            except NoSuchElementException as e:
-                self.log_file.write(f"Save to Library error: {e}\n")
-                print(f"Save to Library error: {e}")
-                return False
+        if state == "confirmed":
+            self.log_file.write("Paper saved to library successfully.\n")
+            print("Paper saved to library successfully.")
+            return True
+        if state == "unconfirmed":
+            # The state of the page never changed, the item is retried rather than recorded as done
+            self.last_failure = FAILURE_UNCONFIRMED
+            self.log_file.write(
+                "Warning - Save to Library clicked, but 'In Library' was not displayed.\n"
+            )
+            print(
+                "Warning - Save to Library clicked, but 'In Library' was not displayed."
+            )
+            return False
+
+        self.log_file.write("Save to Library error: button not found.\n")
+        print("Save to Library error: button not found.")
+        return False
+
+    def disable_alert(self) -> bool:
+        """
+        Disable the alert of the current article page.
+
+        :return: True if the alert is disabled or was not enabled, False otherwise.
+        """
+        try:
+            state = self._click_and_confirm(
+                ["Disable Alert"], ["Create Alert", "Activate Alert"]
+            )
+        except Exception as e:
+            self.log_file.write(f"Unable to disable alert: {e}\n")
+            print(f"Unable to disable alert: {e}")
+            return False
+
+        if state == "already":
+            self.log_file.write("Alert is not enabled.\n")
+            print("Alert is not enabled.")
+            return True
+        if state == "confirmed":
+            self.log_file.write("Alert disabled successfully.\n")
+            print("Alert disabled successfully.")
+            return True
+        self.log_file.write(f"Unable to disable alert ({state}).\n")
+        print(f"Unable to disable alert ({state}).")
+        return False
+
+    def remove_from_library(self) -> bool:
+        """
+        Remove the current article from the library.
+
+        :return: True if removed or not in library, False otherwise.
+        """
+        try:
+            state = self._click_and_confirm(
+                ["In Library"], ["Save to Library"]
+            )
+        except Exception as e:
+            self.log_file.write(f"Remove from Library error: {e}\n")
+            print(f"Remove from Library error: {e}")
+            return False
+
+        if state == "already":
+            self.log_file.write("Paper is not in library.\n")
+            print("Paper is not in library.")
+            return True
+        if state == "confirmed":
+            self.log_file.write("Paper removed from library successfully.\n")
+            print("Paper removed from library successfully.")
+            return True
+        self.log_file.write(f"Remove from Library error ({state}).\n")
+        print(f"Remove from Library error ({state}).")
+        return False
 
     def _restart_and_relogin(self):
         """
         Restart the browser, re-log into the Semantic Scholar account, and optionally retry the last search.
         """
+        self.pacing.record_restart()
+        if self.timer is not None:
+            self.timer.restarts += 1
         try:
             # Close the current browser session
             self._close_browser()
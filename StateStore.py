@@ -0,0 +1,412 @@
+# StateStore.py
+
+import csv
+import os
+import sqlite3
+import threading
+import time
+
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+# A step that was not requested for an item
+STATUS_SKIPPED = "skipped"
+
+# Delay before an item that failed is tried again, doubled after each failed run
+FAILURE_BACKOFF = 24 * 3600
+FAILURE_BACKOFF_MAX = 60 * 24 * 3600
+
+
+class StateStore(object):
+    """
+    Transactional SQLite store of the state of every Zotero item sent to Semantic Scholar.
+    It records the outcome of each step, so that a resumed run only redoes the steps that did not succeed.
+    """
+
+    def __init__(self, file_name, batch_size=20, flush_interval=5.0):
+        """
+        Initializes the StateStore.
+
+        :param file_name: Path to the SQLite file of the store.
+        :param batch_size: Number of queued updates that triggers a transaction.
+        :param flush_interval: Seconds after the last write from which a new update writes the queue.
+            The end of an item (mark_completed, record_failure, forget) is always written at once.
+        """
+        self._batch_size = max(1, batch_size)
+        self._flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._pending = []
+        self._dirty_keys = set()
+        self._last_flush = time.time()
+
+        self._connection = sqlite3.connect(
+            file_name, timeout=30, check_same_thread=False
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        with self._connection:
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS items (
+                    key TEXT PRIMARY KEY,
+                    title TEXT NOT NULL DEFAULT '',
+                    paper_id TEXT,
+                    alert_status TEXT NOT NULL DEFAULT 'pending',
+                    library_status TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    last_error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    completed_at REAL,
+                    failures INTEGER NOT NULL DEFAULT 0,
+                    next_attempt_at REAL
+                )
+                """
+            )
+            # Columns added after the first version of the store
+            columns = {
+                row[1]
+                for row in self._connection.execute("PRAGMA table_info(items)")
+            }
+            if "failures" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE items ADD COLUMN failures INTEGER NOT NULL DEFAULT 0"
+                )
+            if "next_attempt_at" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE items ADD COLUMN next_attempt_at REAL"
+                )
+            self._connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS meta (
+                    name TEXT PRIMARY KEY,
+                    value TEXT
+                )
+                """
+            )
+
+    def import_csv(self, file_name) -> int:
+        """
+        Import once a save file written by the previous versions ("Key", "Title" columns).
+        The imported items are considered as completed.
+
+        :param file_name: Path to the CSV save file.
+        :return: The number of imported items, 0 if the file does not exist or was already imported.
+        """
+        if not os.path.isfile(file_name):
+            return 0
+        meta_name = f"imported:{os.path.abspath(file_name)}"
+        if self.get_meta(meta_name):
+            return 0
+
+        now = time.time()
+        rows = []
+        with open(file_name, "r", encoding="utf-8", errors="ignore") as f:
+            reader = csv.reader(f, skipinitialspace=True)
+            next(reader, None)
+            for row in reader:
+                if not row or not row[0].strip():
+                    continue
+                title = row[1].strip() if len(row) > 1 else ""
+                rows.append(
+                    (row[0].strip(), title, STATUS_DONE, STATUS_DONE, now)
+                )
+
+        with self._lock:
+            self.flush()
+            with self._connection:
+                self._connection.executemany(
+                    "INSERT OR IGNORE INTO items "
+                    "(key, title, alert_status, library_status, created_at, updated_at, completed_at) "
+                    "VALUES (?1, ?2, ?3, ?4, ?5, ?5, ?5)",
+                    rows,
+                )
+                self._connection.execute(
+                    "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+                    (meta_name, str(now)),
+                )
+        return len(rows)
+
+    def get_meta(self, name, default=None):
+        """
+        Read a value stored in the meta table.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE name = ?", (name,)
+            ).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, name, value):
+        """
+        Store a value in the meta table.
+        """
+        self._queue(
+            None,
+            "INSERT OR REPLACE INTO meta (name, value) VALUES (?, ?)",
+            (name, str(value)),
+        )
+
+    def completed_keys(self) -> set:
+        """
+        :return: The keys of the items whose every step has succeeded.
+        """
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                "SELECT key FROM items WHERE completed_at IS NOT NULL"
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def completed_items(self) -> list:
+        """
+        :return: The state of every completed item.
+        """
+        with self._lock:
+            self.flush()
+            cursor = self._connection.execute(
+                "SELECT * FROM items WHERE completed_at IS NOT NULL"
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def deferred_keys(self, now=None) -> set:
+        """
+        :param now: The current timestamp, time.time() by default.
+        :return: The keys of the failed items that are not due for a new attempt yet.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                "SELECT key FROM items WHERE completed_at IS NULL AND next_attempt_at > ?",
+                (now,),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def failed_items(self) -> list:
+        """
+        :return: The state of every failed item that is not completed, the next to be retried first.
+        """
+        with self._lock:
+            self.flush()
+            cursor = self._connection.execute(
+                "SELECT * FROM items WHERE completed_at IS NULL AND failures > 0 "
+                "ORDER BY next_attempt_at"
+            )
+            columns = [column[0] for column in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def get(self, key):
+        """
+        Read the state of an item.
+
+        :param key: The unique key of the item.
+        :return: A dictionary of the item columns, or None if the item is unknown.
+        """
+        with self._lock:
+            if key in self._dirty_keys:
+                self.flush()
+            cursor = self._connection.execute(
+                "SELECT * FROM items WHERE key = ?", (key,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            return dict(zip([column[0] for column in cursor.description], row))
+
+    def start_attempt(self, key, title):
+        """
+        Record that an item is being processed.
+        """
+        now = time.time()
+        self._queue(
+            key,
+            "INSERT INTO items (key, title, attempts, created_at, updated_at) "
+            "VALUES (?1, ?2, 1, ?3, ?3) "
+            "ON CONFLICT(key) DO UPDATE SET title = ?2, attempts = attempts + 1, updated_at = ?3",
+            (key, title, now),
+        )
+
+    def ensure_item(self, key, title):
+        """
+        Create an item if it is unknown, without counting an attempt.
+        """
+        now = time.time()
+        self._queue(
+            key,
+            "INSERT INTO items (key, title, created_at, updated_at) "
+            "VALUES (?1, ?2, ?3, ?3) ON CONFLICT(key) DO NOTHING",
+            (key, title, now),
+        )
+
+    def set_paper_id(self, key, paper_id):
+        """
+        Record the Semantic Scholar paper ID found for an item.
+        """
+        self._update(key, "paper_id = ?", (paper_id,))
+
+    def set_step(self, key, step, succeeded):
+        """
+        Record the outcome of a step ("alert" or "library") for an item.
+        """
+        if step not in ("alert", "library"):
+            raise ValueError(f"Unknown step: {step}")
+        status = STATUS_DONE if succeeded else STATUS_FAILED
+        self._update(key, f"{step}_status = ?", (status,))
+
+    def set_error(self, key, error):
+        """
+        Record the last error of an item.
+        """
+        self._update(key, "last_error = ?", (error,))
+
+    def record_failure(
+        self,
+        key,
+        title,
+        reason,
+        backoff=FAILURE_BACKOFF,
+        max_backoff=FAILURE_BACKOFF_MAX,
+    ) -> float:
+        """
+        Record that a run could not send an item, and postpone its next attempt.
+        The delay doubles after each failed run: 1 day, 2 days, 4 days... up to max_backoff.
+
+        :param reason: Why the item could not be sent.
+        :return: The timestamp from which the item is tried again.
+        """
+        with self._lock:
+            state = self.get(key) or dict()
+            failures = state.get("failures", 0) + 1
+            now = time.time()
+            next_attempt_at = now + min(
+                max_backoff, backoff * 2 ** (failures - 1)
+            )
+            self._queue(
+                key,
+                "INSERT INTO items "
+                "(key, title, last_error, failures, next_attempt_at, created_at, updated_at) "
+                "VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?6) "
+                "ON CONFLICT(key) DO UPDATE SET last_error = ?3, failures = ?4, "
+                "next_attempt_at = ?5, updated_at = ?6",
+                (key, title, reason, failures, next_attempt_at, now),
+                flush=True,
+            )
+        return next_attempt_at
+
+    def mark_completed(self, key, title, alert=True, library=True):
+        """
+        Record that every requested step of an item has succeeded. The item is created if needed,
+        for instance when its paper has been sent under the key of a duplicate.
+        A step neither done now nor before is recorded as skipped, so that it is done if it is requested later.
+
+        :param alert: Whether the alert of the item is done.
+        :param library: Whether the item is saved to the library.
+        """
+        now = time.time()
+        self._queue(
+            key,
+            "INSERT INTO items "
+            "(key, title, alert_status, library_status, created_at, updated_at, completed_at) "
+            "VALUES (?1, ?2, CASE WHEN ?4 THEN ?6 ELSE ?7 END, CASE WHEN ?5 THEN ?6 ELSE ?7 END, ?3, ?3, ?3) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "alert_status = CASE WHEN ?4 OR alert_status = ?6 THEN ?6 ELSE ?7 END, "
+            "library_status = CASE WHEN ?5 OR library_status = ?6 THEN ?6 ELSE ?7 END, "
+            "last_error = NULL, failures = 0, next_attempt_at = NULL, updated_at = ?3, completed_at = ?3",
+            (
+                key,
+                title,
+                now,
+                int(bool(alert)),
+                int(bool(library)),
+                STATUS_DONE,
+                STATUS_SKIPPED,
+            ),
+            flush=True,
+        )
+
+    def legacy_keys(self) -> set:
+        """
+        :return: The keys in the format of the previous versions, the MD5 hash of a title.
+        """
+        with self._lock:
+            self.flush()
+            rows = self._connection.execute(
+                "SELECT key FROM items WHERE length(key) = 32 AND key NOT GLOB '*[^0-9a-f]*'"
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def rekey(self, new_keys) -> int:
+        """
+        Move the state of items to new keys, for instance from the keys of the previous versions to the Zotero keys.
+        A state is left under its old key if the new key already has one.
+
+        :param new_keys: A dictionary {old key: new key}.
+        :return: The number of moved items.
+        """
+        rows = [
+            (new_key, old_key)
+            for old_key, new_key in new_keys.items()
+            if old_key != new_key
+        ]
+        if not rows:
+            return 0
+        with self._lock:
+            self.flush()
+            with self._connection:
+                before = self._connection.total_changes
+                self._connection.executemany(
+                    "UPDATE OR IGNORE items SET key = ? WHERE key = ?", rows
+                )
+                return self._connection.total_changes - before
+
+    def forget(self, key):
+        """
+        Delete an item, once its paper has been removed from the account.
+        """
+        self._queue(key, "DELETE FROM items WHERE key = ?", (key,), flush=True)
+
+    def flush(self):
+        """
+        Write every queued update in a single transaction.
+        """
+        with self._lock:
+            if self._pending:
+                with self._connection:
+                    for sql, params in self._pending:
+                        self._connection.execute(sql, params)
+                self._pending = []
+                self._dirty_keys.clear()
+            self._last_flush = time.time()
+
+    def close(self):
+        """
+        Write the queued updates and close the store.
+        """
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def _update(self, key, assignments, params):
+        self._queue(
+            key,
+            f"UPDATE items SET {assignments}, updated_at = ? WHERE key = ?",
+            params + (time.time(), key),
+        )
+
+    def _queue(self, key, sql, params, flush=False):
+        """
+        Queue an update. The queue is written once it holds batch_size updates, flush_interval seconds
+        after the last write, or at once with flush: an item that ends is never lost with the batch.
+        """
+        with self._lock:
+            self._pending.append((sql, params))
+            if key is not None:
+                self._dirty_keys.add(key)
+            if (
+                flush
+                or len(self._pending) >= self._batch_size
+                or time.time() - self._last_flush >= self._flush_interval
+            ):
+                self.flush()
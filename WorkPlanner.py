@@ -0,0 +1,243 @@
+# WorkPlanner.py
+
+import re
+
+from PaperIdentifiers import normalize_doi, normalize_title
+
+# Rough duration of a scraped item, used before any item has been timed
+DEFAULT_SECONDS_PER_ITEM = 60
+
+# The MD5 hash of a title, the key of an item read without its Zotero key
+_LEGACY_KEY_PATTERN = re.compile(r"[0-9a-f]{32}")
+
+
+def dedup_key(zotero_item) -> str:
+    """
+    Key under which two Zotero items are considered as the same paper: their DOI,
+    or else their normalized title and year.
+
+    :param zotero_item: A ZoteroItem.
+    :return: The deduplication key of the item.
+    """
+    doi = normalize_doi(zotero_item.doi)
+    if doi:
+        return f"doi:{doi}"
+    title = normalize_title(zotero_item.title)
+    if not title:
+        # Items without title are never merged
+        return f"key:{zotero_item.key}"
+    return f"title:{title}|{zotero_item.year.strip()}"
+
+
+class RemovalItem(object):
+    """
+    A paper sent by a previous run whose Zotero item has been removed since.
+    """
+
+    __slots__ = (
+        "key",
+        "title",
+        "paper_id",
+        "disable_alert",
+        "remove_from_library",
+    )
+
+    def __init__(
+        self,
+        key,
+        title="",
+        paper_id="",
+        disable_alert=True,
+        remove_from_library=True,
+    ):
+        self.key = key
+        self.title = title
+        self.paper_id = paper_id
+        self.disable_alert = disable_alert
+        self.remove_from_library = remove_from_library
+
+    def __repr__(self):
+        return f"RemovalItem({self.key!r}, {self.title!r})"
+
+
+class WorkPlan(object):
+    """
+    The work of a run, computed before any browser is started.
+    """
+
+    def __init__(self):
+        self.total = 0
+        # (item number, ZoteroItem, duplicates sent along with it)
+        self.work = []
+        # Items whose key has already been saved
+        self.saved = []
+        # Items whose paper has already been saved under another key
+        self.duplicates_of_saved = []
+        # Items listed twice with the same key
+        self.repeated = []
+        # Items that failed in a previous run and are not due for a new attempt
+        self.deferred = []
+        # Items with neither an alert nor a library save requested
+        self.no_action = []
+        # (item number, RemovalItem, []) of the saved papers no longer in Zotero
+        self.removals = []
+        # Saved papers no longer in Zotero that cannot be removed safely:
+        # their paper ID is unknown, or their key was built from another source than the library
+        self.unknown_removals = []
+
+    @property
+    def nb_duplicates(self) -> int:
+        """
+        :return: The number of items sent along with another item of the same paper.
+        """
+        return sum(len(duplicates) for _, _, duplicates in self.work)
+
+    @property
+    def nb_done(self) -> int:
+        """
+        :return: The number of items that need no work.
+        """
+        return self.total - len(self.work) - self.nb_duplicates
+
+    def estimated_seconds(
+        self, seconds_per_item=DEFAULT_SECONDS_PER_ITEM, nb_workers=1
+    ) -> float:
+        """
+        :return: The estimated duration of the run, in seconds.
+        """
+        return len(self.work) * seconds_per_item / max(1, nb_workers)
+
+
+def plan_work(
+    items,
+    saved_keys,
+    deferred_keys=None,
+    saved_items=None,
+    library=None,
+) -> WorkPlan:
+    """
+    Diff a list of Zotero items against the saved state: subtract the saved and deferred items,
+    merge the items of the same paper, and find the saved papers that are no longer in Zotero.
+    A saved item is sent again when it requests a step that was not done, for instance after it was tagged.
+
+    :param items: A list of ZoteroItem.
+    :param saved_keys: The keys of the completed items.
+    :param deferred_keys: The keys of the failed items that are not due for a new attempt.
+    :param saved_items: The states of the completed items (StateStore.completed_items),
+        to find their steps not done and to plan removals.
+    :param library: A dictionary {key: title} of every item of the Zotero library, the items by default.
+        Needed when items only holds the items modified since the last run.
+    :return: A WorkPlan.
+    """
+    deferred_keys = deferred_keys or set()
+    plan = WorkPlan()
+    saved_states = {state["key"]: state for state in saved_items or []}
+    # The state of the saved paper of each deduplication key
+    saved_papers = {
+        dedup_key(zotero_item): saved_states.get(zotero_item.key)
+        for zotero_item in items
+        if zotero_item.key in saved_keys
+        and _steps_done(zotero_item, saved_states.get(zotero_item.key))
+    }
+    primaries = dict()
+    seen_keys = set()
+
+    for number, zotero_item in enumerate(items, start=1):
+        plan.total += 1
+        if not (zotero_item.add_alert or zotero_item.add_to_library):
+            plan.no_action.append(zotero_item)
+            continue
+        if zotero_item.key in saved_keys and _steps_done(
+            zotero_item, saved_states.get(zotero_item.key)
+        ):
+            plan.saved.append(zotero_item)
+            continue
+        if zotero_item.key in seen_keys:
+            plan.repeated.append(zotero_item)
+            continue
+        seen_keys.add(zotero_item.key)
+        if zotero_item.key in deferred_keys:
+            plan.deferred.append(zotero_item)
+            continue
+
+        paper_key = dedup_key(zotero_item)
+        if paper_key in saved_papers and _steps_done(
+            zotero_item, saved_papers[paper_key]
+        ):
+            plan.duplicates_of_saved.append(zotero_item)
+            continue
+        if paper_key in primaries:
+            primaries[paper_key][2].append(zotero_item)
+            continue
+
+        entry = (number, zotero_item, [])
+        primaries[paper_key] = entry
+        plan.work.append(entry)
+
+    if saved_items:
+        _plan_removals(plan, items, saved_items, library)
+    return plan
+
+
+def _steps_done(zotero_item, state) -> bool:
+    """
+    :param state: The saved state of the paper of the item, None if unknown.
+    :return: True if every step requested by the item has been done, or if the state is unknown.
+    """
+    if state is None:
+        return True
+    if zotero_item.add_alert and state.get("alert_status") != "done":
+        return False
+    if zotero_item.add_to_library and state.get("library_status") != "done":
+        return False
+    return True
+
+
+def _key_source(key) -> str:
+    """
+    :return: "legacy" for a key built from the title of an item, "zotero" for a Zotero key.
+    """
+    return "legacy" if _LEGACY_KEY_PATTERN.fullmatch(key) else "zotero"
+
+
+def _plan_removals(plan, items, saved_items, library=None):
+    """
+    Add to a plan the saved papers whose Zotero item is gone. A paper is kept when an item of the library has
+    the same paper ID or the same normalized title, for instance after the title of an item was edited.
+    A key is only compared to keys of the same source, a saved key built from the title is not missing
+    from a library read with Zotero keys.
+    """
+    if library is None:
+        library = {zotero_item.key: zotero_item.title for zotero_item in items}
+    current_sources = {_key_source(key) for key in library}
+    current_titles = {normalize_title(title) for title in library.values()}
+    current_titles.update(
+        normalize_title(zotero_item.title) for zotero_item in items
+    )
+    current_paper_ids = {
+        state["paper_id"]
+        for state in saved_items
+        if state["key"] in library and state.get("paper_id")
+    }
+
+    number = plan.total
+    for state in saved_items:
+        if state["key"] in library:
+            continue
+        paper_id = state.get("paper_id") or ""
+        if paper_id and paper_id in current_paper_ids:
+            continue
+        if normalize_title(state.get("title") or "") in current_titles:
+            continue
+        if not paper_id or _key_source(state["key"]) not in current_sources:
+            plan.unknown_removals.append(state)
+            continue
+        number += 1
+        removal = RemovalItem(
+            state["key"],
+            state.get("title") or "",
+            paper_id,
+            disable_alert=state.get("alert_status") == "done",
+            remove_from_library=state.get("library_status") == "done",
+        )
+        plan.removals.append((number, removal, []))
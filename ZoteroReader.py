@@ -0,0 +1,511 @@
+# ZoteroReader.py
+
+import csv
+import hashlib
+import os
+import pathlib
+import re
+import shutil
+import sqlite3
+import tempfile
+
+from PaperIdentifiers import external_ids
+
+# Zotero item types sent to Semantic Scholar
+RELEVANT_ITEM_TYPES = frozenset(
+    [
+        "journalArticle",
+        "conferencePaper",
+        "bookSection",
+        "preprint",
+        "thesis",
+        "book",
+    ]
+)
+
+# Tags restricting the actions done on an item, an item tagged with neither gets the actions of the run
+ALERT_TAG = "s2:alert"
+LIBRARY_TAG = "s2:library"
+
+_FALSE_VALUES = frozenset(["0", "false", "no", "n", "off"])
+
+
+def unique_key(key, title, year="") -> str:
+    """
+    Generate a unique key for a Zotero item.
+    If the item has a non-empty key, use it; otherwise, build a key from the title and the year.
+
+    :param key: The "Key" column.
+    :param title: The "Title" column.
+    :param year: The "Year" column, if any.
+    :return: The unique key of the item.
+    """
+    key = key.strip()
+    if key:
+        return key
+    return legacy_key(title, year)
+
+
+def legacy_key(title, year="") -> str:
+    """
+    The key of an item without "Key" column, also the key given to every item by the previous versions.
+
+    :param title: The title of the item.
+    :param year: The "Year" column, if any.
+    :return: The MD5 hash of the title and the year.
+    """
+    combined = title.strip() + year.strip()
+    # Create an MD5 hash from the combined string
+    return hashlib.md5(combined.encode("utf-8")).hexdigest()
+
+
+def item_actions(tags, add_alert=True, add_to_library=True) -> tuple:
+    """
+    The actions requested for an item by its tags: an item tagged with ALERT_TAG or LIBRARY_TAG
+    gets only the tagged actions, the other items get the default actions.
+
+    :param tags: The tags of the item.
+    :param add_alert: Whether an alert is added on an untagged item.
+    :param add_to_library: Whether an untagged item is saved to the library.
+    :return: A tuple (add_alert, add_to_library).
+    """
+    tags = {tag.strip().lower() for tag in tags}
+    if ALERT_TAG in tags or LIBRARY_TAG in tags:
+        return ALERT_TAG in tags, LIBRARY_TAG in tags
+    return add_alert, add_to_library
+
+
+def _parse_flag(value, default) -> bool:
+    """
+    :return: The boolean of a CSV cell ("1", "true", "yes", "x"...), or the default if the cell is empty.
+    """
+    value = value.strip().lower()
+    if not value:
+        return default
+    return value not in _FALSE_VALUES
+
+
+class ZoteroItem(object):
+    """
+    The fields of a Zotero item used to send it to Semantic Scholar.
+    """
+
+    __slots__ = (
+        "key",
+        "item_type",
+        "title",
+        "doi",
+        "url",
+        "extra",
+        "year",
+        "authors",
+        "publication_title",
+        "add_alert",
+        "add_to_library",
+    )
+
+    def __init__(
+        self,
+        key,
+        item_type="",
+        title="",
+        doi="",
+        url="",
+        extra="",
+        year="",
+        authors="",
+        publication_title="",
+        add_alert=True,
+        add_to_library=True,
+    ):
+        self.key = key
+        self.item_type = item_type
+        self.title = title
+        self.doi = doi
+        self.url = url
+        self.extra = extra
+        self.year = year
+        self.authors = authors
+        self.publication_title = publication_title
+        self.add_alert = add_alert
+        self.add_to_library = add_to_library
+
+    def paper_ids(self) -> list:
+        """
+        :return: The identifiers of the item that Semantic Scholar can resolve.
+        """
+        return external_ids(self.doi, self.url, self.extra)
+
+    def __repr__(self):
+        return f"ZoteroItem({self.key!r}, {self.title!r})"
+
+
+# Columns read from the CSV export, every other column is skipped
+_CSV_COLUMNS = (
+    "Key",
+    "Item Type",
+    "Title",
+    "DOI",
+    "Url",
+    "Extra",
+    "Publication Year",
+    "Author",
+    "Publication Title",
+    "Year",
+    "Manual Tags",
+    "Automatic Tags",
+    "Add Alert",
+    "Add to Library",
+)
+
+
+def iter_csv_items(
+    file_name,
+    item_types=RELEVANT_ITEM_TYPES,
+    add_alert=True,
+    add_to_library=True,
+):
+    """
+    Stream the items of a CSV file exported by Zotero, one compact ZoteroItem at a time.
+    The actions of an item are read from its "Add Alert" and "Add to Library" columns if filled,
+    or else from its tags, see item_actions.
+
+    :param file_name: Path to the CSV file.
+    :param item_types: The item types to keep, or None to keep every row.
+    :param add_alert: Whether an alert is added on the items that do not specify it.
+    :param add_to_library: Whether the items that do not specify it are saved to the library.
+    :return: A generator of ZoteroItem.
+    :raises ValueError: If the file has no "Title" column.
+    """
+    # Zotero writes a byte order mark, which would otherwise be part of the name of the "Key" column
+    with open(file_name, "r", encoding="utf-8-sig", errors="ignore") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        column_index = {name: index for index, name in enumerate(header)}
+        if "Title" not in column_index:
+            raise ValueError("The input file must contain a 'Title' column.")
+
+        indices = [column_index.get(column) for column in _CSV_COLUMNS]
+        type_index = column_index.get("Item Type")
+        for row in reader:
+            if item_types is not None:
+                if type_index is None or type_index >= len(row):
+                    continue
+                if row[type_index] not in item_types:
+                    continue
+            (
+                key,
+                item_type,
+                title,
+                doi,
+                url,
+                extra,
+                publication_year,
+                authors,
+                publication_title,
+                year,
+                manual_tags,
+                automatic_tags,
+                alert_column,
+                library_column,
+            ) = [
+                row[index] if index is not None and index < len(row) else ""
+                for index in indices
+            ]
+            # Zotero exports the tags of an item separated by "; "
+            tags = [
+                tag
+                for tag in (manual_tags + ";" + automatic_tags).split(";")
+                if tag.strip()
+            ]
+            item_alert, item_library = item_actions(
+                tags, add_alert, add_to_library
+            )
+            yield ZoteroItem(
+                unique_key(key, title, year),
+                item_type=item_type,
+                title=title,
+                doi=doi,
+                url=url,
+                extra=extra,
+                year=publication_year,
+                authors=authors,
+                publication_title=publication_title,
+                add_alert=_parse_flag(alert_column, item_alert),
+                add_to_library=_parse_flag(library_column, item_library),
+            )
+
+
+# Fields of the Zotero database read for each item, the publication title has a name per item type
+_DATABASE_FIELDS = (
+    "title",
+    "DOI",
+    "url",
+    "extra",
+    "date",
+    "publicationTitle",
+    "proceedingsTitle",
+    "bookTitle",
+)
+
+_YEAR_PATTERN = re.compile(r"\d{4}")
+
+
+def is_zotero_database(file_name) -> bool:
+    """
+    :return: True if the file is a Zotero database rather than a CSV export.
+    """
+    return file_name.lower().endswith(".sqlite")
+
+
+class ZoteroDatabaseReader(object):
+    """
+    Read the items of a local Zotero database (zotero.sqlite) without any CSV export.
+    Only the items modified after a watermark are read, so that a daily run reads a few rows.
+    """
+
+    def __init__(self, file_name, snapshot=False, batch_size=500):
+        """
+        Initializes the ZoteroDatabaseReader.
+
+        :param file_name: Path to the zotero.sqlite file.
+        :param snapshot: Read a copy of the database. A copy is also read when Zotero locks the database.
+        :param batch_size: Number of items whose fields are read with the same query.
+        """
+        self.file_name = file_name
+        # The latest dateModified among the items read
+        self.watermark = ""
+        self._batch_size = max(1, min(batch_size, 500))
+        self._snapshot_dir = None
+        self._connection = None
+        if not snapshot:
+            self._connection = self._open_read_only()
+        if self._connection is None:
+            self._connection = self._open_snapshot()
+
+    def _open_read_only(self):
+        uri = pathlib.Path(os.path.abspath(self.file_name)).as_uri()
+        try:
+            connection = sqlite3.connect(f"{uri}?mode=ro", uri=True)
+        except sqlite3.OperationalError:
+            return None
+        try:
+            connection.execute("SELECT 1 FROM items LIMIT 1")
+            return connection
+        except sqlite3.OperationalError:
+            # Zotero keeps an exclusive lock on its database while it runs
+            connection.close()
+            return None
+
+    def _open_snapshot(self):
+        self._snapshot_dir = tempfile.mkdtemp(prefix="zotero_snapshot_")
+        copy_name = os.path.join(self._snapshot_dir, "zotero.sqlite")
+        shutil.copyfile(self.file_name, copy_name)
+        return sqlite3.connect(copy_name)
+
+    def iter_items(
+        self,
+        since="",
+        item_types=RELEVANT_ITEM_TYPES,
+        add_alert=True,
+        add_to_library=True,
+    ):
+        """
+        Stream the items modified after a watermark, oldest first, and advance self.watermark.
+        The actions of an item are read from its tags, see item_actions.
+
+        :param since: The watermark, a Zotero dateModified ("YYYY-MM-DD HH:MM:SS"), or "" to read every item.
+        :param item_types: The item types to keep, or None to keep every item.
+        :param add_alert: Whether an alert is added on the items that are not tagged.
+        :param add_to_library: Whether the items that are not tagged are saved to the library.
+        :return: A generator of ZoteroItem.
+        """
+        query = (
+            "SELECT items.itemID, items.key, itemTypes.typeName, items.dateModified "
+            "FROM items "
+            "JOIN itemTypes ON itemTypes.itemTypeID = items.itemTypeID "
+            "LEFT JOIN deletedItems ON deletedItems.itemID = items.itemID "
+            "WHERE deletedItems.itemID IS NULL AND items.dateModified > ?"
+        )
+        params = [since or ""]
+        if item_types is not None:
+            item_types = sorted(item_types)
+            query += (
+                f" AND itemTypes.typeName IN ({_placeholders(item_types)})"
+            )
+            params += item_types
+        query += " ORDER BY items.dateModified"
+
+        cursor = self._connection.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(self._batch_size)
+            if not rows:
+                break
+            yield from self._build_items(rows, add_alert, add_to_library)
+
+    def iter_items_by_key(
+        self,
+        keys,
+        item_types=RELEVANT_ITEM_TYPES,
+        add_alert=True,
+        add_to_library=True,
+    ):
+        """
+        Stream the items of some Zotero keys whatever their dateModified, for instance the items that failed
+        in a previous run and are older than the watermark. The unknown and deleted keys are skipped.
+
+        :param keys: The Zotero keys of the items.
+        :param item_types: The item types to keep, or None to keep every item.
+        :param add_alert: Whether an alert is added on the items that are not tagged.
+        :param add_to_library: Whether the items that are not tagged are saved to the library.
+        :return: A generator of ZoteroItem.
+        """
+        keys = list(keys)
+        for start in range(0, len(keys), self._batch_size):
+            chunk = keys[start : start + self._batch_size]
+            query = (
+                "SELECT items.itemID, items.key, itemTypes.typeName, items.dateModified "
+                "FROM items "
+                "JOIN itemTypes ON itemTypes.itemTypeID = items.itemTypeID "
+                "LEFT JOIN deletedItems ON deletedItems.itemID = items.itemID "
+                f"WHERE deletedItems.itemID IS NULL AND items.key IN ({_placeholders(chunk)})"
+            )
+            params = list(chunk)
+            if item_types is not None:
+                sorted_types = sorted(item_types)
+                query += f" AND itemTypes.typeName IN ({_placeholders(sorted_types)})"
+                params += sorted_types
+            rows = self._connection.execute(query, params).fetchall()
+            if rows:
+                yield from self._build_items(rows, add_alert, add_to_library)
+
+    def _build_items(self, rows, add_alert, add_to_library):
+        """
+        Build the ZoteroItem of rows (item ID, key, type name, dateModified), and advance self.watermark.
+        """
+        item_ids = [row[0] for row in rows]
+        fields = self._read_fields(item_ids)
+        authors = self._read_authors(item_ids)
+        tags = self._read_tags(item_ids)
+        for item_id, item_key, item_type, date_modified in rows:
+            item_fields = fields.get(item_id, {})
+            title = item_fields.get("title", "")
+            year = _YEAR_PATTERN.search(item_fields.get("date", ""))
+            self.watermark = max(self.watermark, date_modified)
+            item_alert, item_library = item_actions(
+                tags.get(item_id, []), add_alert, add_to_library
+            )
+            # The Zotero key of the item, also the "Key" column of a CSV export,
+            # so that the items saved from either source are recognized by the other
+            yield ZoteroItem(
+                unique_key(str(item_key or ""), title),
+                item_type=item_type,
+                title=title,
+                doi=item_fields.get("DOI", ""),
+                url=item_fields.get("url", ""),
+                extra=item_fields.get("extra", ""),
+                year=year.group(0) if year else "",
+                authors="; ".join(authors.get(item_id, [])),
+                publication_title=item_fields.get("publicationTitle")
+                or item_fields.get("proceedingsTitle")
+                or item_fields.get("bookTitle", ""),
+                add_alert=item_alert,
+                add_to_library=item_library,
+            )
+
+    def all_items(self, item_types=RELEVANT_ITEM_TYPES) -> dict:
+        """
+        :param item_types: The item types to keep, or None to keep every item.
+        :return: A dictionary {key: title} of every item of the library, modified or not, the deleted ones excluded.
+        """
+        query = (
+            "SELECT items.key, itemDataValues.value "
+            "FROM items "
+            "JOIN itemTypes ON itemTypes.itemTypeID = items.itemTypeID "
+            "LEFT JOIN deletedItems ON deletedItems.itemID = items.itemID "
+            "LEFT JOIN itemData ON itemData.itemID = items.itemID "
+            "AND itemData.fieldID = (SELECT fieldID FROM fields WHERE fieldName = 'title') "
+            "LEFT JOIN itemDataValues ON itemDataValues.valueID = itemData.valueID "
+            "WHERE deletedItems.itemID IS NULL"
+        )
+        params = []
+        if item_types is not None:
+            item_types = sorted(item_types)
+            query += (
+                f" AND itemTypes.typeName IN ({_placeholders(item_types)})"
+            )
+            params += item_types
+        library = dict()
+        for item_key, title in self._connection.execute(query, params):
+            title = str(title or "")
+            library[unique_key(str(item_key or ""), title)] = title
+        return library
+
+    def _read_fields(self, item_ids) -> dict:
+        """
+        :return: A dictionary {item ID: {field name: value}}.
+        """
+        rows = self._connection.execute(
+            "SELECT itemData.itemID, fields.fieldName, itemDataValues.value "
+            "FROM itemData "
+            "JOIN fields ON fields.fieldID = itemData.fieldID "
+            "JOIN itemDataValues ON itemDataValues.valueID = itemData.valueID "
+            f"WHERE itemData.itemID IN ({_placeholders(item_ids)}) "
+            f"AND fields.fieldName IN ({_placeholders(_DATABASE_FIELDS)})",
+            list(item_ids) + list(_DATABASE_FIELDS),
+        )
+        fields = dict()
+        for item_id, field_name, value in rows:
+            fields.setdefault(item_id, {})[field_name] = str(value)
+        return fields
+
+    def _read_authors(self, item_ids) -> dict:
+        """
+        :return: A dictionary {item ID: ["Last, First", ...]}, in the order of the item.
+        """
+        rows = self._connection.execute(
+            "SELECT itemCreators.itemID, creators.lastName, creators.firstName "
+            "FROM itemCreators "
+            "JOIN creators ON creators.creatorID = itemCreators.creatorID "
+            "JOIN creatorTypes ON creatorTypes.creatorTypeID = itemCreators.creatorTypeID "
+            f"WHERE itemCreators.itemID IN ({_placeholders(item_ids)}) "
+            "AND creatorTypes.creatorType = 'author' "
+            "ORDER BY itemCreators.itemID, itemCreators.orderIndex",
+            list(item_ids),
+        )
+        authors = dict()
+        for item_id, last_name, first_name in rows:
+            name = ", ".join(part for part in (last_name, first_name) if part)
+            authors.setdefault(item_id, []).append(name)
+        return authors
+
+    def _read_tags(self, item_ids) -> dict:
+        """
+        :return: A dictionary {item ID: [tag name, ...]}.
+        """
+        rows = self._connection.execute(
+            "SELECT itemTags.itemID, tags.name "
+            "FROM itemTags "
+            "JOIN tags ON tags.tagID = itemTags.tagID "
+            f"WHERE itemTags.itemID IN ({_placeholders(item_ids)})",
+            list(item_ids),
+        )
+        tags = dict()
+        for item_id, name in rows:
+            tags.setdefault(item_id, []).append(str(name))
+        return tags
+
+    def close(self):
+        """
+        Close the database, and delete the snapshot if any.
+        """
+        self._connection.close()
+        if self._snapshot_dir:
+            shutil.rmtree(self._snapshot_dir, ignore_errors=True)
+            self._snapshot_dir = None
+
+
+def _placeholders(values) -> str:
+    return ", ".join("?" for _ in values)
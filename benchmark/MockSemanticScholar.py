@@ -0,0 +1,317 @@
+# MockSemanticScholar.py
+
+import hashlib
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlparse
+
+# Popup displayed on paper pages, with the classes searched by SemanticScholarScrapper.cancel_create_paper_alert
+_POPUP = """
+<div class="cl-overlay cl-overlay__content-position--center" id="alert-popup">
+  <div class="cl-overlay__content"><div class="flex-row">
+    <div class="cl-modal__content cl-modal__centered-offset alert-modal">
+      <div class="alert-modal__content"><div class="alert-modal__alert-information">
+        <form class="create-alert-content"><section class="form-buttons">
+          <button type="button" onclick="document.getElementById('alert-popup').remove()"
+            class="cl-button cl-button--no-arrow-divider cl-button--not-icon-only cl-button--no-icon cl-button--has-label cl-button--font-size- cl-button--icon-pos-left cl-button--shape-rectangle cl-button--size-default cl-button--type-tertiary cl-button--density-default">
+            <span class="cl-button__label">Cancel</span>
+          </button>
+        </section></form>
+      </div></div>
+    </div>
+  </div></div>
+</div>
+"""
+
+# Click handler of the alert and library buttons: record the action, or its undoing, then toggle the label
+_ACTION_SCRIPT = """
+function act(button, action, done, undone) {
+    const label = button.querySelector('span');
+    const undo = label.textContent === done;
+    fetch('/action/' + (undo ? 'un' : '') + action + '/' + button.dataset.paper, {method: 'POST'})
+        .then(() => { label.textContent = undo ? undone : done; });
+}
+"""
+
+
+def paper_id(title) -> str:
+    """
+    :return: A Semantic Scholar-like paper ID (40 hexadecimal characters) for a title.
+    """
+    return hashlib.sha1(title.encode("utf-8")).hexdigest()
+
+
+class MockSemanticScholar(object):
+    """
+    Local HTTP server imitating the pages of Semantic Scholar used by SemanticScholarScrapper:
+    sign-in, search, error and paper pages, with configurable latency and failure injection.
+    """
+
+    def __init__(
+        self,
+        papers,
+        latency=0.0,
+        jitter=0.0,
+        error_rate=0.0,
+        popup_rate=1.0,
+        decoys=2,
+        seed=0,
+        saved=(),
+        page_size=10,
+    ):
+        """
+        Initializes the MockSemanticScholar.
+
+        :param papers: A list of dictionaries with the title, authors ("First Last, First2 Last2") and year of each paper.
+        :param latency: Seconds added to every response.
+        :param jitter: Maximum random seconds added to the latency.
+        :param error_rate: Probability that a search or paper page is an error page.
+        :param popup_rate: Probability that a paper page opens with the alert creation popup.
+        :param decoys: Number of other papers listed with the searched one on a search page.
+        :param seed: Seed of the random failures.
+        :param saved: Titles of the papers already in the library and with an alert.
+        :param page_size: Number of papers per page of the library and alerts pages.
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.popup_rate = popup_rate
+        self.decoys = decoys
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.papers = {paper_id(paper["title"]): paper for paper in papers}
+        self._ids_by_title = {
+            _normalize(paper["title"]): identifier
+            for identifier, paper in self.papers.items()
+        }
+        self._ids = list(self.papers)
+        self.page_size = max(1, page_size)
+        self.alerts = {paper_id(title) for title in saved}
+        self.library = set(self.alerts)
+        self.requests = 0
+        self.errors = 0
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        """
+        Base URL of the running server, ending with "/".
+        """
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self, host="127.0.0.1", port=0):
+        """
+        Start the server in a background thread, on a free port by default.
+        """
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                mock._handle(self, "GET")
+
+            def do_POST(self):
+                mock._handle(self, "POST")
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop the server.
+        """
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _chance(self, probability) -> bool:
+        with self._lock:
+            return self._random.random() < probability
+
+    def _handle(self, request, method):
+        with self._lock:
+            self.requests += 1
+            delay = self.latency + self._random.uniform(0.0, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        url = urlparse(request.path)
+        parts = [unquote(part) for part in url.path.split("/") if part]
+        signed_in = "session=" in request.headers.get("Cookie", "")
+
+        if method == "POST" and len(parts) == 3 and parts[0] == "action":
+            self._record_action(parts[1], parts[2])
+            return self._send(request, 204, "")
+        if not parts:
+            return self._send(request, 200, self._home_page(signed_in))
+        if parts[0] == "sign-in":
+            return self._send(request, 200, self._sign_in_page())
+        if parts[0] == "search":
+            query = parse_qs(url.query).get("q", [""])[0]
+            return self._send(request, *self._search_page(query))
+        if parts[:3] in (
+            ["me", "library", "all"],
+            ["me", "account", "alerts"],
+        ):
+            page = int(parse_qs(url.query).get("page", ["1"])[0])
+            return self._send(request, 200, self._account_page(parts[1], page))
+        if parts[0] == "paper" and len(parts) > 1:
+            return self._send(request, *self._paper_page(parts[-1]))
+        if parts[0] == "redirect" and len(parts) > 1:
+            # The synthetic DOIs end with the paper ID ("DOI:10.5555/<paper ID>")
+            request.send_response(302)
+            request.send_header("Location", f"/paper/{parts[-1]}")
+            request.end_headers()
+            return None
+        return self._send(request, *self._error_page(404))
+
+    def _record_action(self, action, identifier):
+        with self._lock:
+            if action == "alert":
+                self.alerts.add(identifier)
+            elif action == "library":
+                self.library.add(identifier)
+            elif action == "unalert":
+                self.alerts.discard(identifier)
+            elif action == "unlibrary":
+                self.library.discard(identifier)
+
+    def _send(self, request, status, body):
+        request.send_response(status)
+        request.send_header("Content-Type", "text/html; charset=utf-8")
+        data = body.encode("utf-8")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def _page(self, content) -> str:
+        return (
+            "<!DOCTYPE html><html><head><meta charset='utf-8'>"
+            f"<script>{_ACTION_SCRIPT}</script></head>"
+            f"<body><div id='app'>{content}</div></body></html>"
+        )
+
+    def _header(self, signed_in=True) -> str:
+        if signed_in:
+            account = "<div data-test-id='account-menu'>Account</div>"
+        else:
+            account = "<a data-test-id='header-sign-in-button' href='/sign-in'>Sign in</a>"
+        return (
+            "<header><label class='search-input__label'>Search</label>"
+            f"{account}</header>"
+        )
+
+    def _home_page(self, signed_in) -> str:
+        return self._page(self._header(signed_in))
+
+    def _sign_in_page(self) -> str:
+        return self._page(
+            "<form id='sign-in-form'>"
+            "<input name='email' type='email'>"
+            "<input name='password' type='password'>"
+            "<button type='button' onclick=\"document.cookie='session=mock; path=/'; "
+            "location.href='/';\"><span>Sign In</span></button>"
+            "</form>"
+        )
+
+    def _error_page(self, code=429):
+        with self._lock:
+            self.errors += 1
+        return code, self._page(
+            "<div id='main-content'>"
+            f"<p class='error-message__code'>Error {code}</p></div>"
+        )
+
+    def _account_page(self, name, page) -> str:
+        with self._lock:
+            identifiers = sorted(
+                self.library if name == "library" else self.alerts
+            )
+        start = (page - 1) * self.page_size
+        rows = "".join(
+            self._result_row(identifier)
+            for identifier in identifiers[start : start + self.page_size]
+        )
+        return self._page(
+            self._header()
+            + "<div id='main-content'>"
+            + (rows or "<div class='account-empty'>No papers</div>")
+            + "</div>"
+        )
+
+    def _search_page(self, query):
+        if self._chance(self.error_rate):
+            return self._error_page()
+        identifier = self._ids_by_title.get(_normalize(query))
+        if identifier is None:
+            return 200, self._page(
+                self._header()
+                + "<div class='result-page'>"
+                + "<div class='result-page__no-results'>No results</div></div>"
+            )
+
+        with self._lock:
+            decoys = self._random.sample(
+                self._ids, min(self.decoys + 1, len(self._ids))
+            )
+        results = [other for other in decoys if other != identifier]
+        results = results[: self.decoys]
+        # The searched paper is not always the first result
+        results.insert(len(results) // 2, identifier)
+        rows = "".join(self._result_row(other) for other in results)
+        return 200, self._page(
+            self._header()
+            + f"<div class='dropdown-filters__result-count'>{len(results)} results</div>"
+            + f"<div class='result-page'>{rows}</div>"
+        )
+
+    def _result_row(self, identifier) -> str:
+        paper = self.papers[identifier]
+        return (
+            "<div class='cl-paper-row'>"
+            f"<a href='/paper/{identifier}'><h2 class='cl-paper-title'>{html.escape(paper['title'])}</h2></a>"
+            f"<span class='cl-paper-authors'>{html.escape(paper['authors'])}</span>"
+            f"<span class='cl-paper-pubdates'>{paper['year']}</span>"
+            "</div>"
+        )
+
+    def _paper_page(self, identifier):
+        paper = self.papers.get(identifier)
+        if paper is None:
+            return self._error_page(404)
+        if self._chance(self.error_rate):
+            return self._error_page()
+        with self._lock:
+            alerted = identifier in self.alerts
+            saved = identifier in self.library
+        alert_label = "Disable Alert" if alerted else "Create Alert"
+        library_label = "In Library" if saved else "Save to Library"
+        popup = _POPUP if self._chance(self.popup_rate) else ""
+        return 200, self._page(
+            self._header()
+            + f"<h1 data-test-id='paper-detail-title'>{html.escape(paper['title'])}</h1>"
+            + f"<div data-test-id='author-list'>{html.escape(paper['authors'])}</div>"
+            + f"<span data-test-id='paper-year'>{paper['year']}</span>"
+            + f"<button data-paper='{identifier}' onclick=\"act(this, 'alert', 'Disable Alert', 'Create Alert')\">"
+            + f"<span>{alert_label}</span></button>"
+            + f"<button data-paper='{identifier}' onclick=\"act(this, 'library', 'In Library', 'Save to Library')\">"
+            + f"<span>{library_label}</span></button>"
+            + popup
+        )
+
+
+def _normalize(text) -> str:
+    return " ".join(str(text).lower().split())
@@ -0,0 +1,303 @@
+# run_benchmark.py
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+# The modules of the application are in the parent directory
+sys.path.insert(
+    0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+)
+
+from AccountSync import AccountPapers  # noqa: E402
+from ItemMetrics import ItemTimer, MetricsRecorder  # noqa: E402
+from MockSemanticScholar import MockSemanticScholar, paper_id  # noqa: E402
+from PacingController import PacingController  # noqa: E402
+from SemanticScholarScrapper import SemanticScholarScrapper  # noqa: E402
+
+_WORDS = (
+    "adaptive learning neural fluid simulation rendering graph sparse "
+    "real-time transformer diffusion scalable robust efficient particle "
+    "geometry inference optimization differentiable physics attention "
+    "temporal volumetric stochastic hierarchical"
+).split()
+
+_NAMES = (
+    "Ada Lovelace",
+    "Alan Turing",
+    "Grace Hopper",
+    "Donald Knuth",
+    "Barbara Liskov",
+    "Edsger Dijkstra",
+    "Frances Allen",
+    "John Backus",
+)
+
+
+def synthetic_library(nb_items, doi_rate=0.5, seed=0) -> list:
+    """
+    Build a synthetic library, as papers served by the mock site and as the Zotero items sent by the runner.
+
+    :param nb_items: Number of items.
+    :param doi_rate: Fraction of the items that have a DOI, the others are searched by title.
+    :param seed: Seed of the titles, authors and years.
+    :return: A list of dictionaries with title, authors (Semantic Scholar and Zotero formats), year and doi.
+    """
+    generator = random.Random(seed)
+    library = []
+    for number in range(nb_items):
+        title = (
+            " ".join(generator.sample(_WORDS, 6)).capitalize() + f" {number}"
+        )
+        names = generator.sample(_NAMES, generator.randint(1, 4))
+        year = str(generator.randint(1990, 2025))
+        library.append(
+            {
+                "title": title,
+                "authors": ", ".join(names),
+                "zotero_authors": "; ".join(
+                    f"{name.split(' ')[-1]}, {name.split(' ')[0]}"
+                    for name in names
+                ),
+                "year": year,
+                "doi": (
+                    f"10.5555/{paper_id(title)}"
+                    if generator.random() < doi_rate
+                    else ""
+                ),
+            }
+        )
+    return library
+
+
+def _paper_ids(paper) -> list:
+    return [f"DOI:{paper['doi']}"] if paper["doi"] else []
+
+
+def run(args):
+    library = synthetic_library(args.items, args.doi_rate, args.seed)
+    generator = random.Random(args.seed)
+    saved = [
+        paper["title"]
+        for paper in library
+        if generator.random() < args.saved_rate
+    ]
+    mock = MockSemanticScholar(
+        library,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        popup_rate=args.popup_rate,
+        seed=args.seed,
+        saved=saved,
+    ).start()
+    work_dir = tempfile.mkdtemp(prefix="benchmark_")
+    log_file = open(os.path.join(work_dir, "log.txt"), "a", encoding="utf-8")
+    metrics = MetricsRecorder(
+        args.metrics or os.path.join(work_dir, "metrics.jsonl")
+    )
+    # The human-like delays keep their proportions but are scaled down
+    pacing = PacingController(
+        min_interval=0.3,
+        sleep=lambda seconds: time.sleep(seconds * args.sleep_scale),
+    )
+    scrapper = SemanticScholarScrapper(
+        log_file,
+        work_dir,
+        timeout=args.timeout,
+        headless=not args.show_browser,
+        site_url=mock.url,
+        site_sign_in_url=mock.url + "sign-in",
+        paper_redirect_url=mock.url + "redirect/",
+        email="benchmark@example.com",
+        password="benchmark",
+        pacing=pacing,
+        persist_session=False,
+        lookahead=args.lookahead,
+    )
+
+    print(f"Mock site running on {mock.url}, {len(library)} items.")
+    try:
+        if not scrapper.connect_to_account(
+            "benchmark@example.com", "benchmark"
+        ):
+            print("Error: Unable to sign in to the mock site.")
+            return 1
+
+        start_time = time.perf_counter()
+        account_papers = AccountPapers()
+        if not args.no_sync:
+            library, library_complete = scrapper.scrap_library()
+            alerts, alerts_complete = scrapper.scrap_alerts()
+            account_papers = AccountPapers(
+                library, alerts, library_complete, alerts_complete
+            )
+            print(
+                f"Account read in {time.perf_counter() - start_time:.1f}s: "
+                f"{len(account_papers.library or {})} papers in library."
+            )
+        for number, paper in enumerate(library, start=1):
+            timer = ItemTimer(str(number), paper["title"])
+            known = (
+                paper["title"],
+                "",
+                paper["year"],
+                paper["zotero_authors"],
+            )
+            if account_papers.in_library(*known) and account_papers.in_alerts(
+                *known
+            ):
+                timer.stop("synced")
+                metrics.record(timer)
+                continue
+            # The next papers load in background tabs while this one is processed
+            scrapper.prefetch(
+                [
+                    (other["title"], _paper_ids(other), other["year"])
+                    for other in library[number : number + args.lookahead]
+                ]
+            )
+            scrapper.timer = timer
+            paper_ids = _paper_ids(paper)
+            if not scrapper.scrap_paper_by_title(
+                paper["title"],
+                False,
+                paper_ids=paper_ids,
+                year=paper["year"],
+                authors=paper["zotero_authors"],
+            ):
+                timer.stop(scrapper.last_failure or "not_found")
+            else:
+                add_alert = save_to_library = True
+                if args.actions in ("both", "alert"):
+                    with timer.phase("popup_cancel"):
+                        scrapper.cancel_create_paper_alert()
+                    with timer.phase("alert"):
+                        add_alert = scrapper.alert()
+                if args.actions in ("both", "library"):
+                    with timer.phase("save"):
+                        save_to_library = scrapper.save_to_library()
+                timer.stop(
+                    "done" if add_alert and save_to_library else "failed"
+                )
+            scrapper.timer = None
+            metrics.record(timer)
+            if number % 10 == 0 or number == len(library):
+                elapsed = time.perf_counter() - start_time
+                print(
+                    f"{number}/{len(library)} items, "
+                    f"{number * 60 / elapsed:.1f} items/min"
+                )
+
+        elapsed = time.perf_counter() - start_time
+        print(
+            f"\n{len(library)} items in {elapsed:.1f}s: "
+            f"{len(library) * 60 / elapsed:.1f} items/min"
+        )
+        print(
+            f"Mock site: {mock.requests} requests, {mock.errors} error pages, "
+            f"{len(mock.alerts)} alerts, {len(mock.library)} papers in library."
+        )
+        print(metrics.format_summary())
+        return 0
+    finally:
+        scrapper._close_browser()
+        metrics.close()
+        log_file.close()
+        mock.stop()
+        print(f"Log and metrics written in {work_dir}.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark SemanticScholarScrapper against a local mock of Semantic Scholar."
+    )
+    parser.add_argument(
+        "-n",
+        "--items",
+        type=int,
+        default=100,
+        help="Number of synthetic items (default: 100).",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds added to every response of the mock site (default: 0.05).",
+    )
+    parser.add_argument(
+        "--jitter",
+        type=float,
+        default=0.05,
+        help="Maximum random seconds added to the latency (default: 0.05).",
+    )
+    parser.add_argument(
+        "--error-rate",
+        type=float,
+        default=0.0,
+        help="Probability that a search or paper page is an error page (default: 0).",
+    )
+    parser.add_argument(
+        "--popup-rate",
+        type=float,
+        default=1.0,
+        help="Probability that a paper page opens with the alert popup (default: 1).",
+    )
+    parser.add_argument(
+        "--doi-rate",
+        type=float,
+        default=0.5,
+        help="Fraction of the items opened by DOI instead of searched (default: 0.5).",
+    )
+    parser.add_argument(
+        "--actions",
+        choices=["both", "alert", "library"],
+        default="both",
+        help="Actions done on each paper (default: both).",
+    )
+    parser.add_argument(
+        "--saved-rate",
+        type=float,
+        default=0.0,
+        help="Fraction of the papers already in the library and with an alert (default: 0).",
+    )
+    parser.add_argument(
+        "--no-sync",
+        action="store_true",
+        help="Do not read the library and alerts of the account before the items.",
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=0,
+        help="Number of the next papers loaded in background tabs (default: 0).",
+    )
+    parser.add_argument(
+        "--sleep-scale",
+        type=float,
+        default=0.01,
+        help="Factor applied to the human-like delays (default: 0.01).",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=5,
+        help="Seconds to wait for elements (default: 5).",
+    )
+    parser.add_argument(
+        "--seed", type=int, default=0, help="Seed of the synthetic library."
+    )
+    parser.add_argument(
+        "--metrics",
+        type=str,
+        help="Path to the JSONL file of the per-item timings.",
+    )
+    parser.add_argument(
+        "--show-browser",
+        action="store_true",
+        help="Run the browser with a window.",
+    )
+    sys.exit(run(parser.parse_args()))
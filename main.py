@@ -1,9 +1,8 @@
 import argparse
-import csv
 import getpass
-import hashlib
 import os
 import queue
+import sqlite3
 import sys
 import threading
 import time
@@ -11,7 +10,29 @@ import tkinter as tk
 from tkinter import filedialog as fd
 from tkinter import messagebox, ttk
 
-from SemanticScholarScrapper import SemanticScholarScrapper
+from AccountSync import AccountPapers, match_account_papers, removal_done
+from AsyncLog import AsyncLogFile, guess_level
+from GraphApiResolver import GraphApiResolver
+from ItemMetrics import ItemTimer, MetricsRecorder
+from PacingController import PacingController
+from PaperIdentifiers import doi_from_ids, extract_semantic_scholar_id
+from ProgressEstimator import (
+    OUTCOME_CACHED,
+    OUTCOME_FAILED,
+    OUTCOME_SCRAPED,
+    ProgressEstimator,
+)
+from ResolutionCache import ResolutionCache
+from ScrapperPool import ScrapperPool
+from StateStore import STATUS_DONE, StateStore
+from WorkPlanner import RemovalItem, plan_work
+from ZoteroReader import (
+    RELEVANT_ITEM_TYPES,
+    ZoteroDatabaseReader,
+    is_zotero_database,
+    iter_csv_items,
+    legacy_key,
+)
 
 
 def get_base_directory():
@@ -23,13 +44,47 @@ def get_base_directory():
         return os.path.abspath(os.path.join(current_directory, os.pardir))
 
 
+def print_failed_items(state_file_name):
+    """
+    Print the items that could not be sent, the next to be retried first.
+
+    :param state_file_name: Path to the state store.
+    """
+    if not os.path.isfile(state_file_name):
+        print("No item has been sent yet.")
+        return
+    state_store = StateStore(state_file_name)
+    try:
+        failed_items = state_store.failed_items()
+    finally:
+        state_store.close()
+    if not failed_items:
+        print("No failed item.")
+        return
+    now = time.time()
+    for state in failed_items:
+        next_attempt_at = state["next_attempt_at"] or now
+        next_attempt = (
+            "now"
+            if next_attempt_at <= now
+            else time.strftime(
+                "%Y-%m-%d %H:%M", time.localtime(next_attempt_at)
+            )
+        )
+        print(
+            f"{state['title']} - {state['last_error']}, "
+            f"{state['failures']} failed runs, next attempt: {next_attempt}"
+        )
+    print(f"{len(failed_items)} failed items.")
+
+
 class MainGUI(object):
 
     def __init__(self):
         self.path = get_base_directory()
         self.root = tk.Tk()
         self.root.title("Zotero2SemanticScholar")
-        self.root.geometry("400x400")  # Increased height for progress bar
+        self.root.geometry("400x460")  # Increased height for progress bar
         self.root.protocol("WM_DELETE_WINDOW", self.onClosing)
 
         # Initialize queue for thread-safe communication
@@ -72,28 +127,66 @@ class MainGUI(object):
         self.lblTimeRemaining = ttk.Label(
             self.root, text="Estimated time remaining: 0s"
         )
+        self.lblWorkersProgress = ttk.Label(self.root, text="")
+
+        # Number of browsers running in parallel
+        self.lblWorkers = ttk.Label(self.root, text="Parallel browsers:")
+        self.spinWorkers = ttk.Spinbox(self.root, from_=1, to=8, width=5)
+        self.spinWorkers.set(1)
 
         self.fileName = ""
-        # We'll store CSV rows in a list of dictionaries
+        # We'll store the relevant Zotero items in a list of ZoteroItem
         self.data = []
         self.email = ""
         self.passwd = ""
         self.hasFile = False
+        self.nbWorkers = 1
+        self.useApi = True
+        self.adaptivePacing = True
+        self.persistSession = True
+        self.blockResources = True
+        self.pageLoadStrategy = "eager"
+        # Retry the items that failed in a previous run even if they are not due yet
+        self.retryFailed = False
+        # Actions done on the items whose tags or columns do not request specific ones
+        self.addAlert = True
+        self.addToLibrary = True
+        # Read the library and alerts of the account before sending the items
+        self.syncAccount = True
+        # Disable the alert and remove from the library the saved papers no longer in Zotero
+        self.removeDeleted = False
+        # Number of the next items whose page is loaded in background tabs by each browser
+        self.lookahead = 0
+        # The {key: title} of every item of the Zotero database, None for a CSV export
+        self.libraryItems = None
+        self.sentPaperIds = set()
+        self.apiUrl = "https://api.semanticscholar.org/graph/v1"
         self._pack()
 
+        # Locks shared by the workers of the ScrapperPool
+        self.saveLock = threading.Lock()
+        self.progressLock = threading.Lock()
+        self.processedItems = 0
+        self.totalItems = 0
+        self.alertMessages = ""
+
         # Save file information
         self.saveFileName = os.path.join(self.path, "saveDataSC.csv")
-        self.saveFile = None
+        self.stateFileName = os.path.join(self.path, "saveDataSC.db")
+        self.stateStore = None
         self.logFileName = os.path.join(self.path, "log.txt")
+        self.cacheFileName = os.path.join(self.path, "resolutionCache.db")
+        self.metricsFileName = os.path.join(self.path, "metrics.jsonl")
+        self.metrics = None
+        self.estimator = None
         self.savedKeys = set()
+        # (meta name, dateModified) to store once the items read from a Zotero database are sent
+        self.libraryWatermark = None
         self._initSaveData()
 
-        self.logFile = open(
-            self.logFileName, "a", encoding="utf-8", errors="ignore"
-        )
+        self.logFile = AsyncLogFile(self.logFileName)
         self.hasAlreadySaveFile = False
         self._autoFillID()
-        self.hasWriteIdInLog = False
 
         if os.path.isfile("bibliography.csv"):
             print(
@@ -107,38 +200,16 @@ class MainGUI(object):
 
     def _initSaveData(self):
         """
-        Initialize the 'saveDataSC.csv' file and read existing saved keys into a set.
+        Open the state store 'saveDataSC.db', import the legacy 'saveDataSC.csv' once,
+        and read the keys of the completed items into a set.
         """
-        file_exists = os.path.exists(self.saveFileName)
-
-        if not file_exists:
-            # Create the file with a header
-            with open(
-                self.saveFileName, "w", encoding="utf-8", newline=""
-            ) as f:
-                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-                writer.writerow(["Key", "Title"])
-        else:
-            # Read existing keys from saveFileName into a set
-            with open(
-                self.saveFileName, "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    # Only add nonempty keys
-                    key_val = row.get("Key", "").strip()
-                    if key_val:
-                        self.savedKeys.add(key_val)
-
-        # Open in append mode to write new entries later
-        self.saveFile = open(
-            self.saveFileName,
-            "a",
-            encoding="utf-8",
-            errors="ignore",
-            newline="",
-        )
-        self.saveWriter = csv.writer(self.saveFile, quoting=csv.QUOTE_ALL)
+        if self.stateStore:
+            self.stateStore.close()
+        self.stateStore = StateStore(self.stateFileName)
+        nb_imported = self.stateStore.import_csv(self.saveFileName)
+        if nb_imported:
+            print(f"Imported {nb_imported} items from {self.saveFileName}.")
+        self.savedKeys = self.stateStore.completed_keys()
 
     def _autoFillID(self):
         """
@@ -166,6 +237,8 @@ class MainGUI(object):
         self.entryEmail.pack(fill="x", padx=10, pady=(0, 10))
         self.lblPasswd.pack(anchor="nw", **padding_options)
         self.entryPasswd.pack(fill="x", padx=10, pady=(0, 10))
+        self.lblWorkers.pack(anchor="nw", **padding_options)
+        self.spinWorkers.pack(anchor="nw", padx=10, pady=(0, 10))
         self.separator.pack(fill="x", pady=10, padx=10)
         self.buttonSelectFiles.pack(expand=True, fill="both", padx=10, pady=10)
         self.separator.pack(fill="x", padx=10, pady=(10, 0))
@@ -176,9 +249,14 @@ class MainGUI(object):
         self.progress.pack(pady=(20, 5))
         self.lblProgress.pack()
         self.lblTimeRemaining.pack()
+        self.lblWorkersProgress.pack()
 
     def _selectFiles(self):
-        filetypes = (("CSV files", "*.csv"), ("All files", "*.*"))
+        filetypes = (
+            ("CSV files", "*.csv"),
+            ("Zotero database", "*.sqlite"),
+            ("All files", "*.*"),
+        )
         self.fileName = fd.askopenfilename(
             title="Open a file",
             initialdir=os.path.expanduser("~"),
@@ -189,57 +267,138 @@ class MainGUI(object):
 
     def _csvToDataList(self):
         """
-        Read the selected CSV into a list of dictionaries, filter relevant types, and set flags.
+        Read the relevant items of the selected CSV, or Zotero database, into a list of compact ZoteroItem.
         """
         self.lblLoading.config(text="Reading library...")
         try:
-            with open(
-                self.fileName, "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                reader = csv.DictReader(f)
-                data_list = list(reader)
+            self.data = self._readLibrary(self.fileName, RELEVANT_ITEM_TYPES)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to read CSV file: {e}")
             self.writeInLog(f"Error reading CSV file: {e}\n")
             return
 
-        # Add default columns
-        for row in data_list:
-            row["Add Alert"] = True
-            row["Add to Library"] = True
-
-        # Filter for relevant item types
-        relevant_types = [
-            "journalArticle",
-            "conferencePaper",
-            "bookSection",
-            "preprint",
-            "thesis",
-            "book",
-        ]
-        filtered_data_list = [
-            row for row in data_list if row.get("Item Type") in relevant_types
-        ]
-
-        self.data = filtered_data_list
         self.hasFile = True
         self.lblLoading.config(text="Library loaded successfully.")
         self.writeInLog("Library loaded successfully.\n")
 
+    def _readLibrary(self, file_name, item_types):
+        """
+        Read the items of a CSV export, or the items of a Zotero database modified since its last run.
+
+        :param file_name: Path to the CSV file or to zotero.sqlite.
+        :param item_types: The item types to keep, or None to keep every item.
+        :return: A list of ZoteroItem.
+        """
+        self.libraryWatermark = None
+        self.libraryItems = None
+        if not is_zotero_database(file_name):
+            data = list(
+                iter_csv_items(
+                    file_name, item_types, self.addAlert, self.addToLibrary
+                )
+            )
+            self._adoptLegacyKeys(
+                file_name,
+                {zotero_item.key: zotero_item.title for zotero_item in data},
+            )
+            return data
+
+        meta_name = f"zotero_watermark:{os.path.abspath(file_name)}"
+        since = self.stateStore.get_meta(meta_name, "")
+        reader = ZoteroDatabaseReader(file_name)
+        try:
+            data = list(
+                reader.iter_items(
+                    since, item_types, self.addAlert, self.addToLibrary
+                )
+            )
+            if since:
+                print(f"Read {len(data)} items modified since {since}.")
+            self.libraryItems = reader.all_items(item_types)
+            self._adoptLegacyKeys(file_name, self.libraryItems)
+            # The items that failed in a previous run are read again even if they are older than the watermark
+            read_keys = {zotero_item.key for zotero_item in data}
+            failed_keys = [
+                state["key"]
+                for state in self.stateStore.failed_items()
+                if state["key"] not in read_keys
+            ]
+            failed = list(
+                reader.iter_items_by_key(
+                    failed_keys, item_types, self.addAlert, self.addToLibrary
+                )
+            )
+            if failed:
+                print(
+                    f"Read {len(failed)} items that failed in a previous run."
+                )
+            data += failed
+        finally:
+            reader.close()
+        if reader.watermark:
+            self.libraryWatermark = (meta_name, reader.watermark)
+        return data
+
+    def _adoptLegacyKeys(self, file_name, library):
+        """
+        Move the state saved by the previous versions, under the MD5 hash of the title of an item,
+        to the Zotero key of the item. It is done once per library file, and only while the store holds such keys.
+
+        :param file_name: Path to the CSV file or to zotero.sqlite the library was read from.
+        :param library: A dictionary {key: title} of the items read.
+        """
+        meta_name = f"legacy_keys_adopted:{os.path.abspath(file_name)}"
+        if self.stateStore.get_meta(meta_name):
+            return
+        old_keys = self.stateStore.legacy_keys()
+        new_keys = dict()
+        if old_keys:
+            for key, title in library.items():
+                old_key = legacy_key(title)
+                # Two items of the same title share their legacy key, the state goes to the first one
+                if (
+                    old_key in old_keys
+                    and old_key != key
+                    and old_key not in new_keys
+                ):
+                    new_keys[old_key] = key
+        nb_moved = self.stateStore.rekey(new_keys)
+        self.stateStore.set_meta(meta_name, time.time())
+        self.stateStore.flush()
+        if nb_moved:
+            print(f"Moved {nb_moved} saved items to their Zotero key.")
+            self.savedKeys = self.stateStore.completed_keys()
+
+    def _commitWatermark(self, pending):
+        """
+        Store the watermark of the Zotero database once every item read from it is saved,
+        otherwise the next run reads the items again.
+        """
+        if not self.libraryWatermark:
+            return
+        if any(
+            zotero_item.key not in self.savedKeys
+            for _, zotero_item, _ in pending
+            if not isinstance(zotero_item, RemovalItem)
+        ):
+            return
+        meta_name, watermark = self.libraryWatermark
+        self.stateStore.set_meta(meta_name, watermark)
+        self.stateStore.flush()
+
     def writeInLog(self, msg):
         """
-        Write messages to the log file and print them.
+        Queue messages for the log file and print them.
+        The log file starts with the "id:" line read by _autoFillID.
         """
-        if os.stat(self.logFileName).st_size == 0 and not self.hasWriteIdInLog:
-            self.logFile.write(f"id: {self.email}\n")
-            self.hasWriteIdInLog = True
-        self.logFile.write(msg)
-        print(msg)
+        # A log file only starts with an "id:" line once the account is known
+        self.logFile.header = f"id: {self.email}" if self.email else None
+        self.logFile.log(msg, guess_level(msg), echo=True)
 
     def onClosing(self):
         self.root.destroy()
-        if self.saveFile:
-            self.saveFile.close()
+        if self.stateStore:
+            self.stateStore.close()
         if self.logFile:
             self.logFile.close()
 
@@ -261,15 +420,16 @@ class MainGUI(object):
                     self.lblProgress.config(
                         text=f"Progress: {processed}/{total}"
                     )
-                    remaining_str = self._format_time(remaining)
-                    if processed == 0:
+                    if remaining is None:
                         self.lblTimeRemaining.config(
                             text="Estimated time remaining: Unknown"
                         )
                     else:
                         self.lblTimeRemaining.config(
-                            text=f"Estimated time remaining: {remaining_str}"
+                            text=f"Estimated time remaining: {self._format_time(remaining)}"
                         )
+                elif item[0] == "workers":
+                    self.lblWorkersProgress.config(text=item[1])
                 elif item[0] == "error":
                     self.lblLoading.config(
                         text="Scraping completed with errors."
@@ -298,27 +458,15 @@ class MainGUI(object):
         else:
             return f"{s}s"
 
-    def generate_unique_key(self, row):
-        """
-        Generate a unique key for the CSV row.
-        If the row contains a non-empty "Key" field, use it;
-        otherwise, build a key from the title (and optionally the year).
-        """
-        key = row.get("Key", "").strip()
-        if key:
-            return key
-        title = row.get("Title", "").strip()
-        year = row.get("Year", "").strip() if "Year" in row else ""
-        combined = title + year
-        # Create an MD5 hash from the combined string
-        unique_key = hashlib.md5(combined.encode("utf-8")).hexdigest()
-        return unique_key
-
     def _sendDataToSemanticscholar(self):
         self.lblLoading.config(text="Connecting to SemanticScholar.com...")
         self.writeInLog("Connecting to SemanticScholar.com...\n")
         self.email = self.entryEmail.get().strip()
         self.passwd = self.entryPasswd.get().strip()
+        try:
+            self.nbWorkers = max(1, int(self.spinWorkers.get()))
+        except ValueError:
+            self.nbWorkers = 1
         if not self.email or not self.passwd:
             self.lblLoading.config(text="Please sign in above")
             messagebox.showerror(
@@ -355,23 +503,36 @@ class MainGUI(object):
         try:
             total_items = len(self.data)
             start_time = time.time()
-            processed_items = 0
-            self._update_progress(processed_items, total_items, start_time)
+            self.estimator = None
+            self._update_progress(0, total_items, start_time)
+
+            pending = self._planWork(self.data)
+            total_items = self.totalItems
+            self._update_progress(self.processedItems, total_items, start_time)
+            if not pending:
+                self._commitWatermark(pending)
+                self.lblLoading.config(text="Nothing to send.")
+                self.queue.put(
+                    (
+                        "complete",
+                        "Every item has already been sent to SemanticScholar.",
+                    )
+                )
+                return
 
-            scrapper = SemanticScholarScrapper(
-                self.logFile, self.path, email=self.email, password=self.passwd
-            )
             self.queue.put(("status", "Logging in..."))
             self.writeInLog("Logging in...\n")
             start_time = time.time()
 
-            is_connected = scrapper.connect_to_account(self.email, self.passwd)
-            if is_connected:
-                self.writeInLog("Connected to SemanticScholar.\n")
-                self.queue.put(
-                    ("status", "Sending data to SemanticScholar...")
-                )
-            else:
+            is_connected = self._run_pool(
+                self.email,
+                self.passwd,
+                pending,
+                lambda processed, workers: self._update_progress(
+                    processed, total_items, start_time, workers
+                ),
+            )
+            if not is_connected:
                 self.queue.put(
                     (
                         "error",
@@ -383,252 +544,680 @@ class MainGUI(object):
                 )
                 return
 
-            Alert = ""
+            self._commitWatermark(pending)
+            self.lblLoading.config(text="Finished sending data.")
+            self.writeInLog("Finished sending data.\n")
 
-            for index, row in enumerate(self.data):
-                current_item = index + 1
-                title = row.get("Title", "")
-                row_key = self.generate_unique_key(
-                    row
-                )  # Use the unique key helper
+            if self.alertMessages:
+                self.queue.put(("error", self.alertMessages))
+            else:
+                self.queue.put(
+                    ("complete", "Scraping completed successfully.")
+                )
 
-                if row_key in self.savedKeys:
-                    self.writeInLog(
-                        f"Skip: {title} (Item {current_item}/{total_items}), because it has already been saved.\n"
-                    )
-                    processed_items += 1
-                    self._update_progress(
-                        processed_items, total_items, start_time
-                    )
-                    continue
+        except Exception as e:
+            self.writeInLog(f"Unexpected error during scraping: {e}\n")
+            self.queue.put(("error", f"An unexpected error occurred: {e}"))
+        finally:
+            # The window may stay open long after the run, its updates are written now
+            self.stateStore.flush()
+
+    def _planWork(self, data):
+        """
+        Plan the run before any browser is started: skip the saved items, merge the items of the same paper,
+        and log the real work count with an estimated duration.
+
+        :param data: The list of ZoteroItem.
+        :return: A list of (item number, ZoteroItem, duplicates) tuples to scrap.
+        """
+        self.totalItems = len(data)
+        self.alertMessages = ""
+        # The papers found for the items of the run, never removed even if another item of theirs was
+        self.sentPaperIds = set()
+        deferred_keys = (
+            set() if self.retryFailed else self.stateStore.deferred_keys()
+        )
+        plan = plan_work(
+            data,
+            self.savedKeys,
+            deferred_keys,
+            self.stateStore.completed_items(),
+            self.libraryItems,
+        )
+        # A saved item requesting a step that was not done is sent again
+        for _, zotero_item, duplicates in plan.work:
+            for sent_item in [zotero_item] + duplicates:
+                self.savedKeys.discard(sent_item.key)
+
+        for zotero_item in plan.duplicates_of_saved:
+            self.writeInLog(
+                f"Skip: {zotero_item.title}, because the same paper has already been saved.\n"
+            )
+            self.stateStore.mark_completed(
+                zotero_item.key,
+                zotero_item.title,
+                zotero_item.add_alert,
+                zotero_item.add_to_library,
+            )
+            self.savedKeys.add(zotero_item.key)
+
+        removals = self._planRemovals(plan)
+        self.totalItems += len(removals)
+
+        self.processedItems = plan.nb_done
+        self.estimator = ProgressEstimator(len(plan.work), self.nbWorkers)
+        self.estimator.skip(plan.nb_done)
+        self.writeInLog(
+            f"Plan: {plan.total} items, {len(plan.saved)} already saved, "
+            f"{len(plan.duplicates_of_saved) + plan.nb_duplicates + len(plan.repeated)} duplicates, "
+            f"{len(plan.deferred)} failed recently, "
+            f"{len(plan.no_action)} without action, "
+            f"{len(plan.work)} to send, {len(removals)} to remove. Estimated duration: "
+            f"{self._format_time(plan.estimated_seconds(nb_workers=self.nbWorkers))}.\n"
+        )
+        return plan.work + removals
+
+    def _planRemovals(self, plan):
+        """
+        :param plan: The WorkPlan of the run.
+        :return: The removals of the plan to run, none unless removeDeleted is set.
+        """
+        if plan.unknown_removals:
+            self.writeInLog(
+                f"{len(plan.unknown_removals)} saved items are no longer in Zotero, "
+                "but their paper or their item cannot be matched safely, they are not removed.\n"
+            )
+        if not plan.removals:
+            return []
+        if not self.removeDeleted:
+            self.writeInLog(
+                f"{len(plan.removals)} saved papers are no longer in Zotero, "
+                "use --remove-deleted to remove them from Semantic Scholar.\n"
+            )
+            return []
+        # An export of a single collection would look like the removal of every other paper
+        if (
+            self.libraryItems is None
+            and len(plan.removals) > 10
+            and len(plan.removals) > len(plan.saved)
+        ):
+            self.writeInLog(
+                f"Warning - {len(plan.removals)} saved papers are missing from the library, "
+                "more than the ones still in it. It looks like a partial export, no paper is removed.\n"
+            )
+            return []
+        for _, removal, _ in plan.removals:
+            self.writeInLog(
+                f"Remove: {removal.title}, because it is no longer in Zotero.\n"
+            )
+        return plan.removals
+
+    def _run_pool(self, email, password, pending, report_progress) -> bool:
+        """
+        Scrap the pending rows with a pool of parallel browsers.
+
+        :param email: User's email.
+        :param password: User's password.
+        :param pending: Work items returned by _planWork.
+        :param report_progress: Callable (processed, processed by worker) to report progress.
+        :return: False if no worker could log in, True otherwise.
+        """
+
+        def on_item_done(worker_id, item, result):
+            if result and not isinstance(item[1], RemovalItem):
+                self._deferFailed(item)
+            with self.progressLock:
+                self.processedItems += 1 + len(item[2])
+                if result:
+                    self.alertMessages += result
+                report_progress(
+                    self.processedItems, dict(pool.processed_by_worker)
+                )
 
+        def on_item_deferred(worker_id, item, failure, delay):
+            self.writeInLog(
+                f"Worker {worker_id} - {item[1].title} failed ({failure}), it will be retried in {self._format_time(delay)}.\n"
+            )
+            self.estimator.add_items(1)
+
+        def on_status(worker_id, message):
+            self.queue.put(("status", f"Worker {worker_id}: {message}"))
+            self.writeInLog(f"Worker {worker_id} - {message}\n")
+
+        # The removed items are opened by paper ID, without search
+        additions = [
+            entry for entry in pending if not isinstance(entry[1], RemovalItem)
+        ]
+        cache = ResolutionCache(self.cacheFileName)
+        self.estimator.expect_cached(
+            sum(
+                1
+                for _, zotero_item, _ in additions
+                if cache.contains(
+                    zotero_item.title,
+                    doi_from_ids(zotero_item.paper_ids()),
+                    zotero_item.year,
+                )
+            )
+        )
+        # Shared by the workers, since they all hit the same site with the same account
+        pacing = PacingController(adaptive=self.adaptivePacing)
+        resolver = None
+        resolved_ids = dict()
+        if self.useApi and additions:
+            resolver = GraphApiResolver(
+                self.logFile, base_url=self.apiUrl, pool_size=self.nbWorkers
+            )
+            # Resolve every identifier of the run with a few batch requests
+            paper_ids = []
+            for _, zotero_item, _ in additions:
+                paper_ids += zotero_item.paper_ids()
+            if paper_ids:
                 self.writeInLog(
-                    f"Searching: {title} (Item {current_item}/{total_items})\n"
+                    f"Resolving {len(paper_ids)} identifiers with the Graph API...\n"
                 )
-                has_add_paper = scrapper.scrap_paper_by_title(title, False)
-                if not has_add_paper:
-                    msg = f"Could not add '{title}'. It has not been found or there was some error with SemanticScholar.\n"
-                    self.writeInLog(msg)
-                    Alert += msg
-                    processed_items += 1
-                    self._update_progress(
-                        processed_items, total_items, start_time
+                resolved_ids = resolver.resolve_ids(paper_ids)
+
+        def paper_id_for(zotero_item):
+            state = self.stateStore.get(zotero_item.key) or dict()
+            if state.get("paper_id"):
+                return state["paper_id"]
+            for paper_id in zotero_item.paper_ids():
+                if resolved_ids.get(paper_id):
+                    return resolved_ids[paper_id][0]
+            cached = cache.get(
+                zotero_item.title,
+                doi_from_ids(zotero_item.paper_ids()),
+                zotero_item.year,
+            )
+            return cached["paper_id"] if cached else ""
+
+        def on_prefetch(worker_id, scrapper, items):
+            scrapper.prefetch(
+                [
+                    (
+                        zotero_item.title,
+                        zotero_item.paper_ids(),
+                        zotero_item.year,
                     )
-                    continue
+                    for _, zotero_item, _ in items
+                    if not isinstance(zotero_item, RemovalItem)
+                ]
+            )
+
+        def on_ready(worker_id, scrapper):
+            if self.syncAccount:
+                self._syncAccount(worker_id, scrapper, pending, paper_id_for)
+
+        self.metrics = MetricsRecorder(self.metricsFileName)
+        pool = ScrapperPool(
+            self.logFile,
+            self.path,
+            email,
+            password,
+            nb_workers=self.nbWorkers,
+            process_item=self._process_item,
+            on_item_done=on_item_done,
+            on_status=on_status,
+            on_item_deferred=on_item_deferred,
+            on_ready=on_ready,
+            lookahead=self.lookahead,
+            on_prefetch=on_prefetch,
+            scrapper_options={
+                "resolver": resolver,
+                "cache": cache,
+                "pacing": pacing,
+                "persist_session": self.persistSession,
+                "block_resources": self.blockResources,
+                "page_load_strategy": self.pageLoadStrategy,
+                "lookahead": self.lookahead,
+            },
+        )
+        try:
+            return pool.run(pending)
+        finally:
+            stats = pacing.stats()
+            self.writeInLog(
+                f"Pacing: scale {stats['scale']:.2f}, "
+                f"slept {stats['slept_seconds']:.0f}s in {stats['sleeps']} sleeps, "
+                f"{stats['errors']} errors, {stats['restarts']} restarts, "
+                f"average page load {stats['average_response_seconds']:.1f}s.\n"
+            )
+            summary = self.metrics.format_summary()
+            self.writeInLog(f"Timing per phase:\n{summary}\n")
+            print(f"Timing per phase:\n{summary}")
+            self.metrics.close()
+            self.metrics = None
+            if resolver:
+                resolver.close()
+            cache.close()
+
+    def _process_item(self, worker_id, scrapper, item):
+        """
+        Search a row on Semantic Scholar, add an alert on it and save it to the library,
+        and record the time spent in each phase.
+
+        :param worker_id: Identifier of the worker running the scrapper.
+        :param scrapper: A logged-in SemanticScholarScrapper.
+        :param item: A work item returned by _planWork.
+        :return: An error message if the row could not be added, None otherwise.
+        """
+        zotero_item = item[1]
+        # The pool reads the failure after the item, and the outcome is read from the match,
+        # neither must be the one of the previous item
+        scrapper.last_failure = None
+        scrapper.last_match = None
+        timer = ItemTimer(zotero_item.key, zotero_item.title, worker_id)
+        scrapper.timer = timer
+        try:
+            if isinstance(zotero_item, RemovalItem):
+                return self._remove_item(worker_id, scrapper, item, timer)
+            return self._send_item(worker_id, scrapper, item, timer)
+        finally:
+            scrapper.timer = None
+            if timer.outcome is None:
+                timer.stop("error")
+            if self.metrics:
+                self.metrics.record(timer)
+            # The removals are not part of the estimate, they have no search and no match
+            if (
+                self.estimator
+                and timer.outcome != "synced"
+                and not isinstance(zotero_item, RemovalItem)
+            ):
+                if timer.outcome != "done":
+                    outcome = OUTCOME_FAILED
+                elif (scrapper.last_match or {}).get("source") == "cache":
+                    outcome = OUTCOME_CACHED
+                else:
+                    outcome = OUTCOME_SCRAPED
+                self.estimator.record(outcome, timer.seconds)
+                self.estimator.skip(len(item[2]))
+
+    def _send_item(self, worker_id, scrapper, item, timer):
+        """
+        Send a row to Semantic Scholar, see _process_item.
 
-                # Attempt to add alert and save to library
+        :param timer: The ItemTimer of the row, its outcome is set before returning.
+        """
+        current_item, zotero_item, duplicates = item
+        total_items = self.totalItems
+        row_key = zotero_item.key
+        title = zotero_item.title
+
+        if row_key in self.savedKeys:
+            self.writeInLog(
+                f"Worker {worker_id} - '{title}' is already on the account.\n"
+            )
+            timer.stop("synced")
+            return None
+
+        state = self.stateStore.get(row_key) or dict()
+        self.stateStore.start_attempt(row_key, title)
+
+        self.writeInLog(
+            f"Worker {worker_id} - Searching: {title} (Item {current_item}/{total_items})\n"
+        )
+        has_add_paper = scrapper.scrap_paper_by_title(
+            title,
+            False,
+            paper_ids=zotero_item.paper_ids(),
+            year=zotero_item.year,
+            authors=zotero_item.authors,
+            venue=zotero_item.publication_title,
+        )
+        if not has_add_paper:
+            msg = f"Could not add '{title}'. It has not been found or there was some error with SemanticScholar.\n"
+            self.writeInLog(msg)
+            failure = scrapper.last_failure or "not found"
+            self.stateStore.set_error(row_key, failure)
+            timer.stop(failure)
+            return msg
+
+        paper_id = extract_semantic_scholar_id(
+            scrapper.last_match["paper_url"]
+        )
+        self.stateStore.set_paper_id(row_key, paper_id)
+        self.sentPaperIds.add(paper_id)
+
+        # The duplicates sent along with the item may request other actions
+        wants_alert = any(
+            sent_item.add_alert for sent_item in [zotero_item] + duplicates
+        )
+        wants_library = any(
+            sent_item.add_to_library
+            for sent_item in [zotero_item] + duplicates
+        )
+
+        # Attempt to add alert and save to library if requested, unless a previous run already did it
+        if not wants_alert or state.get("alert_status") == STATUS_DONE:
+            add_alert = True
+        else:
+            with timer.phase("popup_cancel"):
                 scrapper.cancel_create_paper_alert()
+            with timer.phase("alert"):
                 add_alert = scrapper.alert()
+            self.stateStore.set_step(row_key, "alert", add_alert)
+        if not wants_library or state.get("library_status") == STATUS_DONE:
+            save_to_library = True
+        else:
+            with timer.phase("save"):
                 save_to_library = scrapper.save_to_library()
+            self.stateStore.set_step(row_key, "library", save_to_library)
+
+        if not add_alert and not save_to_library:
+            msg = f"Could not add alert for '{title}'.\n"
+            self.writeInLog(msg)
+            self.stateStore.set_error(row_key, "alert and library failed")
+            timer.stop("failed")
+            return msg
+
+        if not add_alert and not wants_library:
+            msg = f"Could not add alert for '{title}'.\n"
+            self.writeInLog(msg)
+            self.stateStore.set_error(row_key, "alert failed")
+            timer.stop("failed")
+            return msg
+        if not save_to_library and not wants_alert:
+            msg = f"Could not save '{title}' to library.\n"
+            self.writeInLog(msg)
+            self.stateStore.set_error(row_key, "library failed")
+            timer.stop("failed")
+            return msg
+
+        if not add_alert:
+            self.writeInLog(
+                f"Could not add alert for '{title}', but added it to library.\n"
+            )
+            self.stateStore.set_error(row_key, "alert failed")
+            timer.stop("alert_failed")
+            return None
+        if not save_to_library:
+            self.writeInLog(
+                f"Could not save '{title}' to library, but added it to alert.\n"
+            )
+            self.stateStore.set_error(row_key, "library failed")
+            timer.stop("library_failed")
+            return None
 
-                if not add_alert and not save_to_library:
-                    msg = f"Could not add alert for '{title}'.\n"
-                    self.writeInLog(msg)
-                    Alert += msg
-                    processed_items += 1
-                    self._update_progress(
-                        processed_items, total_items, start_time
-                    )
-                    continue
+        for sent_item in [zotero_item] + duplicates:
+            self._recordSaved(
+                sent_item.key, sent_item.title, wants_alert, wants_library
+            )
+        timer.stop("done")
+        return None
 
-                if not add_alert:
-                    self.writeInLog(
-                        f"Could not add alert for '{title}', but added it to library.\n"
-                    )
-                if not save_to_library:
-                    self.writeInLog(
-                        f"Could not save '{title}' to library, but added it to alert.\n"
+    def _remove_item(self, worker_id, scrapper, item, timer):
+        """
+        Disable the alert and remove from the library the paper of an item removed from Zotero.
+
+        :param timer: The ItemTimer of the item, its outcome is set before returning.
+        :return: An error message if the paper could not be removed, None otherwise.
+        """
+        removal = item[1]
+        if removal.key not in self.savedKeys:
+            self.writeInLog(
+                f"Worker {worker_id} - '{removal.title}' is no longer on the account.\n"
+            )
+            timer.stop("synced")
+            return None
+
+        if removal.paper_id in self.sentPaperIds:
+            self.writeInLog(
+                f"Worker {worker_id} - '{removal.title}' is kept, its paper has been sent for another item.\n"
+            )
+            self._forgetSaved(removal.key, removal.title)
+            timer.stop("synced")
+            return None
+
+        self.writeInLog(f"Worker {worker_id} - Removing: {removal.title}\n")
+        if not scrapper.open_paper(removal.paper_id):
+            msg = f"Could not remove '{removal.title}', its paper page could not be opened.\n"
+            self.writeInLog(msg)
+            timer.stop("failed")
+            return msg
+
+        disable_alert = True
+        if removal.disable_alert:
+            with timer.phase("alert"):
+                disable_alert = scrapper.disable_alert()
+        remove_from_library = True
+        if removal.remove_from_library:
+            with timer.phase("save"):
+                remove_from_library = scrapper.remove_from_library()
+        if not disable_alert or not remove_from_library:
+            msg = (
+                f"Could not remove '{removal.title}' from Semantic Scholar.\n"
+            )
+            self.writeInLog(msg)
+            timer.stop("failed")
+            return msg
+
+        self._forgetSaved(removal.key, removal.title)
+        timer.stop("done")
+        return None
+
+    def _syncAccount(self, worker_id, scrapper, pending, paper_id_for):
+        """
+        Read the library and alerts of the account once, and mark the items whose requested actions are already done,
+        and the removed items whose paper is no longer on the account, so that their paper pages are not visited.
+
+        :param worker_id: Identifier of the worker running the scrapper.
+        :param scrapper: A logged-in SemanticScholarScrapper.
+        :param pending: Work items returned by _planWork.
+        :param paper_id_for: Callable (ZoteroItem) -> the paper ID known for the item, or "".
+        """
+        additions = [
+            entry for entry in pending if not isinstance(entry[1], RemovalItem)
+        ]
+        removals = [
+            entry[1] for entry in pending if isinstance(entry[1], RemovalItem)
+        ]
+        sent_items = [
+            sent_item
+            for _, zotero_item, duplicates in additions
+            for sent_item in [zotero_item] + duplicates
+        ]
+        self.writeInLog(
+            f"Worker {worker_id} - Reading the library and alerts of the account...\n"
+        )
+        library, library_complete = (
+            scrapper.scrap_library()
+            if any(sent_item.add_to_library for sent_item in sent_items)
+            or any(removal.remove_from_library for removal in removals)
+            else (None, False)
+        )
+        alerts, alerts_complete = (
+            scrapper.scrap_alerts()
+            if any(sent_item.add_alert for sent_item in sent_items)
+            or any(removal.disable_alert for removal in removals)
+            else (None, False)
+        )
+        account_papers = AccountPapers(
+            library, alerts, library_complete, alerts_complete
+        )
+        found = match_account_papers(additions, account_papers, paper_id_for)
+
+        nb_synced = 0
+        for removal in removals:
+            # A paper is only known to be gone when every page of its actions could be read,
+            # otherwise its removal stays in the work and its paper page is visited
+            if not removal_done(removal, account_papers):
+                continue
+            self._forgetSaved(removal.key, removal.title)
+            nb_synced += 1
+
+        for _, zotero_item, duplicates in additions:
+            if zotero_item.key not in found:
+                continue
+            has_alert, in_library = found[zotero_item.key]
+            wants_alert = any(
+                sent_item.add_alert for sent_item in [zotero_item] + duplicates
+            )
+            wants_library = any(
+                sent_item.add_to_library
+                for sent_item in [zotero_item] + duplicates
+            )
+            if (has_alert or not wants_alert) and (
+                in_library or not wants_library
+            ):
+                for sent_item in [zotero_item] + duplicates:
+                    self._recordSaved(
+                        sent_item.key, sent_item.title, has_alert, in_library
                     )
+                nb_synced += 1
+                continue
+            # Only the missing step is done on the paper page
+            self.stateStore.ensure_item(zotero_item.key, zotero_item.title)
+            if has_alert:
+                self.stateStore.set_step(zotero_item.key, "alert", True)
+            if in_library:
+                self.stateStore.set_step(zotero_item.key, "library", True)
+
+        if self.estimator:
+            self.estimator.add_items(-nb_synced)
+        self.writeInLog(
+            f"Worker {worker_id} - {nb_synced} items are already up to date on the account, "
+            f"{len(found)} found on it.\n"
+        )
 
-                # Save the unique key and title
-                sanitized_key = row_key.replace('"', '""')
-                sanitized_title = title.replace('"', '""').replace(",", "")
-                self.saveFile.write(
-                    f'"{sanitized_key}", "{sanitized_title}"\n'
-                )
-                self.saveFile.flush()
-                self.savedKeys.add(row_key)
-                self.writeInLog(
-                    f"Added '{title}' to save file: {self.saveFileName}\n"
-                )
+    def _deferFailed(self, item):
+        """
+        Postpone the next attempt of an item that could not be sent, and of its duplicates.
+
+        :param item: A work item returned by _planWork.
+        """
+        _, zotero_item, duplicates = item
+        state = self.stateStore.get(zotero_item.key) or dict()
+        reason = state.get("last_error") or "failed"
+        for failed_item in [zotero_item] + duplicates:
+            next_attempt_at = self.stateStore.record_failure(
+                failed_item.key, failed_item.title, reason
+            )
+        self.writeInLog(
+            f"{zotero_item.title} will not be tried again before "
+            f"{time.strftime('%Y-%m-%d %H:%M', time.localtime(next_attempt_at))}.\n"
+        )
 
-                processed_items += 1
-                self._update_progress(processed_items, total_items, start_time)
+    def _forgetSaved(self, row_key, title):
+        """
+        Delete a row from the state store once its paper has been removed from the account.
 
-            self.lblLoading.config(text="Finished sending data.")
-            self.writeInLog("Finished sending data.\n")
+        :param row_key: The unique key of the row.
+        :param title: The title of the row.
+        """
+        with self.saveLock:
+            self.stateStore.forget(row_key)
+            self.savedKeys.discard(row_key)
+        self.writeInLog(
+            f"Removed '{title}' from save file: {self.stateFileName}\n"
+        )
 
-            if Alert:
-                self.queue.put(("error", Alert))
-            else:
-                self.queue.put(
-                    ("complete", "Scraping completed successfully.")
-                )
+    def _recordSaved(self, row_key, title, alert=True, library=True):
+        """
+        Mark a row as completed in the state store, once per key, even when several workers finish at the same time.
 
-        except Exception as e:
-            self.writeInLog(f"Unexpected error during scraping: {e}\n")
-            self.queue.put(("error", f"An unexpected error occurred: {e}"))
+        :param row_key: The unique key of the row.
+        :param title: The title of the row.
+        :param alert: Whether the paper of the row has an alert.
+        :param library: Whether the paper of the row is in the library.
+        """
+        with self.saveLock:
+            if row_key in self.savedKeys:
+                return
+            self.stateStore.mark_completed(row_key, title, alert, library)
+            self.savedKeys.add(row_key)
+        self.writeInLog(
+            f"Added '{title}' to save file: {self.stateFileName}\n"
+        )
 
-    def _update_progress(self, processed, total, start_time):
+    def _update_progress(self, processed, total, start_time, workers=None):
         """
         Update progress calculations and push them to the GUI update queue.
         """
-        elapsed_time = time.time() - start_time
-        avg_time = elapsed_time / processed if processed else 0
-        remaining = avg_time * (total - processed)
+        remaining = (
+            self.estimator.remaining_seconds() if self.estimator else None
+        )
         self.queue.put(("progress", processed, total, remaining))
+        if workers and len(workers) > 1:
+            self.queue.put(("workers", self._format_workers(workers)))
 
-    def _scrap_directly(self, email, password, input_bibliography):
+    def _format_workers(self, workers):
         """
-        Run the scraping process in CLI mode using provided arguments.
+        Format the number of items processed by each worker.
         """
-        self.logFile = open(
-            self.logFileName, "a", encoding="utf-8", errors="ignore"
-        )
-        scrapper = SemanticScholarScrapper(
-            self.logFile, self.path, email=email, password=password
+        return " | ".join(
+            f"W{worker_id}: {count}"
+            for worker_id, count in sorted(workers.items())
         )
 
+    def _scrap_directly(self, email, password, input_bibliography):
+        """
+        Run the scraping process in CLI mode using provided arguments.
+        """
+        # The log opened by __init__ is reused, it may already hold queued messages.
+        # Its "id:" header is the login given on the command line.
+        self.email = email
         # Initialize save file for CLI mode
-        if not os.path.exists(self.saveFileName):
-            with open(
-                self.saveFileName, "w", encoding="utf-8", newline=""
-            ) as f:
-                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-                writer.writerow(["Key", "Title"])
-        else:
-            with open(
-                self.saveFileName, "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                reader = csv.DictReader(f)
-                for row in reader:
-                    key_val = row.get("Key", "").strip()
-                    if key_val:
-                        self.savedKeys.add(key_val)
-
-        self.saveFile = open(
-            self.saveFileName,
-            "a",
-            encoding="utf-8",
-            errors="ignore",
-            newline="",
-        )
+        self._initSaveData()
 
         try:
-            self.logFile.write("Logging in...\n")
-            is_connected = scrapper.connect_to_account(email, password)
-
-            if not is_connected:
-                print(
-                    "Error: Unable to connect to Semantic Scholar. Please check your login information."
-                )
-                return
-
-            print("Connected to Semantic Scholar.")
-            self.logFile.write("Connected to Semantic Scholar.\n")
-
             if not os.path.isfile(input_bibliography):
                 print(
                     f"Error: The file '{input_bibliography}' does not exist."
                 )
                 return
 
-            # Read the CSV in CLI mode
-            with open(
-                input_bibliography, "r", encoding="utf-8", errors="ignore"
-            ) as f:
-                reader = csv.DictReader(f)
-                data = list(reader)
-
-            if len(data) == 0:
-                print(f"Error: The file '{input_bibliography}' is empty.")
+            # Read the CSV in CLI mode, every item type is kept.
+            # A Zotero database is filtered like in GUI mode, it also holds attachments and notes.
+            try:
+                data = self._readLibrary(
+                    input_bibliography,
+                    (
+                        RELEVANT_ITEM_TYPES
+                        if is_zotero_database(input_bibliography)
+                        else None
+                    ),
+                )
+            except (ValueError, sqlite3.Error) as e:
+                print(f"Error: {e}")
                 return
 
-            if "Title" not in data[0]:
-                print("Error: The input file must contain a 'Title' column.")
+            if len(data) == 0 and not (
+                self.removeDeleted and is_zotero_database(input_bibliography)
+            ):
+                if is_zotero_database(input_bibliography):
+                    print("Nothing to send, no item has been modified.")
+                else:
+                    print(f"Error: The file '{input_bibliography}' is empty.")
                 return
 
-            total_items = len(data)
-            processed_items = 0
             start_time = time.time()
 
-            for index, row in enumerate(data):
-                title = row.get("Title", "")
-                row_key = self.generate_unique_key(
-                    row
-                )  # Use the unique key helper
-
-                print(f"Processing {index + 1}/{total_items}: {title}")
-                self.logFile.write(f"Searching {title}...\n")
-
-                if row_key in self.savedKeys:
-                    print(
-                        f"Skipping '{title}' because it has already been saved."
-                    )
-                    self.logFile.write(
-                        f"Skipping '{title}' because it has already been saved.\n"
-                    )
-                    processed_items += 1
-                    self._print_progress(
-                        processed_items, total_items, start_time
-                    )
-                    continue
-
-                has_add_paper = scrapper.scrap_paper_by_title(
-                    title, call_browser=False
-                )
-                if not has_add_paper:
-                    print(f"Warning: Could not add '{title}'.")
-                    self.logFile.write(f"Warning: Could not add '{title}'.\n")
-                    processed_items += 1
-                    self._print_progress(
-                        processed_items, total_items, start_time
-                    )
-                    continue
-
-                scrapper.cancel_create_paper_alert()
-                add_alert = scrapper.alert()
-                save_to_library = scrapper.save_to_library()
+            pending = self._planWork(data)
+            total_items = self.totalItems
+            if not pending:
+                self._commitWatermark(pending)
+                print("Nothing to send, every item has already been saved.")
+                return
 
-                if not add_alert and not save_to_library:
-                    msg = f"Could not add alert for '{title}'.\n"
-                    self.logFile.write(msg)
-                    print(msg)
-                elif not add_alert:
-                    self.logFile.write(
-                        f"Could not add alert for '{title}', but added it to library.\n"
-                    )
-                    print(
-                        f"Could not add alert for '{title}', but added it to library.\n"
-                    )
-                elif not save_to_library:
-                    self.logFile.write(
-                        f"Could not save '{title}' to library, but added it to alert.\n"
-                    )
-                    print(
-                        f"Could not save '{title}' to library, but added it to alert.\n"
-                    )
-                else:
-                    self.logFile.write(f"Added '{title}' successfully.\n")
-                    print(f"Added '{title}' successfully.")
-
-                # Save to the file and update the set of saved keys
-                sanitized_key = row_key.replace('"', '""')
-                sanitized_title = title.replace('"', '""').replace(",", " ")
-                self.saveFile.write(
-                    f'"{sanitized_key}", "{sanitized_title}"\n'
-                )
-                self.saveFile.flush()
-                self.savedKeys.add(row_key)
+            self.writeInLog("Logging in...\n")
+            is_connected = self._run_pool(
+                email,
+                password,
+                pending,
+                lambda processed, workers: self._print_progress(
+                    processed, total_items, start_time, workers
+                ),
+            )
 
-                self.logFile.write(
-                    f"Added '{title}' to save file: {self.saveFileName}\n"
+            if not is_connected:
+                print(
+                    "Error: Unable to connect to Semantic Scholar. Please check your login information."
                 )
-                print(f"Added '{title}' to save file: {self.saveFileName}")
-
-                processed_items += 1
-                self._print_progress(processed_items, total_items, start_time)
+                return
 
+            self._commitWatermark(pending)
             print("Scraping completed.")
             self.logFile.write("Scraping completed.\n")
             print("All data processed successfully.")
@@ -638,25 +1227,33 @@ class MainGUI(object):
             print(f"Error: {e}")
 
         finally:
-            scrapper._close_browser()
-            self.saveFile.close()
+            self.stateStore.close()
             self.logFile.close()
 
-    def _print_progress(self, processed, total, start_time):
+    def _print_progress(self, processed, total, start_time, workers=None):
         """
         Print CLI-mode progress and estimated time.
         """
         elapsed_time = time.time() - start_time
-        avg_time = elapsed_time / processed if processed else 0
-        remaining = avg_time * (total - processed)
+        remaining = (
+            self.estimator.remaining_seconds() if self.estimator else None
+        )
 
         # Format time
-        remaining_str = self._format_time(remaining)
+        remaining_str = (
+            self._format_time(remaining)
+            if remaining is not None
+            else "Unknown"
+        )
         elapsed_str = self._format_time(elapsed_time)
 
+        workers_str = ""
+        if workers and len(workers) > 1:
+            workers_str = f" - Workers: {self._format_workers(workers)}"
+
         # Print progress
         print(
-            f"Progress: {processed}/{total} - Elapsed Time: {elapsed_str} - Estimated Remaining Time: {remaining_str}",
+            f"Progress: {processed}/{total} - Elapsed Time: {elapsed_str} - Estimated Remaining Time: {remaining_str}{workers_str}",
             end="\r",
         )
 
@@ -674,11 +1271,84 @@ if __name__ == "__main__":
         "-i",
         "--input_bibliography",
         type=str,
-        help="Path to the input bibliography CSV file.",
+        help="Path to the input bibliography CSV file, or to the zotero.sqlite file of your Zotero data directory.",
+    )
+    parser.add_argument(
+        "-w",
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of browsers running in parallel (default: 1).",
+    )
+    parser.add_argument(
+        "--api-url",
+        type=str,
+        default="https://api.semanticscholar.org/graph/v1",
+        help="Base URL of the Semantic Scholar Graph API.",
+    )
+    parser.add_argument(
+        "--no-session",
+        action="store_true",
+        help="Always log in with the password instead of reusing the saved session.",
+    )
+    parser.add_argument(
+        "--fixed-pacing",
+        action="store_true",
+        help="Keep the default delays between actions instead of adapting them to the site health.",
+    )
+    parser.add_argument(
+        "--no-blocking",
+        action="store_true",
+        help="Load the images, fonts and trackers of the pages, in case the site breaks without them.",
+    )
+    parser.add_argument(
+        "--page-load",
+        choices=["eager", "normal"],
+        default="eager",
+        help="Return from page loads once the DOM is ready (eager, default) or once every resource is loaded (normal).",
+    )
+    parser.add_argument(
+        "--actions",
+        choices=["both", "alert", "library"],
+        default="both",
+        help="Add an alert, save to the library or both (default) on the items that are not tagged s2:alert or s2:library.",
+    )
+    parser.add_argument(
+        "--no-sync",
+        action="store_true",
+        help="Do not read the library and alerts of the account to skip the items already on it.",
+    )
+    parser.add_argument(
+        "--remove-deleted",
+        action="store_true",
+        help="Disable the alert and remove from the library the papers whose Zotero item has been removed since they were sent.",
+    )
+    parser.add_argument(
+        "--lookahead",
+        type=int,
+        default=0,
+        help="Number of the next items whose page is loaded in background tabs of the same browser while an item is processed (default: 0).",
+    )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Try again the items that failed in a previous run, even if their next attempt is not due yet.",
+    )
+    parser.add_argument(
+        "--list-failed",
+        action="store_true",
+        help="List the items that could not be sent, with the reason and the date of their next attempt, then exit.",
+    )
+    parser.add_argument(
+        "--no-api",
+        action="store_true",
+        help="Find papers with the browser only, without the Graph API.",
     )
     args = parser.parse_args()
 
-    if args.login and args.input_bibliography:
+    if args.list_failed:
+        print_failed_items(os.path.join(get_base_directory(), "saveDataSC.db"))
+    elif args.login and args.input_bibliography:
         # Prompt for the password securely
         password = getpass.getpass(
             prompt="Enter your Semantic Scholar password: "
@@ -693,6 +1363,21 @@ if __name__ == "__main__":
         main.path = path
         main.logFileName = log_file_name
         main.saveFileName = save_file_name
+        main.stateFileName = os.path.join(path, "saveDataSC.db")
+        main.cacheFileName = os.path.join(path, "resolutionCache.db")
+        main.nbWorkers = max(1, args.workers)
+        main.useApi = not args.no_api
+        main.adaptivePacing = not args.fixed_pacing
+        main.persistSession = not args.no_session
+        main.blockResources = not args.no_blocking
+        main.pageLoadStrategy = args.page_load
+        main.retryFailed = args.retry_failed
+        main.syncAccount = not args.no_sync
+        main.removeDeleted = args.remove_deleted
+        main.lookahead = max(0, args.lookahead)
+        main.addAlert = args.actions in ("both", "alert")
+        main.addToLibrary = args.actions in ("both", "library")
+        main.apiUrl = args.api_url
         main._scrap_directly(args.login, password, args.input_bibliography)
     else:
         # Run GUI mode
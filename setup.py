@@ -11,8 +11,30 @@ with open("requirements.txt", "r", encoding="utf-8") as fh:
 
 # Dependencies to be included
 build_exe_options = {
-    "packages": ["os", "seleniumbase", "distance", "Levenshtein"],
-    "include_files": ["SemanticScholarScrapper.py", "requirements.txt"],
+    "packages": [
+        "os",
+        "seleniumbase",
+        "Levenshtein",
+        "requests",
+    ],
+    "include_files": [
+        "SemanticScholarScrapper.py",
+        "PaperIdentifiers.py",
+        "GraphApiResolver.py",
+        "ResolutionCache.py",
+        "StateStore.py",
+        "PacingController.py",
+        "ZoteroReader.py",
+        "WorkPlanner.py",
+        "MatchScoring.py",
+        "ScrapperPool.py",
+        "ItemMetrics.py",
+        "AsyncLog.py",
+        "ProgressEstimator.py",
+        "RetryPolicy.py",
+        "AccountSync.py",
+        "requirements.txt",
+    ],
     "excludes": ["tkinter.test"],
 }
 
@@ -0,0 +1,107 @@
+# test_AccountSync.py
+
+from AccountSync import AccountPapers, match_account_papers, removal_done
+from WorkPlanner import RemovalItem
+from ZoteroReader import ZoteroItem
+
+PAPER_ID = "a" * 40
+OTHER_ID = "b" * 40
+
+
+def _paper(title, authors="", year=""):
+    return {"title": title, "authors": authors, "year": year}
+
+
+def test_paper_id_is_matched_whatever_its_title():
+    account_papers = AccountPapers({PAPER_ID: _paper("Another title")})
+
+    assert account_papers.in_library("Paper", PAPER_ID.upper())
+
+
+def test_known_paper_id_is_not_matched_by_title():
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Introduction", "", "2020")}
+    )
+
+    assert not account_papers.in_library("Introduction", PAPER_ID, "2020")
+
+
+def test_short_title_alone_does_not_match():
+    # A generic title of an unrelated paper
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Introduction", "Jane Smith", "2011")}
+    )
+
+    assert not account_papers.in_library("Introduction")
+    assert not account_papers.in_library(
+        "Introduction", year="2020", authors="Doe, John"
+    )
+
+
+def test_title_matches_when_the_year_agrees():
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Deep Learning", "Yann LeCun", "2015")}
+    )
+
+    assert account_papers.in_library("Deep learning.", year="2015")
+
+
+def test_title_matches_when_the_authors_agree():
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Deep Learning", "Yann LeCun, Yoshua Bengio", "")}
+    )
+
+    assert account_papers.in_library(
+        "Deep Learning", authors="LeCun, Yann; Bengio, Yoshua"
+    )
+
+
+def test_match_account_papers_uses_the_fields_of_the_items():
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Introduction", "Jane Smith", "2011")},
+        {OTHER_ID: _paper("Introduction", "Jane Smith", "2011")},
+    )
+    work = [
+        (1, ZoteroItem("ITEM0001", title="Introduction", year="2020"), []),
+        (2, ZoteroItem("ITEM0002", title="Introduction", year="2011"), []),
+    ]
+
+    found = match_account_papers(work, account_papers, lambda item: "")
+
+    assert found == {"ITEM0002": (True, True)}
+
+
+def test_removal_missing_from_a_complete_listing_is_done():
+    account_papers = AccountPapers({}, {}, True, True)
+
+    assert removal_done(
+        RemovalItem("ITEM0001", "Paper", PAPER_ID), account_papers
+    )
+
+
+def test_removal_missing_from_a_truncated_listing_is_not_done():
+    # Only the first page of the library was read, the paper may be on another one
+    account_papers = AccountPapers(
+        {OTHER_ID: _paper("Other paper")}, {}, False, True
+    )
+
+    assert not removal_done(
+        RemovalItem("ITEM0001", "Paper", PAPER_ID), account_papers
+    )
+
+
+def test_removal_still_on_the_account_is_not_done():
+    account_papers = AccountPapers({PAPER_ID: _paper("Paper")}, {}, True, True)
+
+    assert not removal_done(
+        RemovalItem("ITEM0001", "Paper", PAPER_ID), account_papers
+    )
+
+
+def test_removal_only_checks_the_listings_of_its_steps():
+    account_papers = AccountPapers(None, {}, False, True)
+    removal = RemovalItem(
+        "ITEM0001", "Paper", PAPER_ID, remove_from_library=False
+    )
+
+    assert removal_done(removal, account_papers)
@@ -0,0 +1,143 @@
+# test_GraphApiResolver.py
+
+import io
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from GraphApiResolver import GraphApiResolver
+
+# Papers known by the stub: identifier -> paper, and title -> paper
+_PAPERS = {
+    "DOI:10.1000/known": {"paperId": "p1", "title": "Known paper"},
+    "ARXIV:2101.00001": {"paperId": "p2", "title": "Preprint"},
+}
+_TITLES = {"a matched title": {"paperId": "p3", "title": "A matched title"}}
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """
+    Serve /paper/batch and /paper/search/match like the Graph API, failing with a 429
+    while the server still has rate limited answers to give.
+    """
+
+    def log_message(self, *args):
+        pass
+
+    def _answer(self, status, body=None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if status == 429:
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(json.dumps(body or {}).encode("utf-8"))
+
+    def _rate_limited(self) -> bool:
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            if server.rate_limited > 0:
+                server.rate_limited -= 1
+                return True
+        return False
+
+    def do_POST(self):
+        payload = json.loads(
+            self.rfile.read(int(self.headers["Content-Length"]))
+        )
+        if self._rate_limited():
+            return self._answer(429)
+        if urlparse(self.path).path != "/paper/batch":
+            return self._answer(404)
+        self._answer(
+            200, [_PAPERS.get(paper_id) for paper_id in payload["ids"]]
+        )
+
+    def do_GET(self):
+        if self._rate_limited():
+            return self._answer(429)
+        url = urlparse(self.path)
+        if url.path != "/paper/search/match":
+            return self._answer(404)
+        query = parse_qs(url.query)["query"][0]
+        paper = _TITLES.get(query.lower())
+        if paper is None:
+            return self._answer(404, {"error": "Title match not found"})
+        self._answer(200, {"data": [dict(paper, matchScore=100.0)]})
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StubHandler)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.rate_limited = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _resolver(server, **kwargs):
+    host, port = server.server_address
+    return GraphApiResolver(
+        io.StringIO(), base_url=f"http://{host}:{port}", **kwargs
+    )
+
+
+def test_batch_lookup_resolves_identifiers_once(stub_server):
+    resolver = _resolver(stub_server, batch_size=2)
+
+    resolved = resolver.resolve_ids(
+        ["DOI:10.1000/known", "ARXIV:2101.00001", "DOI:10.1000/unknown"]
+    )
+
+    assert resolved == {
+        "DOI:10.1000/known": ("p1", "Known paper"),
+        "ARXIV:2101.00001": ("p2", "Preprint"),
+        "DOI:10.1000/unknown": None,
+    }
+    # Three identifiers in batches of two
+    assert len(stub_server.requests) == 2
+    assert resolver.resolve("Known paper", ["DOI:10.1000/known"]) == (
+        "p1",
+        "Known paper",
+    )
+    assert len(stub_server.requests) == 2
+    resolver.close()
+
+
+def test_rate_limited_batch_is_retried(stub_server):
+    stub_server.rate_limited = 1
+    resolver = _resolver(stub_server)
+
+    assert resolver.resolve_ids(["DOI:10.1000/known"]) == {
+        "DOI:10.1000/known": ("p1", "Known paper")
+    }
+    assert len(stub_server.requests) == 2
+    resolver.close()
+
+
+def test_unknown_identifier_falls_back_to_the_title(stub_server):
+    resolver = _resolver(stub_server)
+
+    assert resolver.resolve("A matched title", ["DOI:10.1000/unknown"]) == (
+        "p3",
+        "A matched title",
+    )
+    assert [path.split("?")[0] for path in stub_server.requests] == [
+        "/paper/batch",
+        "/paper/search/match",
+    ]
+    resolver.close()
+
+
+def test_title_without_match_is_not_resolved(stub_server):
+    resolver = _resolver(stub_server)
+
+    assert resolver.resolve("Nothing like it", ["DOI:10.1000/unknown"]) is None
+    resolver.close()
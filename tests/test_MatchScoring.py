@@ -0,0 +1,109 @@
+# test_MatchScoring.py
+
+from MatchScoring import MatchScorer, title_similarity
+
+
+def test_short_title_with_another_word_is_rejected():
+    scorer = MatchScorer()
+
+    score = scorer.score({"title": "Attention"}, {"title": "Retention"})
+
+    assert not scorer.accepts(score)
+
+
+def test_short_title_with_one_edit_is_accepted():
+    scorer = MatchScorer()
+
+    assert scorer.accepts(
+        scorer.score({"title": "Attention"}, {"title": "Attentions"})
+    )
+    assert scorer.accepts(
+        scorer.score({"title": "Deep Learning"}, {"title": "Deep learning."})
+    )
+
+
+def test_short_title_is_not_saved_by_the_other_fields():
+    scorer = MatchScorer()
+    expected = {"title": "Attention", "authors": "Smith, Jane", "year": "2020"}
+    candidate = {"title": "Retention", "authors": "Jane Smith", "year": "2020"}
+
+    assert not scorer.accepts(scorer.score(expected, candidate))
+
+
+def test_long_title_tolerates_a_few_edits():
+    scorer = MatchScorer()
+    title = "Attention is all you need for neural machine translation"
+
+    score = scorer.score(
+        {"title": title}, {"title": title.replace("need", "needs") + "s"}
+    )
+
+    assert scorer.accepts(score)
+    assert score < 1.0
+
+
+def test_long_title_of_another_paper_is_rejected():
+    scorer = MatchScorer()
+
+    score = scorer.score(
+        {"title": "A survey of graph neural networks for recommendation"},
+        {"title": "A survey of convolutional networks for segmentation"},
+    )
+
+    assert not scorer.accepts(score)
+
+
+def test_title_similarity_ignores_case_and_punctuation():
+    assert title_similarity("Deep Learning!", "deep  learning") == 1.0
+
+
+def test_best_picks_the_exact_candidate_among_close_ones():
+    scorer = MatchScorer()
+    expected = {
+        "title": "Learning representations by back-propagating errors",
+        "authors": "Rumelhart, David; Hinton, Geoffrey",
+        "year": "1986",
+    }
+    candidates = [
+        {
+            "title": "Learning representations by back-propagating errors",
+            "authors": "D. Rumelhart, Geoffrey E. Hinton",
+            "year": "1986",
+        },
+        {
+            "title": "Learning representations by back-propagation errors",
+            "authors": "A. Other",
+            "year": "2001",
+        },
+    ]
+
+    best = scorer.best(expected, candidates)
+
+    assert best is not None
+    assert best[0] is candidates[0]
+
+
+def test_best_refuses_to_choose_between_close_candidates():
+    # Two candidates above the reject threshold, none reaching the accept threshold
+    scorer = MatchScorer(accept_threshold=0.99)
+    expected = {"title": "Neural networks for pattern recognition today"}
+    candidates = [
+        {"title": "Neural networks for pattern recognition toda"},
+        {"title": "Neural networks for pattern recognitions today"},
+    ]
+
+    assert scorer.best(expected, candidates) is None
+
+
+def test_best_keeps_the_only_plausible_candidate():
+    scorer = MatchScorer(accept_threshold=0.99)
+    expected = {"title": "Neural networks for pattern recognition today"}
+    candidates = [
+        {"title": "Neural networks for pattern recognition toda"},
+        {"title": "Support vector machines"},
+    ]
+
+    best = scorer.best(expected, candidates)
+
+    assert best is not None
+    assert best[0] is candidates[0]
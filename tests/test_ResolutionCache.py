@@ -0,0 +1,88 @@
+# test_ResolutionCache.py
+
+import ResolutionCache
+from ResolutionCache import ResolutionCache as Cache
+
+
+class _Clock(object):
+    """
+    Stands for the time module, so that a test moves the time forward.
+    """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def _cache(tmp_path, monkeypatch, **kwargs):
+    clock = _Clock()
+    monkeypatch.setattr(ResolutionCache, "time", clock)
+    return Cache(str(tmp_path / "cache.db"), **kwargs), clock
+
+
+def test_returns_the_stored_paper(tmp_path, monkeypatch):
+    cache, _ = _cache(tmp_path, monkeypatch)
+    cache.put("A Paper", "10.1/X", "2020", paper_id="abc", score=0)
+
+    # The title and the DOI are normalized
+    entry = cache.get("a paper ", "10.1/x", "2020")
+
+    assert entry["paper_id"] == "abc"
+    assert entry["score"] == 0
+    assert cache.get("A Paper", "10.1/X", "2021") is None
+    cache.close()
+
+
+def test_ignores_a_paper_without_id_or_url(tmp_path, monkeypatch):
+    cache, _ = _cache(tmp_path, monkeypatch)
+    cache.put("A Paper")
+
+    assert not cache.contains("A Paper")
+    cache.close()
+
+
+def test_expires_an_entry_after_its_ttl(tmp_path, monkeypatch):
+    cache, clock = _cache(tmp_path, monkeypatch, ttl=60)
+    cache.put("A Paper", paper_id="abc")
+
+    clock.now += 60
+    assert cache.contains("A Paper")
+    clock.now += 1
+    assert not cache.contains("A Paper")
+    assert cache.get("A Paper") is None
+
+    # The expired entry is deleted, even when the time goes back
+    clock.now -= 61
+    assert cache.get("A Paper") is None
+    cache.close()
+
+
+def test_evicts_the_least_recently_used_entries(tmp_path, monkeypatch):
+    cache, clock = _cache(
+        tmp_path, monkeypatch, max_entries=2, eviction_interval=1
+    )
+    cache.put("First", paper_id="1")
+    clock.now += 1
+    cache.put("Second", paper_id="2")
+    clock.now += 1
+    assert cache.get("First") is not None
+    clock.now += 1
+
+    cache.put("Third", paper_id="3")
+
+    assert cache.contains("First")
+    assert not cache.contains("Second")
+    assert cache.contains("Third")
+    cache.close()
+
+
+def test_invalidate_removes_an_entry(tmp_path, monkeypatch):
+    cache, _ = _cache(tmp_path, monkeypatch)
+    cache.put("A Paper", paper_id="abc")
+
+    cache.invalidate("A Paper")
+
+    assert cache.get("A Paper") is None
+    cache.close()
@@ -0,0 +1,88 @@
+# test_RetryPolicy.py
+
+from RetryPolicy import (
+    FAILURE_BOT_BLOCK,
+    FAILURE_ERROR_PAGE,
+    FAILURE_NOT_FOUND,
+    FAILURE_TIMEOUT,
+    FAILURE_TITLE_MISMATCH,
+    CircuitBreaker,
+    RetryQueue,
+)
+
+
+def test_breaker_ignores_timeouts_and_unknown_papers():
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    for failure in [
+        FAILURE_TIMEOUT,
+        FAILURE_NOT_FOUND,
+        FAILURE_TITLE_MISMATCH,
+    ] * 3:
+        breaker.record_failure(failure)
+
+    assert not breaker.should_restart()
+
+
+def test_breaker_opens_after_consecutive_error_pages():
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    breaker.record_failure(FAILURE_ERROR_PAGE)
+    breaker.record_failure(FAILURE_ERROR_PAGE)
+    assert not breaker.should_restart()
+    breaker.record_failure(FAILURE_ERROR_PAGE)
+    assert breaker.should_restart()
+
+    breaker.reset()
+    assert not breaker.should_restart()
+
+
+def test_breaker_opens_at_once_on_a_bot_block():
+    breaker = CircuitBreaker(failure_threshold=3)
+
+    breaker.record_failure(FAILURE_BOT_BLOCK)
+
+    assert breaker.should_restart()
+
+
+def test_success_closes_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=2)
+
+    breaker.record_failure(FAILURE_ERROR_PAGE)
+    breaker.record_success()
+    breaker.record_failure(FAILURE_ERROR_PAGE)
+
+    assert not breaker.should_restart()
+
+
+def test_retry_queue_doubles_the_delay_up_to_its_maximum():
+    retry_queue = RetryQueue(
+        max_attempts=5, base_delay=10, factor=2, max_delay=30
+    )
+    item = (1, "Paper", [])
+
+    delays = [retry_queue.defer(item, FAILURE_TIMEOUT) for _ in range(5)]
+
+    assert delays == [10, 20, 30, 30, None]
+    assert retry_queue.attempts(item) == 5
+
+
+def test_retry_queue_skips_the_failures_that_are_not_transient():
+    retry_queue = RetryQueue()
+
+    assert retry_queue.defer((1, "Paper", []), FAILURE_NOT_FOUND) is None
+    assert retry_queue.defer((2, "Paper", []), FAILURE_TITLE_MISMATCH) is None
+    assert len(retry_queue) == 0
+
+
+def test_retry_queue_pops_the_earliest_due_item():
+    retry_queue = RetryQueue(base_delay=0)
+    first = (1, "First", [])
+    second = (2, "Second", [])
+
+    retry_queue.defer(first, FAILURE_ERROR_PAGE)
+    retry_queue.defer(second, FAILURE_BOT_BLOCK)
+
+    assert retry_queue.pop() is first
+    assert retry_queue.pop() is second
+    assert retry_queue.pop() is None
@@ -0,0 +1,68 @@
+# test_ScrapperPool.py
+
+import collections
+import io
+
+import ScrapperPool as pool_module
+from RetryPolicy import RetryQueue
+from ScrapperPool import ScrapperPool
+
+
+class _FakeScrapper(object):
+    """
+    A scrapper that logs in without any browser.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.last_failure = None
+
+    def connect_to_account(self, email, password):
+        return True
+
+    def _close_browser(self):
+        pass
+
+
+def _pool(monkeypatch, **kwargs):
+    monkeypatch.setattr(pool_module, "SemanticScholarScrapper", _FakeScrapper)
+    return ScrapperPool(
+        io.StringIO(),
+        "",
+        "user@example.com",
+        "password",
+        login_stagger=0,
+        retry_queue=RetryQueue(base_delay=0),
+        **kwargs,
+    )
+
+
+def test_failing_callbacks_do_not_stop_the_worker(monkeypatch):
+    processed = []
+
+    def on_item_done(worker_id, item, result):
+        raise OSError("disk full")
+
+    def on_prefetch(worker_id, scrapper, items):
+        raise RuntimeError("tab crashed")
+
+    pool = _pool(
+        monkeypatch,
+        process_item=lambda worker_id, scrapper, item: processed.append(item),
+        on_item_done=on_item_done,
+        lookahead=2,
+        on_prefetch=on_prefetch,
+    )
+
+    assert pool.run(range(6))
+    assert processed == list(range(6))
+    assert pool.remaining() == 0
+
+
+def test_reserved_items_are_handed_back(monkeypatch):
+    pool = _pool(monkeypatch)
+    pool._reserved[1] = collections.deque(["a", "b"])
+
+    pool._release_reserved(1)
+
+    assert 1 not in pool._reserved
+    assert [pool._next_item(), pool._next_item()] == ["a", "b"]
@@ -0,0 +1,155 @@
+# test_SemanticScholarScrapper.py
+
+import io
+import re
+
+import SemanticScholarScrapper as scrapper_module
+from RetryPolicy import (
+    FAILURE_ERROR_PAGE,
+    FAILURE_NOT_FOUND,
+    TRANSIENT_FAILURES,
+)
+from SemanticScholarScrapper import SemanticScholarScrapper
+
+
+class _FakeAccountDriver(object):
+    """
+    Serve the pages of an account listing: page number -> {paper ID: title}, or [] for an empty page.
+    """
+
+    def __init__(self, pages, total=None):
+        self.pages = pages
+        self.total = total
+        self.page = 1
+
+    def load(self, url):
+        match = re.search(r"page=(\d+)", url)
+        self.page = int(match.group(1)) if match else 1
+        return False
+
+    def execute_script(self, script, *args):
+        papers = self.pages.get(self.page, [])
+        if script == scrapper_module._FIRST_PRESENT_SCRIPT:
+            return "papers" if papers else "empty"
+        if script == scrapper_module._ACCOUNT_TOTAL_SCRIPT:
+            return self.total
+        if script == scrapper_module._ACCOUNT_PAPERS_SCRIPT:
+            return dict(papers)
+        raise AssertionError("Unexpected script")
+
+
+def _scrapper(tmp_path, driver):
+    scrapper = SemanticScholarScrapper(io.StringIO(), str(tmp_path))
+    scrapper._driver = driver
+    scrapper._load_page = driver.load
+    return scrapper
+
+
+def _papers(start, count) -> dict:
+    return {
+        f"{number:040x}": {
+            "title": f"Paper {number}",
+            "authors": "",
+            "year": "",
+        }
+        for number in range(start, start + count)
+    }
+
+
+def test_account_listing_ending_on_a_short_page_is_complete(tmp_path):
+    driver = _FakeAccountDriver({1: _papers(0, 10), 2: _papers(10, 3)})
+
+    papers, complete = _scrapper(tmp_path, driver).scrap_library()
+
+    assert len(papers) == 13
+    assert complete
+
+
+def test_account_listing_ending_on_an_empty_page_is_complete(tmp_path):
+    driver = _FakeAccountDriver({1: _papers(0, 10), 2: _papers(10, 10)})
+
+    papers, complete = _scrapper(tmp_path, driver).scrap_library()
+
+    assert len(papers) == 20
+    assert complete
+
+
+def test_account_listing_repeating_its_first_page_is_partial(tmp_path):
+    # The site ignores the page parameter, or loads the next papers on scroll
+    driver = _FakeAccountDriver({page: _papers(0, 10) for page in (1, 2, 3)})
+
+    papers, complete = _scrapper(tmp_path, driver).scrap_library()
+
+    assert len(papers) == 10
+    assert not complete
+
+
+def test_account_listing_shorter_than_its_total_is_partial(tmp_path):
+    driver = _FakeAccountDriver(
+        {1: _papers(0, 10), 2: _papers(10, 5)}, total=40
+    )
+
+    papers, complete = _scrapper(tmp_path, driver).scrap_alerts()
+
+    assert len(papers) == 15
+    assert not complete
+
+
+def test_unreadable_account_listing(tmp_path):
+    driver = _FakeAccountDriver({})
+    driver.execute_script = lambda script, *args: None
+    scrapper = _scrapper(tmp_path, driver)
+    scrapper._timeout = 0
+
+    assert scrapper.scrap_library() == (None, False)
+
+
+class _FakePageDriver(object):
+    """
+    Answer the scripts run while waiting for a paper page.
+    """
+
+    def __init__(self, fired, not_found, bot_block=False):
+        self.fired = fired
+        self.not_found = not_found
+        self.bot_block = bot_block
+
+    def execute_script(self, script, *args):
+        if script == scrapper_module._FIRST_PRESENT_SCRIPT:
+            return self.fired
+        if script == scrapper_module._BOT_BLOCK_SCRIPT:
+            return self.bot_block
+        if script == scrapper_module._NOT_FOUND_SCRIPT:
+            return self.not_found
+        raise AssertionError("Unexpected script")
+
+
+def _page_scrapper(tmp_path, driver):
+    scrapper = SemanticScholarScrapper(io.StringIO(), str(tmp_path))
+    scrapper._driver = driver
+    scrapper._timeout = 0
+    return scrapper
+
+
+def test_unknown_identifier_is_not_a_transient_failure(tmp_path):
+    scrapper = _page_scrapper(tmp_path, _FakePageDriver("plain_text", True))
+
+    for _ in range(5):
+        assert not scrapper._verify_paper_page("Paper")
+        assert scrapper.last_failure == FAILURE_NOT_FOUND
+    assert FAILURE_NOT_FOUND not in TRANSIENT_FAILURES
+    assert not scrapper._breaker.should_restart()
+
+
+def test_not_found_page_is_recognized_before_the_timeout(tmp_path):
+    scrapper = _page_scrapper(tmp_path, _FakePageDriver("error", True))
+
+    assert not scrapper._verify_paper_page("Paper")
+    assert scrapper.last_failure == FAILURE_NOT_FOUND
+
+
+def test_error_page_is_a_transient_failure(tmp_path):
+    scrapper = _page_scrapper(tmp_path, _FakePageDriver("error", False))
+
+    assert not scrapper._verify_paper_page("Paper")
+    assert scrapper.last_failure == FAILURE_ERROR_PAGE
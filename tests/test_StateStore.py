@@ -0,0 +1,138 @@
+# test_StateStore.py
+
+import sqlite3
+import time
+
+from StateStore import STATUS_DONE, STATUS_SKIPPED, StateStore
+from ZoteroReader import legacy_key
+
+
+def _written_keys(file_name) -> set:
+    """
+    :return: The keys written to the file, read by another connection.
+    """
+    connection = sqlite3.connect(file_name)
+    try:
+        return {row[0] for row in connection.execute("SELECT key FROM items")}
+    finally:
+        connection.close()
+
+
+def test_completed_item_is_written_at_once(tmp_path):
+    file_name = str(tmp_path / "state.db")
+    store = StateStore(file_name, batch_size=100, flush_interval=3600)
+
+    store.start_attempt("ITEM0001", "Paper")
+    store.mark_completed("ITEM0001", "Paper")
+
+    assert _written_keys(file_name) == {"ITEM0001"}
+    store.close()
+
+
+def test_failed_item_is_written_at_once(tmp_path):
+    file_name = str(tmp_path / "state.db")
+    store = StateStore(file_name, batch_size=100, flush_interval=3600)
+
+    store.record_failure("ITEM0001", "Paper", "timeout")
+
+    assert _written_keys(file_name) == {"ITEM0001"}
+    store.close()
+
+
+def test_step_updates_are_batched(tmp_path):
+    file_name = str(tmp_path / "state.db")
+    store = StateStore(file_name, batch_size=100, flush_interval=3600)
+
+    store.ensure_item("ITEM0001", "Paper")
+    assert _written_keys(file_name) == set()
+
+    store.flush()
+    assert _written_keys(file_name) == {"ITEM0001"}
+    store.close()
+
+
+def test_legacy_keys_are_the_title_hashes(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.mark_completed(legacy_key("Paper"), "Paper")
+    store.mark_completed("ITEM0001", "Other paper")
+    store.mark_completed("F" * 32, "Not a hash")
+
+    assert store.legacy_keys() == {legacy_key("Paper")}
+    store.close()
+
+
+def test_mark_completed_records_the_steps_not_requested(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+
+    store.mark_completed("ITEM0001", "Paper", alert=True, library=False)
+    state = store.get("ITEM0001")
+    assert (state["alert_status"], state["library_status"]) == (
+        STATUS_DONE,
+        STATUS_SKIPPED,
+    )
+
+    # A step done once stays done when a later completion does not request it
+    store.mark_completed("ITEM0001", "Paper", alert=False, library=True)
+    state = store.get("ITEM0001")
+    assert (state["alert_status"], state["library_status"]) == (
+        STATUS_DONE,
+        STATUS_DONE,
+    )
+    store.close()
+
+
+def test_mark_completed_clears_the_failures(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.record_failure("ITEM0001", "Paper", "timeout")
+
+    store.mark_completed("ITEM0001", "Paper")
+
+    state = store.get("ITEM0001")
+    assert state["failures"] == 0
+    assert state["next_attempt_at"] is None
+    assert store.completed_keys() == {"ITEM0001"}
+    assert store.failed_items() == []
+    store.close()
+
+
+def test_record_failure_doubles_the_backoff(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    now = time.time()
+
+    delays = [
+        store.record_failure(
+            "ITEM0001", "Paper", "timeout", backoff=100, max_backoff=350
+        )
+        - now
+        for _ in range(4)
+    ]
+
+    assert [round(delay, -1) for delay in delays] == [100, 200, 350, 350]
+    assert store.get("ITEM0001")["failures"] == 4
+    assert store.deferred_keys(now) == {"ITEM0001"}
+    assert store.deferred_keys(now + 400) == set()
+    store.close()
+
+
+def test_rekey_moves_a_state_unless_the_new_key_has_one(tmp_path):
+    store = StateStore(str(tmp_path / "state.db"))
+    store.mark_completed(legacy_key("First"), "First")
+    store.mark_completed(legacy_key("Second"), "Second")
+    store.mark_completed("ITEM0002", "Second")
+
+    moved = store.rekey(
+        {
+            legacy_key("First"): "ITEM0001",
+            legacy_key("Second"): "ITEM0002",
+            "ITEM0003": "ITEM0003",
+        }
+    )
+
+    assert moved == 1
+    assert store.completed_keys() == {
+        "ITEM0001",
+        "ITEM0002",
+        legacy_key("Second"),
+    }
+    assert store.get("ITEM0001")["title"] == "First"
+    store.close()
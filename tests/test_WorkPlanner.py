@@ -0,0 +1,117 @@
+# test_WorkPlanner.py
+
+from WorkPlanner import plan_work
+from ZoteroReader import ZoteroItem, legacy_key
+
+
+def _state(key, title, paper_id="", alert="done", library="done"):
+    return {
+        "key": key,
+        "title": title,
+        "paper_id": paper_id,
+        "alert_status": alert,
+        "library_status": library,
+    }
+
+
+def _removed_keys(plan) -> list:
+    return [removal.key for _, removal, _ in plan.removals]
+
+
+def test_incremental_database_read_keeps_unmodified_items():
+    # Only ITEM0002 was modified since the last run, ITEM0001 is still in the library
+    items = [ZoteroItem("ITEM0002", title="Second paper")]
+    library = {"ITEM0001": "First paper", "ITEM0002": "Second paper"}
+    saved_items = [
+        _state("ITEM0001", "First paper", "p1"),
+        _state("ITEM0003", "Deleted paper", "p3"),
+    ]
+
+    plan = plan_work(
+        items,
+        {"ITEM0001", "ITEM0003"},
+        saved_items=saved_items,
+        library=library,
+    )
+
+    assert _removed_keys(plan) == ["ITEM0003"]
+    assert not plan.unknown_removals
+
+
+def test_incremental_database_read_keeps_a_title_of_the_whole_library():
+    # The deleted item has a copy under another key, which was not modified since the last run
+    items = [ZoteroItem("ITEM0002", title="Second paper")]
+    library = {"ITEM0001": "First paper", "ITEM0002": "Second paper"}
+    saved_items = [_state("ITEM0003", "First paper", "p3")]
+
+    plan = plan_work(
+        items, {"ITEM0003"}, saved_items=saved_items, library=library
+    )
+
+    assert not plan.removals
+
+
+def test_switch_from_csv_to_database_removes_nothing():
+    # The state saved from a CSV export without "Key" column is keyed by the hash of the titles
+    library = {"ITEM0001": "First paper", "ITEM0002": "Renamed paper"}
+    saved_items = [
+        _state(legacy_key("First paper"), "First paper", "p1"),
+        _state(legacy_key("Second paper"), "Second paper", "p2"),
+    ]
+
+    plan = plan_work(
+        [],
+        {state["key"] for state in saved_items},
+        saved_items=saved_items,
+        library=library,
+    )
+
+    assert not plan.removals
+    assert [state["title"] for state in plan.unknown_removals] == [
+        "Second paper"
+    ]
+
+
+def test_edited_title_keeps_the_item():
+    items = [ZoteroItem("ITEM0001", title="Edited title")]
+    saved_items = [_state("ITEM0001", "Original title", "p1")]
+
+    plan = plan_work(items, {"ITEM0001"}, saved_items=saved_items)
+
+    assert not plan.removals
+    assert plan.saved == items
+
+
+def test_edited_title_of_a_duplicate_keeps_its_paper():
+    # ITEM0002 was deleted, its paper is still the one of ITEM0001 whose title was edited
+    items = [ZoteroItem("ITEM0001", title="Edited title")]
+    saved_items = [
+        _state("ITEM0001", "Original title", "p1"),
+        _state("ITEM0002", "Original title (copy)", "p1"),
+    ]
+
+    plan = plan_work(items, {"ITEM0001", "ITEM0002"}, saved_items=saved_items)
+
+    assert not plan.removals
+
+
+def test_saved_item_with_a_new_step_is_sent_again():
+    # The item was saved with an alert only, it has been tagged s2:library since
+    items = [
+        ZoteroItem("ITEM0001", title="Paper", add_alert=True),
+        ZoteroItem(
+            "ITEM0002",
+            title="Alert only",
+            add_alert=True,
+            add_to_library=False,
+        ),
+    ]
+    saved_items = [
+        _state("ITEM0001", "Paper", "p1", library="skipped"),
+        _state("ITEM0002", "Alert only", "p2", library="skipped"),
+    ]
+
+    plan = plan_work(items, {"ITEM0001", "ITEM0002"}, saved_items=saved_items)
+
+    assert [zotero_item.key for _, zotero_item, _ in plan.work] == ["ITEM0001"]
+    assert [zotero_item.key for zotero_item in plan.saved] == ["ITEM0002"]
@@ -0,0 +1,113 @@
+# test_ZoteroReader.py
+
+import pytest
+
+from ZoteroReader import iter_csv_items, legacy_key
+
+
+def _write_csv(path, lines):
+    # Zotero writes its exports with a byte order mark
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8-sig")
+    return str(path)
+
+
+def test_reads_the_columns_of_each_item(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv",
+        [
+            "Key,Item Type,Publication Year,Author,Title,DOI,Url,Extra",
+            'ITEM0001,journalArticle,2020,"Doe, Jane",A Paper,10.1/x,,',
+        ],
+    )
+
+    (item,) = iter_csv_items(file_name)
+
+    assert item.key == "ITEM0001"
+    assert item.title == "A Paper"
+    assert item.year == "2020"
+    assert item.authors == "Doe, Jane"
+    assert item.doi == "10.1/x"
+    assert (item.add_alert, item.add_to_library) == (True, True)
+
+
+def test_skips_the_item_types_not_requested(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv",
+        [
+            "Key,Item Type,Title",
+            "ITEM0001,journalArticle,A Paper",
+            "ITEM0002,webpage,A Page",
+        ],
+    )
+
+    assert [item.key for item in iter_csv_items(file_name)] == ["ITEM0001"]
+    assert [
+        item.key for item in iter_csv_items(file_name, item_types=None)
+    ] == ["ITEM0001", "ITEM0002"]
+
+
+def test_tags_restrict_the_actions(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv",
+        [
+            "Key,Item Type,Title,Manual Tags,Automatic Tags",
+            "ITEM0001,journalArticle,Untagged,reading,",
+            "ITEM0002,journalArticle,Alert only,reading; S2:Alert,",
+            "ITEM0003,journalArticle,Library only,,s2:library",
+        ],
+    )
+
+    actions = {
+        item.key: (item.add_alert, item.add_to_library)
+        for item in iter_csv_items(file_name, add_to_library=False)
+    }
+
+    assert actions == {
+        "ITEM0001": (True, False),
+        "ITEM0002": (True, False),
+        "ITEM0003": (False, True),
+    }
+
+
+def test_action_columns_override_the_tags(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv",
+        [
+            "Key,Item Type,Title,Manual Tags,Add Alert,Add to Library",
+            "ITEM0001,journalArticle,A Paper,s2:alert,no,yes",
+            "ITEM0002,journalArticle,Another Paper,s2:alert,,",
+        ],
+    )
+
+    actions = {
+        item.key: (item.add_alert, item.add_to_library)
+        for item in iter_csv_items(file_name)
+    }
+
+    assert actions == {
+        "ITEM0001": (False, True),
+        "ITEM0002": (True, False),
+    }
+
+
+def test_items_without_key_get_the_legacy_key(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv",
+        [
+            "Key,Item Type,Title,Year",
+            ",journalArticle,A Paper,2020",
+        ],
+    )
+
+    (item,) = iter_csv_items(file_name)
+
+    assert item.key == legacy_key("A Paper", "2020")
+
+
+def test_rejects_a_file_without_title_column(tmp_path):
+    file_name = _write_csv(
+        tmp_path / "export.csv", ["Key,Item Type", "ITEM0001,journalArticle"]
+    )
+
+    with pytest.raises(ValueError):
+        list(iter_csv_items(file_name))